@@ -1,15 +1,22 @@
 # next_thursday_props.py
-import os, sys, requests
+import os, sys, pathlib
 from datetime import datetime, timezone
 try:
     from zoneinfo import ZoneInfo  # py>=3.9
 except Exception:
     ZoneInfo = None
 
+try:
+    from scripts.odds_cache import cached_get, print_summary
+except Exception:
+    sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent / "scripts"))
+    from odds_cache import cached_get, print_summary  # fallback
+
 API_KEY = os.getenv("ODDS_API_KEY", "bf91c7e54b4224b4e820e6e74f69aa33")
 SPORT = "americanfootball_nfl"
 REGION = "us"
 MARKETS = "player_pass_yds,player_pass_tds,player_rush_yds,player_receptions"
+REFRESH = "--refresh" in sys.argv[1:] or None  # bypass the Odds API cache
 
 def to_local(dt_utc_iso, tz="America/New_York"):
     dt_utc = datetime.fromisoformat(dt_utc_iso.replace("Z","+00:00")).astimezone(timezone.utc)
@@ -18,8 +25,8 @@ def to_local(dt_utc_iso, tz="America/New_York"):
     return dt_utc  # fallback: UTC if zoneinfo not available
 
 # 1) get upcoming events
-ev = requests.get(f"https://api.the-odds-api.com/v4/sports/{SPORT}/events",
-                  params={"apiKey": API_KEY}, timeout=15)
+ev = cached_get(f"https://api.the-odds-api.com/v4/sports/{SPORT}/events",
+                params={"apiKey": API_KEY}, timeout=15, refresh=REFRESH)
 if ev.status_code != 200:
     print("Events error:", ev.status_code, ev.text); sys.exit(1)
 events = ev.json()
@@ -43,7 +50,7 @@ eid = game["id"]; home = game["home_team"]; away = game["away_team"]
 print(f"Next Thursday game (ET): {away} at {home} | {start_local.isoformat()} | id={eid}")
 
 # 3) try to fetch player props for that game
-odds = requests.get(
+odds = cached_get(
     f"https://api.the-odds-api.com/v4/sports/{SPORT}/events/{eid}/odds",
     params={
         "apiKey": API_KEY,
@@ -51,8 +58,10 @@ odds = requests.get(
         "oddsFormat": "decimal",
         "markets": MARKETS,
     },
-    timeout=20
+    timeout=20,
+    refresh=REFRESH,
 )
+print_summary()
 
 if odds.status_code == 402 or "OUT_OF_USAGE_CREDITS" in odds.text:
     print("Out of credits:", odds.text); sys.exit(0)
@@ -7,22 +7,16 @@ WEEK=10          # change weekly
 HOLDOUT=2024     # last full season
 LOOKBACKS="1 3 5"
 
-mkdir -p preds
-
-declare -A RUNS=(
-  ["qb_pass"]="--target passing_yards --positions QB"
-  ["rb_rush"]="--target rushing_yards --positions RB"
-  ["wrte_rec"]="--target receiving_yards --positions WR TE"
-  ["fppr"]="--target fantasy_points_ppr --positions QB RB WR TE"
-)
-
-for name in "${!RUNS[@]}"; do
-  echo "=== Running $name for ${SEASON} Wk ${WEEK} ==="
-  python scripts/ml_player_pipeline.py \
-    --player_csv "$PLAYER_CSV" \
-    ${RUNS[$name]} \
-    --lookbacks $LOOKBACKS \
-    --split season_holdout --holdout_season "$HOLDOUT" \
-    --predict_season "$SEASON" --predict_week "$WEEK" \
-    --save_preds "./preds/${SEASON}_wk${WEEK}_${name}.csv"
-done
+# One interpreter: features built once, models fit in parallel (one worker per core).
+# Writes ./preds/${SEASON}_wk${WEEK}_<name>.csv + ./preds/${SEASON}_wk${WEEK}_summary.csv
+echo "=== Running all targets for ${SEASON} Wk ${WEEK} ==="
+python scripts/ml_player_pipeline.py \
+  --player_csv "$PLAYER_CSV" \
+  --lookbacks $LOOKBACKS \
+  --split season_holdout --holdout_season "$HOLDOUT" \
+  --predict_season "$SEASON" --predict_week "$WEEK" \
+  --save_dir ./preds \
+  --jobs qb_pass=passing_yards:QB \
+         rb_rush=rushing_yards:RB \
+         wrte_rec=receiving_yards:WR,TE \
+         fppr=fantasy_points_ppr:QB,RB,WR,TE
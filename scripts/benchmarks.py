@@ -0,0 +1,500 @@
+#!/usr/bin/env python3
+# scripts/benchmarks.py
+"""
+Timings for the vectorized pipeline pieces on synthetic data: each subcommand
+runs the new code next to the previous (row-wise) version and prints a table.
+The synthetic inputs (tests/synth.py) and the reference implementations of the
+replaced code (tests/legacy.py) are shared with the test suite.
+
+Usage:
+  python3 scripts/benchmarks.py devig   --rows 10000 100000 1000000
+  python3 scripts/benchmarks.py kernels --rows 1000000
+  python3 scripts/benchmarks.py rolling --player_csv data/weekly_player_stats.csv
+  python3 scripts/benchmarks.py incremental --weeks 2
+  python3 scripts/benchmarks.py params --players 1500 15000
+  python3 scripts/benchmarks.py partitions --weeks 3
+  python3 scripts/benchmarks.py team_features --seasons 10 --check_seasons 2
+  python3 scripts/benchmarks.py elo --schedules nfl_supp_dump/schedules.parquet
+  python3 scripts/benchmarks.py sim --sims 100000
+  python3 scripts/benchmarks.py predict --rows 16 10000 1000000
+  python3 scripts/benchmarks.py pages --rows 10000 100000
+  python3 scripts/benchmarks.py render --cards 25000
+  python3 scripts/benchmarks.py site --rows 30000
+"""
+import argparse, json, os, subprocess, sys, tempfile, time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+import prob_kernels as pk
+from devig import METHODS, book_fair_probs, cons_fair_probs
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tests"))
+import legacy, synth
+
+
+def _timeit(fn, *a, **kw):
+    t0 = time.perf_counter()
+    out = fn(*a, **kw)
+    return out, time.perf_counter() - t0
+
+# ---------- devig: vectorized groupby reductions vs groupby().apply ----------
+def _new_devig(df, method="proportional"):
+    df = df.copy()
+    df["fair_prob_book"] = book_fair_probs(df, legacy.KEYS_BOOK, method=method)
+    df["fair_prob_cons"] = cons_fair_probs(df, legacy.KEYS_CONS, method=method)
+    return df
+
+def bench_devig(rows, legacy_max):
+    print("devig: vectorized groupby reductions vs groupby().apply")
+    table = []
+    for n in rows:
+        df = synth.props(n)
+        _, t_new = _timeit(_new_devig, df)
+        t_old = _timeit(legacy.devig, df)[1] if n <= legacy_max else np.nan
+        t_methods = {m: _timeit(_new_devig, df, m)[1] for m in METHODS if m != "proportional"}
+        table.append({"rows": len(df), "legacy_s": t_old, "proportional_s": t_new,
+                      **{f"{m}_s": t for m, t in t_methods.items()},
+                      "speedup": t_old / t_new if t_old == t_old else np.nan})
+    print(pd.DataFrame(table).to_string(index=False, float_format=lambda x: f"{x:,.3f}"))
+
+
+# ---------- kernels: prob_kernels.py vs the per-row helpers ----------
+def bench_kernels(rows, legacy_max):
+    print("kernels: prob_kernels.py vs per-row helpers")
+    table = []
+    for n in rows:
+        df = synth.kernel_inputs(n)
+        cols = {c: df[c].to_numpy() for c in df.columns}
+        dec = pk.american_to_decimal(cols["price"])
+        cases = [
+            ("american_to_decimal", lambda: pk.american_to_decimal(cols["price"]),
+                                    lambda: df["price"].apply(legacy.american_to_decimal)),
+            ("american_to_prob",    lambda: pk.american_to_prob(cols["price"]),
+                                    lambda: df["price"].apply(legacy.american_to_prob)),
+            ("prob_to_american",    lambda: pk.prob_to_american(cols["p"], rounded=True),
+                                    lambda: df["p"].apply(legacy.prob_to_american)),
+            ("norm_cdf",            lambda: pk.norm_cdf(cols["point"], cols["mu"], cols["sigma"]),
+                                    lambda: df.apply(lambda r: legacy.norm_cdf(r["point"], r["mu"], r["sigma"]), axis=1)),
+            ("expected_value",      lambda: pk.expected_value(cols["p"], dec),
+                                    lambda: df.assign(dec=dec).apply(lambda r: legacy.expected_value(r["p"], r["dec"]), axis=1)),
+            ("poisson_cdf",         lambda: pk.poisson_cdf(cols["line"], cols["lam"]),
+                                    lambda: [legacy.poisson_cdf(k, l) for k, l in zip(cols["line"], cols["lam"])]),
+            ("poisson_sf",          lambda: pk.poisson_sf(cols["line"], cols["lam"]),
+                                    lambda: [legacy.poisson_sf(l, k) for k, l in zip(cols["line"], cols["lam"])]),
+        ]
+        for name, new_fn, old_fn in cases:
+            _, t_new = _timeit(new_fn)
+            t_old = _timeit(old_fn)[1] if n <= legacy_max else np.nan
+            table.append({"kernel": name, "rows": n, "legacy_s": t_old, "vectorized_s": t_new,
+                          "speedup": t_old / t_new if t_old == t_old else np.nan})
+    print(pd.DataFrame(table).to_string(index=False, float_format=lambda x: f"{x:,.4f}"))
+
+
+# ---------- rolling: rolling_features.py vs per-column groupby lambdas ----------
+def bench_rolling(player_csv, lookbacks):
+    from ml_player_pipeline import add_player_rolling_and_season, build_defense_allowed, load_player_weekly
+    if player_csv and os.path.exists(player_csv):
+        df = load_player_weekly(player_csv); src = player_csv
+    else:
+        df = synth.weekly(); src = "synthetic 1999-2025 (no --player_csv)"
+    cols = [c for c in synth.ROLL_COLS if c in df.columns]
+    print(f"rolling: {src} | {len(df):,} rows | {len(cols)} cols x lookbacks {lookbacks}")
+
+    new_p, t_new_p = _timeit(add_player_rolling_and_season, df, cols, lookbacks, "player_id", "p_")
+    old_p, t_old_p = _timeit(legacy.add_player_rolling_and_season, df, cols, lookbacks, "player_id", "p_")
+    _, t_new_d = _timeit(build_defense_allowed, new_p, cols, lookbacks)
+    _, t_old_d = _timeit(legacy.build_defense_allowed, old_p, cols, lookbacks)
+
+    table = [{"step": "add_player_rolling_and_season", "legacy_s": t_old_p, "new_s": t_new_p, "speedup": t_old_p / t_new_p},
+             {"step": "build_defense_allowed", "legacy_s": t_old_d, "new_s": t_new_d, "speedup": t_old_d / t_new_d}]
+    print(pd.DataFrame(table).to_string(index=False, float_format=lambda x: f"{x:,.3f}"))
+
+
+# ---------- incremental feature store vs full rebuild ----------
+def bench_incremental(player_csv, lookbacks, weeks):
+    import feature_store as fs
+    from ml_player_pipeline import STAT_COLS, load_player_weekly
+    if player_csv and os.path.exists(player_csv):
+        df = load_player_weekly(player_csv); src = player_csv
+    else:
+        df = synth.weekly(); src = "synthetic 1999-2025 (no --player_csv)"
+    wk = df["season"] * 100 + df["week"]
+    last = np.sort(wk.unique())[-weeks:]
+    hist = df[~wk.isin(last)]
+    print(f"incremental: {src} | {len(hist):,} history rows + {weeks} appended week(s) | lookbacks {lookbacks}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv, inc, full = os.path.join(tmp, "weekly.csv"), os.path.join(tmp, "inc"), os.path.join(tmp, "full")
+        hist.to_csv(csv, index=False)
+        fs.materialize(csv, lookbacks, STAT_COLS, load_player_weekly, inc)
+        table, cur = [], hist
+        for w in last:  # one Tuesday refresh per week
+            cur = pd.concat([cur, df[wk == w]])
+            cur.to_csv(csv, index=False)
+            p_inc, t_inc = _timeit(fs.materialize, csv, lookbacks, STAT_COLS, load_player_weekly, inc)
+            _, t_full = _timeit(fs.materialize, csv, lookbacks, STAT_COLS, load_player_weekly, full,
+                                     incremental=False)
+            table.append({"week": w, "rows": len(cur), "appended": fs.manifest(p_inc).get("appended"),
+                          "full_build_s": t_full, "incremental_s": t_inc, "speedup": t_full / t_inc})
+    print(pd.DataFrame(table).to_string(index=False, float_format=lambda x: f"{x:,.3f}"))
+
+
+# ---------- make_player_prop_params: vectorized vs iterrows / groupby-loop versions ----------
+def bench_params(player_counts):
+    from make_player_prop_params import build_params, _build_anytime_td_rows
+    table = []
+    for n in player_counts:
+        weekly, want = synth.prop_weekly(n)
+        weekly["player"] = weekly["player_display_name"]
+        print(f"params: {n:,} players | {len(weekly):,} weekly rows | {len(want):,} props players")
+        new_p, t_new_p = _timeit(build_params, weekly.copy(), want)
+        old_p, t_old_p = _timeit(legacy.build_params, weekly.copy(), want)
+        _, t_new_a = _timeit(_build_anytime_td_rows, new_p)
+        _, t_old_a = _timeit(legacy.build_anytime_td_rows, old_p)
+        table += [{"step": "build_params", "players": n, "legacy_s": t_old_p, "new_s": t_new_p, "speedup": t_old_p / t_new_p},
+                  {"step": "_build_anytime_td_rows", "players": n, "legacy_s": t_old_a, "new_s": t_new_a,
+                   "speedup": t_old_a / t_new_a}]
+    print(pd.DataFrame(table).to_string(index=False, float_format=lambda x: f"{x:,.3f}"))
+
+
+# ---------- pull scripts: partitioned upsert vs the old read-everything append ----------
+def bench_partitions(weeks):
+    import parquet_table
+    keys = ["player_id", "season", "week", "team"]
+    df = synth.weekly()
+    df["player_id"] = "00-" + df["player_id"].str.zfill(7)   # nflverse-shaped, so the CSV keeps it a string
+    wk = df["season"] * 100 + df["week"]
+    last = np.sort(wk.unique())[-weeks:]
+    hist = df[~wk.isin(last)]
+    print(f"partitions: synthetic 1999-2025 | {len(hist):,} history rows + {weeks} appended week(s) + 1 re-pull")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        old_dir, new_dir = os.path.join(tmp, "old"), os.path.join(tmp, "new")
+        os.makedirs(old_dir); os.makedirs(new_dir)
+        root, csv = os.path.join(new_dir, "weekly"), os.path.join(new_dir, "weekly.csv")
+        hist.to_parquet(os.path.join(old_dir, "weekly.parquet"), index=False)
+        hist.to_csv(os.path.join(old_dir, "weekly.csv"), index=False)
+        hist.to_parquet(os.path.join(new_dir, "weekly.parquet"), index=False)
+        hist.to_csv(csv, index=False)
+        _, t_mig = _timeit(parquet_table.migrate, root)
+        print(f"  one-time migrate of the single-file dump: {t_mig:.2f}s")
+
+        rerun = df[wk == last[-1]].copy()
+        rerun["passing_yards"] += 1.0                       # stat corrections on a re-pull
+        table = []
+        for w, new in [(w, df[wk == w]) for w in last] + [(last[-1], rerun)]:
+            old, t_old = _timeit(legacy.append_dedup, new, old_dir, "weekly", keys)
+            def _upsert():
+                res = parquet_table.upsert(new, root, keys=keys)
+                return parquet_table.append_csv(new, csv, root, rewrite=res["replaced"] > 0)
+            how, t_new = _timeit(_upsert)
+            table.append({"week": w, "rows": len(old), "legacy_s": t_old, "partitioned_s": t_new,
+                          "speedup": t_old / t_new, "csv": how})
+
+        _, t_read = _timeit(parquet_table.read, root)
+        _, t_part = _timeit(parquet_table.read, root, seasons=[last[-1] // 100], weeks=[last[-1] % 100])
+        print(f"  read: whole table {t_read:.2f}s, one season/week partition {t_part:.3f}s")
+        res, t_c = _timeit(parquet_table.compact, root, csv)
+        print(f"  compact: {res} in {t_c:.2f}s")
+    print(pd.DataFrame(table).to_string(index=False, float_format=lambda x: f"{x:,.3f}"))
+
+
+# ---------- team_features: groupby aggregation vs a per-game loop ----------
+def bench_team_features(n_seasons, check_seasons):
+    import nfl_data, parquet_table, pathlib
+    import team_features as tf
+    seasons = list(range(2026 - n_seasons, 2026))
+    pbp = synth.pbp(seasons)
+    small = pbp[pbp["season"].isin(seasons[:check_seasons])]
+    print(f"team_features: {len(pbp):,} synthetic plays, {n_seasons} seasons | reference loop on {check_seasons}")
+    _, t_new = _timeit(tf.aggregate, small)
+    for side, col in tf.SIDES.items():
+        print(f"  {side}: reference loop {_timeit(legacy.team_week, small, col)[1]:.2f}s")
+    print(f"  vectorized ({check_seasons} seasons, both sides): {t_new:.2f}s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        nfl_data.DATA_DIR = pathlib.Path(tmp)
+        parquet_table.write(pbp, pathlib.Path(tmp) / "nfl_supplemental" / "play_by_play")
+        out, t_build = _timeit(tf.build, None, os.path.join(tmp, "team_features"))
+        print(f"  build() over {n_seasons} seasons from the projected table: {t_build:.2f}s "
+              f"({len(out['offense']):,} team-weeks per side)")
+        off = out["offense"]
+        games = off[["team", "season", "week"]].rename(columns={"team": "opponent_team"}).assign(
+            team=off["team"].to_numpy()[::-1])
+        joined, t_join = _timeit(tf.join, games, [1, 3], os.path.join(tmp, "team_features"))
+        print(f"  join: {len(joined):,} rows + {len(tf.feature_names([1, 3]))} features in {t_join:.2f}s")
+        _, t_as_of = _timeit(tf.as_of, "offense", seasons[-1], 10, os.path.join(tmp, "team_features"))
+        print(f"  as_of(week 10): {t_as_of * 1000:.1f} ms")
+
+
+# ---------- elo: weekly-batched engine vs the old per-game iterrows loop ----------
+def bench_elo(schedules):
+    import elo
+    if schedules and os.path.exists(schedules):
+        sched = pd.read_parquet(schedules); src = schedules
+    else:
+        sched = synth.schedules(); src = "synthetic 1999-2025 (no --schedules)"
+    done = sched[sched["home_score"].notna()]
+    seasons = sorted(done["season"].unique())
+    print(f"elo: {src} | {len(done):,} completed games, {len(seasons)} seasons")
+
+    last = seasons[-1]
+    _, t_old = _timeit(legacy.elo_season, sched, last)
+    state = elo._empty_state(dict(elo.PARAMS, game_types=["REG"]))
+    _, t_one = _timeit(elo.apply_games, elo.completed_games(sched[sched["season"] == last], ["REG"]), state)
+    table = [{"run": f"one season ({last})", "legacy_s": t_old, "engine_s": t_one}]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        _, t_full = _timeit(elo.update, sched, os.path.join(tmp, "full"))
+        table.append({"run": f"all {len(seasons)} seasons, full build", "legacy_s": np.nan, "engine_s": t_full})
+        wk = done[done["season"] == last]["week"]
+        cut = sched.copy()
+        cut.loc[(cut["season"] == last) & (cut["week"] >= wk.max()), ["home_score", "away_score"]] = np.nan
+        elo.update(cut, os.path.join(tmp, "inc"), full=True)
+        _, t_inc = _timeit(elo.update, sched, os.path.join(tmp, "inc"))
+        table.append({"run": f"incremental: week {wk.max()} of {last}", "legacy_s": np.nan, "engine_s": t_inc})
+        r, t_r = _timeit(elo.ratings, last, int(wk.max()), None, os.path.join(tmp, "full"))
+        print(f"  ratings({last}, {wk.max()}): {len(r)} teams in {t_r * 1000:.1f} ms")
+    print(pd.DataFrame(table).to_string(index=False, float_format=lambda x: f"{x:,.3f}"))
+
+
+# ---------- sim: chunked (sims x games) season simulator vs a per-season Python loop ----------
+def bench_sim(sims, legacy_sims):
+    import season_sim
+    idx = season_sim.league()[0]
+    ratings, sched = synth.season()
+    played, remaining = season_sim.season_games(sched.assign(home_score=np.nan, away_score=np.nan), 2030)
+    base = season_sim.record(played, idx)
+    print(f"sim: {len(remaining)} games x {sims:,} sims, chunk 20,000")
+
+    counts, t_new = _timeit(season_sim.simulate, ratings, remaining, base, sims, 20_000, 1)
+    _, t_sum = _timeit(season_sim.summarize, counts, ratings, base)
+    _, t_old = _timeit(legacy.division_odds, ratings, remaining, legacy_sims)
+
+    played, remaining = season_sim.season_games(sched, 2030, week=10)
+    base = season_sim.record(played, idx)
+    _, t_upd = _timeit(season_sim.simulate, ratings, remaining, base, sims, 20_000, 1, True)
+    table = [{"run": f"per-season loop ({legacy_sims:,} sims, division odds only)", "seconds": t_old,
+              "sims_per_s": legacy_sims / t_old},
+             {"run": f"vectorized, fixed ratings ({sims:,})", "seconds": t_new, "sims_per_s": sims / t_new},
+             {"run": f"vectorized, Elo updating, weeks 10-17 ({sims:,})", "seconds": t_upd, "sims_per_s": sims / t_upd}]
+    print(pd.DataFrame(table).to_string(index=False, float_format=lambda x: f"{x:,.2f}"))
+    print(f"  summarize: {t_sum * 1000:.1f} ms")
+
+
+# ---------- predict: array Elo predictions + one-pass odds parsing vs apply / bracket scanner ----------
+def bench_predict(rows, legacy_max, odds_games):
+    import make_predictions_from_elo as mp
+    print(f"predict: matchups {rows} | odds payload {odds_games:,} events")
+    table = []
+    for n in rows:
+        games = synth.odds_games(n)
+        def new_path(g):
+            g = g.copy()
+            for c, v in mp.predict(g["home_elo"], g["away_elo"]).items():
+                g[c] = v
+            return mp.team_rows(g)
+        _, t_new = _timeit(new_path, games)
+        t_old = _timeit(legacy.predictions, games)[1] if n <= legacy_max else np.nan
+        table.append({"step": f"predict + team rows ({n:,} games)", "legacy_s": t_old, "new_s": t_new,
+                      "new_ns_per_matchup": t_new / n * 1e9})
+
+    elo_map = dict(zip([f"T{i:02d}" for i in range(32)], np.random.default_rng(1).normal(1500, 80, 32)))
+    m, t_m = _timeit(mp.matchup_matrix, elo_map)
+    table.append({"step": f"matchup_matrix ({len(m)} pairs)", "legacy_s": np.nan, "new_s": t_m,
+                  "new_ns_per_matchup": t_m / len(m) * 1e9})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        f = os.path.join(tmp, "odds.json")
+        with open(f, "w", encoding="utf-8") as fh:
+            fh.write(synth.odds_payload(odds_games))
+        _, t_new = _timeit(mp.load_odds, f)
+        old, t_old = _timeit(legacy.load_odds, f)
+        table.append({"step": f"load_odds JSON ({odds_games:,} events)", "legacy_s": t_old, "new_s": t_new,
+                      "new_ns_per_matchup": t_new / odds_games * 1e9})
+        c = os.path.join(tmp, "odds.csv")
+        old.to_csv(c, index=False)
+        _, t_csv = _timeit(mp.load_odds, c)
+        table.append({"step": f"load_odds CSV ({odds_games:,} events)", "legacy_s": np.nan, "new_s": t_csv,
+                      "new_ns_per_matchup": t_csv / odds_games * 1e9})
+    print(pd.DataFrame(table).to_string(index=False, float_format=lambda x: f"{x:,.4f}"))
+
+
+# ---------- pages: site_data column-wise read_df vs the per-row apply versions ----------
+def bench_pages(rows):
+    import build_consensus_page, build_top_picks, build_stamp, site_data
+    table = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in rows:
+            f = os.path.join(tmp, f"merged_{n}.csv")
+            synth.merged_props(n).to_csv(f, index=False)
+            print(f"pages: {n:,}-row merged CSV")
+            for consensus in (False, True):
+                _, t_old = _timeit(legacy.page_df, f, consensus)
+                _, t_new = _timeit(site_data.read_df, f, ["price"] if consensus else ["price", "model_line", "point", "line"])
+                what = "consensus" if consensus else "top picks"
+                table.append({"rows": n, "step": f"{what} read_df", "legacy_s": t_old, "new_s": t_new,
+                              "speedup": t_old / t_new})
+
+            page = os.path.join(tmp, "top.html")
+            build_stamp.STAMP_DIR = Path(tmp) / "stamps"
+            argv = sys.argv
+            for name, mod, extra in (("build_top_picks", build_top_picks, []),
+                                     ("build_consensus_page", build_consensus_page, [])):
+                sys.argv = [name, "--merged_csv", f, "--out", page, "--force"] + extra
+                try:
+                    _, t_page = _timeit(mod.main)
+                finally:
+                    sys.argv = argv
+                table.append({"rows": n, "step": f"{name}.main (read + render)", "legacy_s": np.nan,
+                              "new_s": t_page, "speedup": np.nan})
+    print(pd.DataFrame(table).to_string(index=False, float_format=lambda x: f"{x:,.3f}"))
+
+
+# ---------- render: streamed Jinja2 pages vs building the whole page string ----------
+_RENDER_CHILD = """
+import json, resource, sys, time
+from pathlib import Path
+import site_templates as st
+mod, mode, argv = sys.argv[1], sys.argv[2], sys.argv[3:]
+if mode == "string":
+    # the old shape: every row rendered up front, then the whole page held as one string
+    def write_page(out, name, **ctx):
+        ctx = {k: (list(v) if k in ("cards", "rows") else v) for k, v in ctx.items()}
+        Path(out).write_text(st.render(name, **ctx), encoding="utf-8")
+    st.write_page = write_page
+m = __import__(mod)
+sys.argv = [mod] + argv
+t0 = time.perf_counter(); m.main(); dt = time.perf_counter() - t0
+print(json.dumps({"s": dt, "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}))
+"""
+
+def _render_child(mod, mode, argv):
+    """Run mod.main() in a fresh interpreter; (seconds, peak RSS MB) of that process."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, SITE_STAMP_DIR=os.path.join(os.path.dirname(argv[argv.index("--out") + 1]), "stamps"))
+    out = subprocess.run([sys.executable, "-c", _RENDER_CHILD, mod, mode] + argv + ["--force"], cwd=here, env=env,
+                         check=True, capture_output=True, text=True).stdout
+    res = json.loads(out.strip().splitlines()[-1])
+    return res["s"], res["rss_mb"]
+
+def bench_render(cards):
+    from build_top_picks import CARD_LIMIT
+    table = []
+    with tempfile.TemporaryDirectory() as tmp:
+        f = os.path.join(tmp, "merged.csv")
+        synth.merged_props(int(cards * 1.2)).to_csv(f, index=False)  # dedupe drops a few rows
+        print(f"render: {cards:,} cards requested (CARD_LIMIT={CARD_LIMIT:,})")
+        for mod in ("build_top_picks", "build_consensus_page"):
+            for mode in ("string", "stream"):
+                page = os.path.join(tmp, mode, f"{mod}.html")
+                t, rss = _render_child(mod, mode, ["--merged_csv", f, "--out", page, "--limit", str(cards)])
+                data = os.path.splitext(page)[0] + ".json"  # top picks: cards live in the JSON payload
+                table.append({"page": mod, "mode": mode, "s": t, "peak_rss_mb": rss,
+                              "html_mb": os.path.getsize(page) / 2**20,
+                              "data_mb": os.path.getsize(data) / 2**20 if os.path.exists(data) else np.nan})
+    print(pd.DataFrame(table).to_string(index=False, float_format=lambda x: f"{x:,.2f}"))
+
+
+# ---------- site: postprocess_site asset extraction / precompression / publish churn ----------
+def bench_site(rows):
+    import shutil
+    import build_site, build_stamp, postprocess_site as ps
+    here = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory() as tmp:
+        f = os.path.join(tmp, "merged.csv")
+        m = synth.merged_props(rows)
+        m.assign(market_std=m["market"], model_prob=np.random.default_rng(0).uniform(0.05, 0.95, rows),
+                 model_price=np.nan).to_csv(f, index=False)
+        docs = os.path.join(tmp, "docs")
+        if os.path.isdir(os.path.join(here, "..", "docs")):
+            shutil.copytree(os.path.join(here, "..", "docs"), docs)  # static index / methods pages
+        build_stamp.STAMP_DIR = Path(tmp) / "stamps"
+
+        def snapshot():
+            return {p: open(p, "rb").read() for p in (str(x) for x in Path(docs).rglob("*") if x.is_file())}
+
+        table = []
+        for step, force in (("first publish", False), ("rebuild, same inputs", False), ("rebuild --force", True)):
+            before = snapshot()
+            built, t_build = _timeit(build_site.build, f, docs, week=7, force=force)
+            st, t_post = _timeit(ps.postprocess, docs)
+            after = snapshot()
+            churn = sum(1 for p, b in after.items() if before.get(p) != b) + sum(1 for p in before if p not in after)
+            table.append({"step": step, "pages_built": len(built), "build_s": t_build, "post_s": t_post,
+                          "files_changed": churn, "site_raw_kb": st["raw_bytes"] / 1024,
+                          "gzip_kb": st["gz_bytes"] / 1024, "brotli_kb": st["br_bytes"] / 1024})
+        print(f"site: {rows:,}-row merged CSV")
+    print(pd.DataFrame(table).to_string(index=False, float_format=lambda x: f"{x:,.2f}"))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Timings for the vectorized pipeline code vs the code it replaced.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("devig", help="devig.py vs the old groupby().apply de-vig")
+    p.add_argument("--rows", nargs="+", type=int, default=[10_000, 100_000, 1_000_000])
+    p.add_argument("--legacy_max", type=int, default=100_000, help="Skip the slow legacy path above this size")
+    p = sub.add_parser("kernels", help="prob_kernels.py vs the old per-row odds/probability helpers")
+    p.add_argument("--rows", nargs="+", type=int, default=[1_000_000])
+    p.add_argument("--legacy_max", type=int, default=1_000_000, help="Skip the slow legacy path above this size")
+    p = sub.add_parser("rolling", help="rolling_features.py vs the old per-column groupby lambdas")
+    p.add_argument("--player_csv", default="data/weekly_player_stats.csv", help="Falls back to synthetic data if missing")
+    p.add_argument("--lookbacks", nargs="+", type=int, default=[1, 3, 5])
+    p = sub.add_parser("incremental", help="feature_store weekly appends vs a full rebuild")
+    p.add_argument("--player_csv", default="data/weekly_player_stats.csv", help="Falls back to synthetic data if missing")
+    p.add_argument("--lookbacks", nargs="+", type=int, default=[1, 3, 5])
+    p.add_argument("--weeks", type=int, default=2, help="Trailing weeks appended one refresh at a time")
+    p = sub.add_parser("params", help="make_player_prop_params build_params / anytime TD vs the old row loops")
+    p.add_argument("--players", nargs="+", type=int, default=[1_500, 15_000], help="~1,500 on a full slate")
+    p = sub.add_parser("partitions", help="pull-script partitioned upserts vs the old read-everything append")
+    p.add_argument("--weeks", type=int, default=3, help="Trailing weeks appended one pull at a time")
+    p = sub.add_parser("team_features", help="team_features.py groupby aggregation vs a per-game loop")
+    p.add_argument("--seasons", type=int, default=10, help="Synthetic seasons for build() / join timings")
+    p.add_argument("--check_seasons", type=int, default=2, help="Seasons also run through the slow reference")
+    p = sub.add_parser("elo", help="elo.py weekly-batched engine vs the old per-game iterrows loop")
+    p.add_argument("--schedules", default="data/nfl_supplemental/schedules.parquet", help="Falls back to synthetic data if missing")
+    p = sub.add_parser("sim", help="season_sim.py chunked simulator vs a per-season Python loop")
+    p.add_argument("--sims", type=int, default=100_000)
+    p.add_argument("--legacy_sims", type=int, default=2_000)
+    p = sub.add_parser("predict", help="make_predictions_from_elo array predictions / odds parsing vs apply + scanner")
+    p.add_argument("--rows", nargs="+", type=int, default=[16, 10_000, 1_000_000])
+    p.add_argument("--legacy_max", type=int, default=100_000, help="Skip the slow legacy path above this size")
+    p.add_argument("--odds_games", type=int, default=5_000, help="Events in the synthetic Odds API payload")
+    p = sub.add_parser("pages", help="site_data column-wise read_df vs the old per-row page-builder applies")
+    p.add_argument("--rows", nargs="+", type=int, default=[10_000, 100_000])
+    p = sub.add_parser("render", help="site_templates streamed pages vs whole-page strings: time + peak RSS")
+    p.add_argument("--cards", type=int, default=25_000, help="Rows rendered per page (top picks CARD_LIMIT)")
+    p = sub.add_parser("site", help="build_site + postprocess_site: build time, page weight, files changed per publish")
+    p.add_argument("--rows", type=int, default=30_000)
+    args = ap.parse_args()
+
+    if args.cmd == "devig":
+        bench_devig(args.rows, args.legacy_max)
+    elif args.cmd == "kernels":
+        bench_kernels(args.rows, args.legacy_max)
+    elif args.cmd == "rolling":
+        bench_rolling(args.player_csv, args.lookbacks)
+    elif args.cmd == "incremental":
+        bench_incremental(args.player_csv, args.lookbacks, args.weeks)
+    elif args.cmd == "params":
+        bench_params(args.players)
+    elif args.cmd == "partitions":
+        bench_partitions(args.weeks)
+    elif args.cmd == "team_features":
+        bench_team_features(args.seasons, args.check_seasons)
+    elif args.cmd == "elo":
+        bench_elo(args.schedules)
+    elif args.cmd == "sim":
+        bench_sim(args.sims, args.legacy_sims)
+    elif args.cmd == "predict":
+        bench_predict(args.rows, args.legacy_max, args.odds_games)
+    elif args.cmd == "pages":
+        bench_pages(args.rows)
+    elif args.cmd == "render":
+        bench_render(args.cards)
+    elif args.cmd == "site":
+        bench_site(args.rows)
+
+if __name__ == "__main__":
+    main()
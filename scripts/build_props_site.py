@@ -2,7 +2,6 @@
 import argparse, json
 import pandas as pd
 import numpy as np
-from html import escape
 from site_common import nav_html, pretty_market, fmt_odds, fmt_pct, to_kick_et
 
 # ---------- helpers ----------
@@ -18,6 +17,11 @@ from site_common import (
     nav_html, pretty_market,
     fmt_odds, to_kick_et
 )
+from site_data import per_unique, american_to_prob
+import prob_kernels
+from prob_kernels import prob_to_american as _prob_to_american_arr
+import site_templates
+from build_stamp import Stamp
 
 
 def prob_to_american(p):
@@ -61,65 +65,8 @@ def kickoff_et_series(commence_series):
         time_part = f"{hour12}" if minute == 0 else f"{hour12}:{minute:02d}"
         out.append(f"{dow} {time_part} {ampm}")
     return pd.Series(out, index=commence_series.index)
-# ---- Row helpers + renderer (PLACE THIS BELOW TEMPLATE) ----
-import math, html
-from site_common import to_kick_et  # you already import this at the top
-
-def _fmt_point(v):
-    try:
-        if v is None or (isinstance(v, float) and math.isnan(v)):
-            return ""
-        x = float(v)
-        return str(int(x)) if x.is_integer() else f"{x:g}"
-    except Exception:
-        return str(v) if v is not None else ""
-
-def row_html(r):
-    # Game (Away @ Home)
-    game = f"{html.escape(str(r.get('away_team','')))} @ {html.escape(str(r.get('home_team','')))}"
-
-    # Bet = market (pretty) + line
-    line_raw = r.get("line_disp") if r.get("line_disp") not in (None, "") else r.get("point")
-    line_str = _fmt_point(line_raw)
-    market_disp = str(r.get("market_disp",""))
-    bet = market_disp or str(r.get("market",""))
-    market_with_line = f"{bet} {line_str}".strip()
-
-    # Odds, Fair, percents, edge vs market
-    mkt_odds = r.get("price_disp", "")
-    fair     = r.get("model_price")
-    fair_str = "" if fair in (None,"") or (isinstance(fair,float) and math.isnan(fair)) else f"{int(fair):+d}"
-
-    mkt_pct   = r.get("mkt_prob_pct","")
-    model_pct = r.get("model_prob_pct","")
-    edge_bps  = r.get("edge_bps_mkt")
-    edge_str  = "" if edge_bps is None or (isinstance(edge_bps, float) and math.isnan(edge_bps)) else str(int(edge_bps))
-
-    # Kick (ET)
-    kick_iso  = r.get("kick_et") or r.get("commence_time") or ""
-    kick_disp = to_kick_et(str(kick_iso)) if kick_iso else ""
-
-    return (
-        "<tr>"
-        f"<td>{game}</td>"
-        f"<td>{html.escape(str(r.get('player','')))}</td>"
-        f"<td>{html.escape(str(r.get('bookmaker','')))}</td>"
-        f"<td>{html.escape(market_with_line)}</td>"
-        f"<td>{html.escape(line_str)}</td>"
-        f"<td>{mkt_odds}</td>"
-        f"<td>{fair_str}</td>"
-        f"<td>{html.escape(str(mkt_pct))}</td>"
-        f"<td>{html.escape(str(model_pct))}</td>"
-        f"<td>{edge_str}</td>"
-        f"<td>{html.escape(kick_disp)}</td>"
-        "</tr>"
-    )
-
 # ---------- main ----------
-def main():
-    import json
-    from html import escape
-
+def parse_args(argv=None):
     ap = argparse.ArgumentParser()
     ap.add_argument("--merged_csv", required=True)
     ap.add_argument("--out", required=True)
@@ -128,7 +75,19 @@ def main():
     ap.add_argument("--limit", type=int, default=3000, help="Max rows to render")
     ap.add_argument("--drop_no_scorer", action="store_true", default=True, help="Hide 'No Scorer' rows")
     ap.add_argument("--show_unmodeled", action="store_true", help="Include rows with missing model_prob")
-    args = ap.parse_args()
+    ap.add_argument("--force", action="store_true", help="Rebuild even if inputs match the last build")
+    return ap.parse_args(argv)
+
+def stamp(args):
+    """Build stamp: merged CSV + args + this script, props.html.j2 and the shared page helpers."""
+    return Stamp(args.out, [args.merged_csv], vars(args), [__file__, prob_kernels.__file__] + site_templates.sources("props.html.j2"))
+
+def main(argv=None):
+    args = parse_args(argv)
+    st = stamp(args)
+    if not args.force and st.fresh():
+        print(f"[props_site] {args.out} up to date (inputs unchanged)")
+        return False
 
     # Load
     df0 = pd.read_csv(args.merged_csv, low_memory=False)
@@ -140,7 +99,7 @@ def main():
             df0[c] = np.nan
 
     # Pretty market label available if you want it later
-    df0["market_disp"] = df0["market"].map(pretty_market) if "market" in df0.columns else ""
+    df0["market_disp"] = per_unique(df0["market"], pretty_market) if "market" in df0.columns else ""
 
     # Drop "No Scorer" if requested
     if args.drop_no_scorer and "player" in df0.columns:
@@ -152,33 +111,18 @@ def main():
     df0["game"] = (df0["away_team"] + " @ " + df0["home_team"]).str.strip()
 
     # Odds display
-    df0["mkt_odds"] = df0["price"].map(fmt_odds)
+    df0["mkt_odds"] = per_unique(df0["price"], fmt_odds)
 
     # Fair odds (prefer model_price, else from model_prob)
-    def _prob_to_american(p):
-        try:
-            p = float(p)
-        except Exception:
-            return np.nan
-        if not (0 < p < 1):
-            return np.nan
-        return int(round(-100*p/(1-p))) if p >= 0.5 else int(round(100*(1-p)/p))
-
     if "model_price" in df0.columns and df0["model_price"].notna().any():
-        df0["fair_odds"] = df0["model_price"].map(fmt_odds)
+        df0["fair_odds"] = per_unique(df0["model_price"], fmt_odds)
     else:
-        df0["fair_odds"] = df0["model_prob"].apply(_prob_to_american).map(fmt_odds)
+        fair = _prob_to_american_arr(pd.to_numeric(df0["model_prob"], errors="coerce"), rounded=True)
+        df0["fair_odds"] = per_unique(pd.Series(fair, index=df0.index), fmt_odds)
 
     # Percentages
-    def _american_to_prob(o):
-        try:
-            o = float(o)
-        except Exception:
-            return np.nan
-        return (100.0/(o+100.0)) if o > 0 else (abs(o)/(abs(o)+100.0))
-
-    df0["mkt_prob"]  = df0["price"].apply(_american_to_prob)
-    df0["mkt_pct"]   = df0["mkt_prob"].map(fmt_pct)
+    df0["mkt_prob"]  = american_to_prob(df0["price"])
+    df0["mkt_pct"]   = per_unique(df0["mkt_prob"], fmt_pct)
     df0["model_pct"] = df0["model_prob"].map(fmt_pct)
 
     # Edge vs market implied (bps)
@@ -193,10 +137,10 @@ def main():
             return str(int(xf)) if float(int(xf)) == xf else f"{xf:g}"
         except Exception:
             return str(x) if x is not None else ""
-    df0["line_disp"] = df0["point"].apply(_fmt_point)
+    df0["line_disp"] = per_unique(df0["point"], _fmt_point)
 
     # Kickoff, formatted to ET
-    df0["kick_et"] = df0["commence_time"].astype(str).map(to_kick_et)
+    df0["kick_et"] = per_unique(df0["commence_time"].astype(str), to_kick_et)
 
     # Filter modeled if requested
     df = df0.copy()
@@ -223,158 +167,14 @@ def main():
         if c not in df.columns:
             df[c] = ""
     records = json.loads(df[keep].to_json(orient="records"))
-    jsdata = json.dumps(records)  # safe literal
-
-    title_html = escape(args.title)
-
-    # -------- HTML shell (your client-side renderer) --------
-    html = """<!doctype html>
-<html>
-<head>
-<meta charset="utf-8"><meta name="viewport" content="width=device-width,initial-scale=1">
-<title>""" + title_html + """</title>
-<style>
-:root { --bg:#0b0b10; --card:#14141c; --muted:#9aa0a6; --text:#e8eaed; --border:#23232e }
-*{box-sizing:border-box} body{margin:0;padding:24px;background:var(--bg);color:var(--text);
-font-family:ui-sans-serif,system-ui,-apple-system,Segoe UI,Roboto,Helvetica,Arial}
-h1{margin:0 0 8px;font-size:22px;font-weight:700;letter-spacing:.2px}
-.small{color:var(--muted);font-size:12px;margin-bottom:16px}
-.card{background:linear-gradient(180deg,rgba(255,255,255,.03),rgba(255,255,255,0));
-border:1px solid var(--border);border-radius:16px;padding:16px;margin-bottom:16px;
-box-shadow:0 0 0 1px rgba(255,255,255,.02),0 12px 40px rgba(0,0,0,.35)}
-.controls{display:grid;grid-template-columns:repeat(5,minmax(0,1fr));gap:10px}
-select,input{background:var(--card);color:var(--text);border:1px solid var(--border);
-border-radius:10px;padding:10px 12px;outline:none}
-.select:focus,input:focus{border-color:#6ee7ff;box-shadow:0 0 0 3px rgba(110,231,255,.15)}
-.badge{display:inline-block;padding:4px 8px;border-radius:999px;font-size:12px;color:#111;background:#6ee7ff}
-.table-wrap{overflow:auto;border:1px solid var(--border);border-radius:14px}
-table{border-collapse:collapse;width:100%;min-width:1000px}
-th,td{padding:10px 12px;border-bottom:1px solid var(--border)}
-th{text-align:left;position:sticky;top:0;background:var(--card);z-index:1;font-size:12px;color:var(--muted);letter-spacing:.2px}
-td.num{text-align:right;font-variant-numeric:tabular-nums}
-tr:hover td{background:rgba(255,255,255,.02)}
-footer{color:var(--muted);font-size:12px;margin-top:16px}
-a.button{display:inline-block;margin:8px 0;padding:8px 14px;border-radius:10px;text-decoration:none;font-weight:600;color:#111;background:#a78bfa;border:1px solid var(--border)}
-a.button:hover{background:#6ee7ff}
-.linklike{color:#a78bfa;text-decoration:none;border-bottom:1px dotted #a78bfa}
-</style>
-</head>
-<body>
-
-  <div class="card">
-    <h1>""" + title_html + """</h1>
-    <div class="small">Select <span class="badge">Bet</span> → Game → Player. Optional: Book & search. Sorted by Edge (bps). Line = sportsbook threshold.</div>
-    <p><a href="../" class="button">⬅ Back to Home</a> · <a class="linklike" href="./consensus.html">Consensus</a></p>
-
-    <div class="controls">
-      <select id="market"><option value="">Bet (market)</option></select>
-      <select id="game"><option value="">Game</option></select>
-      <select id="player"><option value="">Player</option></select>
-      <select id="book"><option value="">Book</option></select>
-      <input id="q" type="search" placeholder="Search player / team / book…" />
-    </div>
-
-    <div class="small" style="margin-top:10px;">
-      <span id="count"></span> · Tip: “No Scorer” is hidden.
-      <span style="float:right;"><a class="linklike" href="../">Back to site root</a></span>
-    </div>
-  </div>
-
-  <div class="card table-wrap">
-    <table id="tbl">
-      <thead>
-        <tr>
-          <th>Game</th><th>Player</th><th>Book</th><th>Bet</th>
-          <th class="num">Line</th>
-          <th class="num">Mkt Odds</th><th class="num">Fair</th>
-          <th class="num">Mkt %</th><th class="num">Model %</th>
-          <th class="num">Edge (bps)</th><th>Kick (ET)</th>
-        </tr>
-      </thead>
-      <tbody></tbody>
-    </table>
-  </div>
-
-  <footer>Generated locally. Dark theme, zero dependencies.</footer>
-
-<script>
-const DATA = """ + jsdata + """;
-
-function uniq(arr){ return [...new Set(arr.filter(Boolean))].sort((a,b)=>a.localeCompare(b)); }
-
-const state = { market:"", game:"", player:"", book:"", q:"" };
-const selMarket = document.getElementById("market");
-const selGame   = document.getElementById("game");
-const selPlayer = document.getElementById("player");
-const selBook   = document.getElementById("book");
-const inputQ    = document.getElementById("q");
-const tbody     = document.querySelector("#tbl tbody");
-const countEl   = document.getElementById("count");
-
-function hydrateSelectors(){
-  uniq(DATA.map(r=>r.market_std)).forEach(v=>{ const o=document.createElement("option"); o.value=v; o.textContent=v; selMarket.appendChild(o); });
-  uniq(DATA.map(r=>r.bookmaker)).forEach(v=>{ const o=document.createElement("option"); o.value=v; o.textContent=v; selBook.appendChild(o); });
-  rebuildDependentSelectors();
-}
-function rebuildDependentSelectors(){
-  const base = DATA.filter(r => (!state.market || r.market_std===state.market) &&
-                                (!state.book   || r.bookmaker===state.book));
-  const games = uniq(base.map(r=>r.game));
-  selGame.innerHTML = '<option value="">Game</option>' + games.map(g=>`<option value="${g}">${g}</option>`).join("");
-  if (games.includes(state.game)) selGame.value = state.game; else state.game = "";
-
-  const base2 = base.filter(r => (!state.game || r.game===state.game));
-  const players = uniq(base2.map(r=>r.player));
-  selPlayer.innerHTML = '<option value="">Player</option>' + players.map(p=>`<option value="${p}">${p}</option>`).join("");
-  if (players.includes(state.player)) selPlayer.value = state.player; else state.player = "";
-}
-
-function render(){
-  const q = state.q.trim().toLowerCase();
-  const rows = DATA.filter(r =>
-    (!state.market || r.market_std===state.market) &&
-    (!state.game   || r.game===state.game) &&
-    (!state.player || r.player===state.player) &&
-    (!state.book   || r.bookmaker===state.book) &&
-    (!q || (r.player+" "+r.bookmaker+" "+r.game).toLowerCase().includes(q))
-  ).sort((a,b)=> (b.edge_bps ?? -1) - (a.edge_bps ?? -1));
-
-  countEl.textContent = rows.length + " rows";
-
-  tbody.innerHTML = rows.map(r => `
-    <tr>
-      <td>${r.game||""}</td>
-      <td>${r.player||""}</td>
-      <td>${r.bookmaker||""}</td>
-      <td>${r.market_std||""}</td>
-      <td class="num">${r.line_disp ?? ""}</td>
-      <td class="num">${r.mkt_odds ?? ""}</td>
-      <td class="num">${r.fair_odds ?? ""}</td>
-      <td class="num">${r.mkt_pct ?? ""}</td>
-      <td class="num">${r.model_pct ?? ""}</td>
-      <td class="num" style="color:${
-        (r.edge_bps==null) ? "#9aa0a6" : (r.edge_bps>0 ? "#4ade80" : "#f87171")
-      }">${r.edge_bps ?? ""}</td>
-      <td>${r.kick_et||""}</td>
-    </tr>
-  `).join("");
-}
-
-selMarket.addEventListener("change", e=>{ state.market=e.target.value; rebuildDependentSelectors(); render(); });
-selGame  .addEventListener("change", e=>{ state.game  =e.target.value; rebuildDependentSelectors(); render(); });
-selPlayer.addEventListener("change", e=>{ state.player=e.target.value; render(); });
-selBook  .addEventListener("change", e=>{ state.book  =e.target.value; rebuildDependentSelectors(); render(); });
-inputQ   .addEventListener("input",  e=>{ state.q     =e.target.value; render(); });
-
-hydrateSelectors(); render();
-</script>
-</body></html>
-"""
 
-    with open(args.out, "w", encoding="utf-8") as f:
-        f.write(html)
+    # DATA is streamed into the page as iterencode() chunks (templates/props.html.j2)
+    site_templates.write_page(args.out, "props.html.j2", title=args.title,
+                              data=json.JSONEncoder().iterencode(records))
 
     print(f"[props_site] wrote {args.out} with {len(df)} rows (from {len(df0)} source rows)")
+    st.save()
+    return True
 
 if __name__ == "__main__":
     main()
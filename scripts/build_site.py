@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# scripts/build_site.py
+"""
+Build the props pages (Props, Top Picks, Consensus) from one merged CSV.
+
+Every builder has a build stamp (build_stamp.py: merged CSV + args + builder,
+template and shared helper source). The stamps are checked here first; pages
+whose inputs match their last build are skipped without reading the CSV, and
+only the stale ones run, concurrently in one process pool. A no-op rebuild is
+just the stamp checks.
+
+Usage:
+  python3 scripts/build_site.py --merged_csv data/props/props_with_model_week7.csv --week 7
+  python3 scripts/build_site.py --merged_csv ... --week 7 --only top --force
+"""
+import argparse, importlib, os, time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# name -> (builder module, page under --docs, title with {week} or None for the builder default)
+PAGES = {
+    "props":     ("build_props_site",     "props/index.html",     "NFL-2025 — Player Props (Week {week})"),
+    "top":       ("build_top_picks",      "props/top.html",       None),
+    "consensus": ("build_consensus_page", "props/consensus.html", "NFL-2025 — Consensus vs Best Book (Week {week})"),
+}
+
+
+def page_argv(name: str, merged_csv: str, docs: str, week, force: bool) -> list:
+    _, page, title = PAGES[name]
+    argv = ["--merged_csv", merged_csv, "--out", os.path.join(docs, page)]
+    if title and week is not None:
+        argv += ["--title", title.format(week=week)]
+    return argv + (["--force"] if force else [])
+
+def _run(module: str, argv: list) -> float:
+    t0 = time.perf_counter()
+    importlib.import_module(module).main(argv)
+    return time.perf_counter() - t0
+
+def build(merged_csv: str, docs="docs", week=None, only=None, force=False, workers: int = 0) -> list:
+    """Rebuild the stale pages; returns the names that were built."""
+    t0 = time.perf_counter()
+    jobs = {}
+    for name in only or PAGES:
+        module, page, _ = PAGES[name]
+        argv = page_argv(name, merged_csv, docs, week, force)
+        mod = importlib.import_module(module)
+        if not force and mod.stamp(mod.parse_args(argv)).fresh():
+            print(f"[site] {page}: up to date")
+            continue
+        jobs[name] = (module, argv)
+
+    if len(jobs) == 1 or workers == 1:
+        for name, (module, argv) in jobs.items():
+            print(f"[site] built {name} ({_run(module, argv):.1f}s)")
+    elif jobs:
+        with ProcessPoolExecutor(max_workers=min(len(jobs), workers or os.cpu_count() or 1)) as pool:
+            futs = {pool.submit(_run, module, argv): name for name, (module, argv) in jobs.items()}
+            for fut in as_completed(futs):
+                print(f"[site] built {futs[fut]} ({fut.result():.1f}s)")
+    print(f"[site] {len(jobs)}/{len(only or PAGES)} pages rebuilt in {time.perf_counter() - t0:.2f}s")
+    return list(jobs)
+
+def main():
+    ap = argparse.ArgumentParser(description="Incremental, parallel build of the props pages.")
+    ap.add_argument("--merged_csv", required=True)
+    ap.add_argument("--docs", default="docs")
+    ap.add_argument("--week", type=int, default=None, help="Week number for the page titles")
+    ap.add_argument("--only", nargs="+", choices=list(PAGES), default=None)
+    ap.add_argument("--force", action="store_true", help="Rebuild every page regardless of stamps")
+    ap.add_argument("--workers", type=int, default=0, help="Process pool size (0 = one per stale page, up to cores)")
+    args = ap.parse_args()
+    build(args.merged_csv, args.docs, args.week, args.only, args.force, args.workers)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# scripts/build_stamp.py
+"""
+Input fingerprints for the site page builders.
+
+A page's stamp key is sha256 over
+  its input files (the merged CSV) + the CLI args that shape the page
+  + the source of the builder, its shared helpers and its template
+  + STAMP_VERSION
+and is stored under data/cache/site/<output path>.json. If the key matches the last
+build and every output still exists, the builder exits without reading the CSV.
+
+Hashing a big CSV is the only real cost, so a file whose (size, mtime) match the
+previous stamp reuses the recorded sha256 instead of being read again.
+
+Usage:
+  st = Stamp(args.out, inputs=[args.merged_csv], args=vars(args), sources=[__file__, ...])
+  if not args.force and st.fresh(): return
+  ...build...
+  st.save()
+"""
+import hashlib, json, os, pathlib
+
+STAMP_VERSION = 1
+STAMP_DIR = pathlib.Path(os.getenv("SITE_STAMP_DIR", "data/cache/site"))
+IGNORED_ARGS = {"force"}
+
+
+def file_sha256(path, prev: dict = None) -> dict:
+    """{"size", "mtime_ns", "sha256"} for path; reuses prev's sha256 when size and mtime match."""
+    st = os.stat(path)
+    if prev and prev.get("size") == st.st_size and prev.get("mtime_ns") == st.st_mtime_ns:
+        return prev
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": h.hexdigest()}
+
+
+class Stamp:
+    def __init__(self, out, inputs, args: dict, sources, outputs=None):
+        self.outputs = [str(p) for p in (outputs or [out])]
+        self.path = STAMP_DIR / (pathlib.Path(out).as_posix().strip("/").replace("/", "__") + ".json")
+        try:
+            self.prev = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            self.prev = {}
+        prev_files = self.prev.get("files", {})
+        self.files = {str(p): file_sha256(p, prev_files.get(str(p))) for p in list(inputs) + list(sources)}
+        spec = {
+            "version": STAMP_VERSION,
+            "args": {k: v for k, v in sorted(args.items()) if k not in IGNORED_ARGS},
+            "inputs": {str(p): self.files[str(p)]["sha256"] for p in inputs},
+            "sources": {pathlib.Path(p).name: self.files[str(p)]["sha256"] for p in sources},
+        }
+        self.key = hashlib.sha256(json.dumps(spec, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def fresh(self) -> bool:
+        """Same inputs / args / sources as the last build and every output still on disk."""
+        return self.prev.get("key") == self.key and all(os.path.exists(p) for p in self.outputs)
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"key": self.key, "outputs": self.outputs, "files": self.files}, indent=1))
+        os.replace(tmp, self.path)
@@ -1,6 +1,7 @@
 # scripts/build_td_edges_page.py
 #!/usr/bin/env python3
 import argparse, pandas as pd, numpy as np
+from site_data import per_unique
 
 def fmt_odds(o):
     if pd.isna(o): return ""
@@ -28,9 +29,9 @@ def main():
     df["model_pct"] = (df["model_prob"] * 100).round(1)
     df["mkt_pct"]   = (df["market_prob"] * 100).round(1)
     if "price" in df.columns:
-        df["mkt_odds"] = df["price"].apply(fmt_odds)
+        df["mkt_odds"] = per_unique(df["price"], fmt_odds)
     if "model_price" in df.columns:
-        df["fair_odds"] = df["model_price"].apply(lambda x: "" if pd.isna(x) else f"{int(round(x)):+d}")
+        df["fair_odds"] = per_unique(df["model_price"], lambda x: "" if pd.isna(x) else f"{int(round(x)):+d}")
 
     keep = [c for c in [
         "home_team","away_team","player","bookmaker","mkt_odds","fair_odds","mkt_pct","model_pct","edge_bps",
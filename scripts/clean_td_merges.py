@@ -3,17 +3,7 @@
 import argparse, re
 import pandas as pd
 import numpy as np
-
-def prob_to_american(p):
-    p = float(p)
-    if p <= 0 or p >= 1 or np.isnan(p):
-        return np.nan
-    return -100 * p/(1-p) if p >= 0.5 else 100 * (1-p)/p
-
-def american_to_prob(odds):
-    if pd.isna(odds): return np.nan
-    o = float(odds)
-    return (100/(-o+100)) if o<0 else (100/(o+100))
+from prob_kernels import american_to_prob, prob_to_american
 
 def keyify(s: str) -> str:
     s = (s or "").strip().lower()
@@ -60,13 +50,13 @@ def main():
 
     # Compute market implied prob & edge if not present
     if "market_prob" not in df.columns:
-        df["market_prob"] = df["price"].map(american_to_prob)
+        df["market_prob"] = american_to_prob(df["price"])
 
     if "model_prob" not in df.columns:
         df["model_prob"] = np.nan  # should exist; just in case
 
     # Fair price from model prob
-    df["model_price"] = df["model_prob"].map(prob_to_american)
+    df["model_price"] = prob_to_american(df["model_prob"])
 
     # Simple edge metric: model - market probability (positive = value)
     df["edge_prob"] = df["model_prob"] - df["market_prob"]
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# scripts/devig.py
+"""
+Vectorized two-way de-vig for player props (Over/Under legs).
+
+Everything is group codes + array reductions (no per-group Python):
+  - book_fair_probs : per (leg, book) — first Over vs first Under row
+  - cons_fair_probs : per leg across books — summed inverse decimal odds
+
+Methods (q_i = 1/decimal_odds, S = q_over + q_under):
+  proportional : p_i = q_i / S                              (default; matches the old apply)
+  additive     : p_i = q_i - (S - 1) / 2, clipped to [0, 1]
+  power        : p_i = q_i ** k with k solved so that sum p_i = 1
+  shin         : Shin (1993) insider-trading model, z solved per leg
+"""
+import numpy as np
+import pandas as pd
+
+METHODS = ("proportional", "additive", "power", "shin")
+
+_BISECT_ITERS = 60
+
+
+# ---------- two-way kernels (arrays in, arrays out) ----------
+def _proportional(q_o, q_u):
+    s = q_o + q_u
+    return q_o / s, q_u / s
+
+def _additive(q_o, q_u):
+    excess = (q_o + q_u - 1.0) / 2.0
+    return np.clip(q_o - excess, 0.0, 1.0), np.clip(q_u - excess, 0.0, 1.0)
+
+def _power(q_o, q_u):
+    # q**k is decreasing in k for q in (0,1); bisect k in log space
+    lo = np.full(q_o.shape, np.log(1e-3))
+    hi = np.full(q_o.shape, np.log(1e3))
+    for _ in range(_BISECT_ITERS):
+        mid = 0.5 * (lo + hi)
+        k = np.exp(mid)
+        over = (q_o ** k + q_u ** k) > 1.0
+        lo = np.where(over, mid, lo)
+        hi = np.where(over, hi, mid)
+    k = np.exp(0.5 * (lo + hi))
+    return q_o ** k, q_u ** k
+
+def _shin(q_o, q_u):
+    # f(z) = sum_i sqrt(z^2 + 4(1-z) q_i^2/S) - 2 is convex with f(-1) > 0 and
+    # f(1) = 0, so the insider share z* is where f first crosses zero on [-1, 1)
+    # (z* < 0 when the book is under-round, S < 1).
+    s = q_o + q_u
+    a_o, a_u = q_o * q_o / s, q_u * q_u / s
+    def f(z):
+        return np.sqrt(z*z + 4*(1-z)*a_o) + np.sqrt(z*z + 4*(1-z)*a_u) - 2.0
+    lo = np.full(q_o.shape, -1.0)
+    hi = np.full(q_o.shape, 1.0 - 1e-12)
+    for _ in range(_BISECT_ITERS):
+        mid = 0.5 * (lo + hi)
+        pos = f(mid) > 0
+        lo = np.where(pos, mid, lo)
+        hi = np.where(pos, hi, mid)
+    z = 0.5 * (lo + hi)
+    p_o = (np.sqrt(z*z + 4*(1-z)*a_o) - z) / (2*(1-z))
+    p_u = (np.sqrt(z*z + 4*(1-z)*a_u) - z) / (2*(1-z))
+    return p_o, p_u
+
+_KERNELS = {"proportional": _proportional, "additive": _additive, "power": _power, "shin": _shin}
+
+def two_way(q_over, q_under, method: str = "proportional"):
+    """
+    Fair (p_over, p_under) from implied probabilities q = 1/decimal.
+    Legs with a missing side or a non-positive total come back NaN.
+    """
+    if method not in _KERNELS:
+        raise ValueError(f"Unknown de-vig method '{method}' (expected one of {METHODS})")
+    q_o = np.asarray(q_over, dtype=float)
+    q_u = np.asarray(q_under, dtype=float)
+    ok = np.isfinite(q_o) & np.isfinite(q_u) & (q_o + q_u > 0)
+    if method != "proportional":
+        ok &= (q_o > 0) & (q_u > 0) & (q_o < 1) & (q_u < 1)
+    p_o = np.full(q_o.shape, np.nan)
+    p_u = np.full(q_o.shape, np.nan)
+    if ok.any():
+        p_o[ok], p_u[ok] = _KERNELS[method](q_o[ok], q_u[ok])
+    return p_o, p_u
+
+
+# ---------- frame-level helpers ----------
+def _group_codes(df: pd.DataFrame, keys) -> np.ndarray:
+    return df.groupby(keys, sort=False, dropna=False).ngroup().to_numpy()
+
+def book_fair_probs(df: pd.DataFrame, keys, method: str = "proportional",
+                    is_over_col: str = "_is_over", dec_col: str = "dec_offered") -> pd.Series:
+    """
+    Per-book fair prob. Within each `keys` group only the first Over row and
+    the first non-Over row are priced (from those two rows' decimal odds);
+    every other row — and groups missing either side — is NaN.
+    """
+    over = df[is_over_col].to_numpy(dtype=bool)
+    dec = pd.to_numeric(df[dec_col], errors="coerce").to_numpy(dtype=float)
+    codes = _group_codes(df, keys)
+
+    # first row of each (group, side)
+    side_codes = codes * 2 + over
+    first = ~pd.Series(side_codes).duplicated().to_numpy()
+    n = codes.max() + 1 if len(codes) else 0
+
+    dec_o = np.full(n, np.nan); has_o = np.zeros(n, dtype=bool)
+    dec_u = np.full(n, np.nan); has_u = np.zeros(n, dtype=bool)
+    fo, fu = first & over, first & ~over
+    dec_o[codes[fo]] = dec[fo]; has_o[codes[fo]] = True
+    dec_u[codes[fu]] = dec[fu]; has_u[codes[fu]] = True
+
+    # the old fair_from_two_way() rejected decimal odds <= 1 outright
+    valid = has_o & has_u & ~(dec_o <= 1) & ~(dec_u <= 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p_o, p_u = two_way(np.where(valid, 1.0 / dec_o, np.nan), np.where(valid, 1.0 / dec_u, np.nan), method)
+
+    out = np.full(len(df), np.nan)
+    out[fo] = p_o[codes[fo]]
+    out[fu] = p_u[codes[fu]]
+    return pd.Series(out, index=df.index, name="fair_prob_book")
+
+def cons_fair_probs(df: pd.DataFrame, keys, method: str = "proportional",
+                    is_over_col: str = "_is_over", dec_col: str = "dec_offered") -> pd.Series:
+    """
+    Consensus fair prob per leg: sum 1/dec over every Over row and every
+    non-Over row across books, de-vig the two totals, broadcast back by side.
+    """
+    over = df[is_over_col].to_numpy(dtype=bool)
+    dec = pd.to_numeric(df[dec_col], errors="coerce").to_numpy(dtype=float)
+    codes = _group_codes(df, keys)
+    n = codes.max() + 1 if len(codes) else 0
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inv = 1.0 / dec
+    inv = np.where(np.isnan(inv), 0.0, inv)  # Series.sum() skips NaN
+    q_o = np.bincount(codes, weights=np.where(over, inv, 0.0), minlength=n)
+    q_u = np.bincount(codes, weights=np.where(over, 0.0, inv), minlength=n)
+    has_o = np.bincount(codes, weights=over, minlength=n) > 0
+    has_u = np.bincount(codes, weights=~over, minlength=n) > 0
+
+    valid = has_o & has_u & (q_o + q_u > 0)
+    p_o, p_u = two_way(np.where(valid, q_o, np.nan), np.where(valid, q_u, np.nan), method)
+
+    out = np.where(over, p_o[codes], p_u[codes])
+    return pd.Series(out, index=df.index, name="fair_prob_cons")
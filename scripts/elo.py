@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# scripts/elo.py
+"""
+Multi-season NFL Elo from the local schedules dump (nfl_data.schedules).
+
+Same game model as the old build_elo_2024.py (K=20, 55-point home field,
+log margin-of-victory multiplier with autocorrelation damping), run over every
+completed game of every local season. Between seasons a team's rating is
+regressed a third of the way back to 1500 (relocated franchises keep theirs).
+Each team plays at most once a week, so a week's games are updated together.
+
+Outputs (data/elo/):
+  history.parquet   one row per team-game: team, season, week, game_id, opponent,
+                    is_home, pre_elo, post_elo, win_prob, result, scores
+  state.json        checkpoint: ratings after the last applied game + parameters
+
+Updates are incremental: only completed games that are not in the history yet
+are applied, starting from the checkpoint. A changed score, a removed game, a
+new game that sorts before the checkpoint week or changed parameters trigger a
+full rebuild.
+
+Usage:
+  python3 scripts/elo.py                          # apply newly completed games
+  python3 scripts/elo.py --full                   # rebuild every season
+  python3 scripts/elo.py --ratings 2025 7         # ratings entering 2025 week 7
+
+  import elo
+  elo.ratings(2025, 7)                            # team -> elo, straight from the history table
+"""
+
+import argparse, json, os, pathlib, time
+from typing import Optional
+import numpy as np
+import pandas as pd
+
+ELO_DIR = pathlib.Path(os.getenv("ELO_DIR", "data/elo"))
+HISTORY_FILE = "history.parquet"
+STATE_FILE = "state.json"
+
+PARAMS = {"k": 20.0, "hfa": 55.0, "mean": 1500.0, "regress": 1.0 / 3.0,
+          "game_types": ["REG", "WC", "DIV", "CON", "SB"]}
+# nflverse keeps the historical abbreviation; ratings follow the franchise
+FRANCHISE = {"OAK": "LV", "SD": "LAC", "STL": "LA"}
+HISTORY_COLS = ["team", "season", "week", "game_id", "opponent", "is_home", "pre_elo", "post_elo",
+                "win_prob", "result", "points_for", "points_against"]
+
+
+# ---------- game model ----------
+def expected_home_win_prob(elo_home, elo_away, hfa: float = 55.0):
+    """Elo win prob for the HOME team vs AWAY team (scalars or arrays)."""
+    return 1.0 / (1.0 + 10 ** (-((np.asarray(elo_home) + hfa) - np.asarray(elo_away)) / 400.0))
+
+def mov_multiplier(margin, elo_diff):
+    """Margin-of-victory multiplier, damped when the favourite wins big."""
+    return np.log(np.maximum(np.abs(margin), 1.0) + 1.0) * (2.2 / (elo_diff * 0.001 + 2.2))
+
+def carry(elo, seasons_apart, mean: float = 1500.0, regress: float = 1.0 / 3.0):
+    """Rating after `seasons_apart` off-seasons of regression to the mean."""
+    return mean + (np.asarray(elo, dtype=float) - mean) * (1.0 - regress) ** np.asarray(seasons_apart)
+
+
+# ---------- games ----------
+def completed_games(sched: pd.DataFrame, game_types) -> pd.DataFrame:
+    """Finished games of the given types in play order, franchise-mapped."""
+    g = sched[sched["game_type"].isin(game_types) & sched["home_score"].notna() & sched["away_score"].notna()]
+    order = [c for c in ["season", "week", "gameday", "gametime", "game_id"] if c in g.columns]
+    g = g.sort_values(order, kind="stable")
+    return pd.DataFrame({
+        "game_id": g["game_id"].astype(str).to_numpy(), "season": g["season"].astype(int).to_numpy(),
+        "week": g["week"].astype(int).to_numpy(),
+        "home": g["home_team"].astype(str).replace(FRANCHISE).to_numpy(),
+        "away": g["away_team"].astype(str).replace(FRANCHISE).to_numpy(),
+        "home_score": g["home_score"].astype(float).to_numpy(), "away_score": g["away_score"].astype(float).to_numpy(),
+    })
+
+def _batches(games: pd.DataFrame):
+    """Index arrays of games that can be updated together: a week, split if a team plays twice in it."""
+    for _, wk in games.groupby(["season", "week"], sort=False):
+        teams = np.concatenate([wk["home"].to_numpy(), wk["away"].to_numpy()])
+        if len(np.unique(teams)) == len(teams):
+            yield wk.index.to_numpy()
+        else:
+            for i in wk.index:
+                yield np.array([i])
+
+
+# ---------- engine ----------
+def _empty_state(params: dict) -> dict:
+    return {"params": params, "teams": [], "elo": [], "season": [], "last": None}
+
+def apply_games(games: pd.DataFrame, state: dict) -> pd.DataFrame:
+    """Apply `games` (play order) to `state` in place; return their history rows."""
+    p = state["params"]
+    idx = {t: i for i, t in enumerate(state["teams"])}
+    for t in pd.unique(np.concatenate([games["home"].to_numpy(), games["away"].to_numpy()])):
+        if t not in idx:
+            idx[t] = len(state["teams"])
+            state["teams"].append(t); state["elo"].append(p["mean"]); state["season"].append(None)
+    elo = np.array(state["elo"], dtype=float)
+    last = np.array([np.nan if s is None else s for s in state["season"]], dtype=float)
+
+    games = games.reset_index(drop=True)
+    h = games["home"].map(idx).to_numpy()
+    a = games["away"].map(idx).to_numpy()
+    season = games["season"].to_numpy()
+    margin = (games["home_score"] - games["away_score"]).to_numpy()
+    sh = np.where(margin > 0, 1.0, np.where(margin == 0, 0.5, 0.0))   # actual result, home perspective
+    pre_h, pre_a, prob, delta = (np.empty(len(games)) for _ in range(4))
+    for b in _batches(games):
+        for team_idx, pre in ((h[b], pre_h), (a[b], pre_a)):
+            gap = np.where(np.isnan(last[team_idx]), 0, season[b] - np.nan_to_num(last[team_idx]))
+            elo[team_idx] = carry(elo[team_idx], gap, p["mean"], p["regress"])
+            last[team_idx] = season[b]
+            pre[b] = elo[team_idx]
+        prob[b] = expected_home_win_prob(pre_h[b], pre_a[b], p["hfa"])
+        delta[b] = p["k"] * mov_multiplier(margin[b], (pre_h[b] + p["hfa"]) - pre_a[b]) * (sh[b] - prob[b])
+        elo[h[b]] += delta[b]
+        elo[a[b]] -= delta[b]
+    post_h, post_a = pre_h + delta, pre_a - delta
+
+    state["elo"] = elo.tolist()
+    state["season"] = [None if np.isnan(s) else int(s) for s in last]
+    if len(games):
+        state["last"] = [int(games["season"].iloc[-1]), int(games["week"].iloc[-1])]
+    home = pd.DataFrame({"team": games["home"], "season": season, "week": games["week"], "game_id": games["game_id"],
+                         "opponent": games["away"], "is_home": True, "pre_elo": pre_h, "post_elo": post_h,
+                         "win_prob": prob, "result": sh, "points_for": games["home_score"],
+                         "points_against": games["away_score"]})
+    away = pd.DataFrame({"team": games["away"], "season": season, "week": games["week"], "game_id": games["game_id"],
+                         "opponent": games["home"], "is_home": False, "pre_elo": pre_a, "post_elo": post_a,
+                         "win_prob": 1.0 - prob, "result": 1.0 - sh, "points_for": games["away_score"],
+                         "points_against": games["home_score"]})
+    rows = pd.concat([home, away]).sort_index(kind="stable").reset_index(drop=True)
+    return rows[HISTORY_COLS]
+
+
+# ---------- storage ----------
+def load_history(root=None) -> pd.DataFrame:
+    f = pathlib.Path(root or ELO_DIR) / HISTORY_FILE
+    return pd.read_parquet(f) if f.exists() else pd.DataFrame(columns=HISTORY_COLS)
+
+def load_state(root=None) -> Optional[dict]:
+    f = pathlib.Path(root or ELO_DIR) / STATE_FILE
+    return json.loads(f.read_text(encoding="utf-8")) if f.exists() else None
+
+def _save(history: pd.DataFrame, state: dict, root: pathlib.Path):
+    root.mkdir(parents=True, exist_ok=True)
+    tmp = root / f"{HISTORY_FILE}.{os.getpid()}.tmp"
+    history.to_parquet(tmp, index=False)
+    os.replace(tmp, root / HISTORY_FILE)
+    tmp = root / f"{STATE_FILE}.{os.getpid()}.tmp"
+    tmp.write_text(json.dumps(dict(state, saved_at=time.strftime("%Y-%m-%dT%H:%M:%S")), indent=1), encoding="utf-8")
+    os.replace(tmp, root / STATE_FILE)
+
+def _needs_rebuild(games: pd.DataFrame, history: pd.DataFrame, state: Optional[dict], params: dict) -> Optional[str]:
+    if state is None or history.empty:
+        return "no checkpoint"
+    if state["params"] != params:
+        return "parameters changed"
+    done = history[history["is_home"]].set_index("game_id")[["points_for", "points_against"]]
+    cur = games.set_index("game_id")[["home_score", "away_score"]]
+    if not done.index.isin(cur.index).all():
+        return "applied game no longer in schedules"
+    both = cur.reindex(done.index)
+    if not (np.array_equal(both["home_score"].to_numpy(), done["points_for"].to_numpy(dtype=float))
+            and np.array_equal(both["away_score"].to_numpy(), done["points_against"].to_numpy(dtype=float))):
+        return "score of an applied game changed"
+    new = games[~games["game_id"].isin(done.index)]
+    if len(new) and (new["season"] * 100 + new["week"]).min() < state["last"][0] * 100 + state["last"][1]:
+        return "new game before the checkpoint week"
+    return None
+
+def update(sched: Optional[pd.DataFrame] = None, root=None, full: bool = False, params: Optional[dict] = None) -> pd.DataFrame:
+    """Bring history + checkpoint up to date with the completed games in `sched` (default: local schedules)."""
+    root = pathlib.Path(root or ELO_DIR)
+    params = dict(params or PARAMS)
+    if sched is None:
+        import nfl_data
+        sched = nfl_data.schedules(None)
+    games = completed_games(sched, params["game_types"])
+    history, state = load_history(root), load_state(root)
+    why = "--full" if full else _needs_rebuild(games, history, state, params)
+    t0 = time.perf_counter()
+    if why:
+        state = _empty_state(params)
+        history = apply_games(games, state)
+        print(f"[elo] full build ({why}): {len(games):,} games, {games['season'].nunique()} seasons")
+    else:
+        new = games[~games["game_id"].isin(history["game_id"])]
+        if new.empty:
+            print(f"[elo] up to date through {state['last'][0]} week {state['last'][1]}")
+            return history
+        rows = apply_games(new, state)
+        history = pd.concat([history, rows], ignore_index=True)
+        print(f"[elo] applied {len(new)} new games (through {state['last'][0]} week {state['last'][1]})")
+    _save(history, state, root)
+    print(f"[elo] {len(history):,} team-games in {time.perf_counter() - t0:.2f}s -> {root / HISTORY_FILE}")
+    return history
+
+
+# ---------- lookups ----------
+def ratings(season: int, week: int, history: Optional[pd.DataFrame] = None, root=None,
+            params: Optional[dict] = None) -> pd.DataFrame:
+    """team, elo entering (season, week): last post-game rating before it, regressed across off-seasons."""
+    p = params or (load_state(root) or {}).get("params") or PARAMS
+    h = load_history(root) if history is None else history
+    h = h[h["season"] * 100 + h["week"] < season * 100 + week]
+    last = h.groupby("team", sort=True).tail(1)
+    return pd.DataFrame({"team": last["team"].to_numpy(),
+                         "elo": carry(last["post_elo"].to_numpy(dtype=float),
+                                      season - last["season"].to_numpy(dtype=int), p["mean"], p["regress"])})
+
+def season_final(season: int, history: Optional[pd.DataFrame] = None, root=None) -> pd.DataFrame:
+    """team, elo after the team's last game of `season` (no off-season regression)."""
+    h = load_history(root) if history is None else history
+    last = h[h["season"] == season].groupby("team", sort=True).tail(1)
+    return pd.DataFrame({"team": last["team"].to_numpy(), "elo": last["post_elo"].to_numpy(dtype=float)})
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Multi-season incremental Elo from the local schedules dump.")
+    ap.add_argument("--root", default=str(ELO_DIR))
+    ap.add_argument("--full", action="store_true", help="Rebuild from the first season instead of the checkpoint")
+    ap.add_argument("--ratings", nargs=2, type=int, metavar=("SEASON", "WEEK"), default=None,
+                    help="Print ratings entering SEASON WEEK (no update)")
+    args = ap.parse_args()
+    if args.ratings:
+        r = ratings(*args.ratings, root=args.root).sort_values("elo", ascending=False)
+        print(r.to_string(index=False, float_format=lambda x: f"{x:,.1f}"))
+        return
+    update(root=args.root, full=args.full)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Parquet feature store for ml_player_pipeline.
+
+The full player-week matrix (raw weekly columns + every p_<col>_last<k> /
+p_<col>_season_avg feature) is materialized once per
+  sha256(weekly CSV bytes) + stat columns + lookbacks + FEATURE_VERSION
+under data/features/player_weekly/<key>/part-0.parquet (rows sorted by position so
+row-group statistics prune the position filter).
+
+Later runs read only the columns they ask for, with the position / player_id
+filters pushed down to the Parquet scan. Rows come back in CSV order with
+the CSV row number as index, i.e. exactly what load_player_weekly() + the
+position/player filters would give, already carrying the p_* features.
+
+Player features are computed over a player's full history. A player who
+also has rows the position filter drops (or duplicate season/week rows)
+is recomputed from the filtered rows, so the result stays
+identical to building from the CSV.
+
+Weekly updates are incremental: each entry also keeps a RollingState
+checkpoint (_state.npz) and a digest of its source rows. When a new CSV is
+an older entry's CSV plus appended rows (what pull_nfl_player_data.py
+--latest-week produces), only the new rows get features, from the
+checkpoint, and are written as one more part-N.parquet next to hard links
+of the old parts. Anything else (edited history, a row that sorts before a
+player's last week, a schema change, MAX_PARTS reached, a checkpoint written
+under another pandas version) falls back to a full build. If RollingState no
+longer mirrors the installed pandas' rolling mean (rolling_features.mirrors_pandas),
+features come from lagged_means() and no checkpoint is written.
+
+Usage:
+  python3 scripts/feature_store.py --player_csv data/weekly_player_stats.csv --lookbacks 1 3 5
+"""
+
+import argparse, hashlib, json, os, pathlib, shutil, time
+from typing import Callable, List, Optional
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from rolling_features import RollingState, feature_names, lagged_means, mirrors_pandas
+
+FEATURE_VERSION = 1
+STORE_DIR = pathlib.Path(os.getenv("FEATURE_STORE_DIR", "data/features"))
+ROW_COL = "_row"   # row number in the source CSV
+SORT_KEYS = ["player_id", "season", "week"]
+ROW_GROUP_SIZE = 65_536
+STATE_FILE = "_state.npz"
+MAX_PARTS = 32     # appended weeks before the next update rebuilds (re-sorts) the entry
+
+
+# ---------------------------
+# Keys
+# ---------------------------
+def file_digest(path, chunk: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def store_key(csv_digest: str, stat_cols: List[str], lookbacks: List[int]) -> str:
+    spec = json.dumps({"csv": csv_digest, "cols": list(stat_cols), "lookbacks": list(lookbacks),
+                       "version": FEATURE_VERSION})
+    return hashlib.sha256(spec.encode("utf-8")).hexdigest()[:20]
+
+def rows_digest(df: pd.DataFrame) -> str:
+    """Content digest of a loaded CSV (column names + per-row hashes), comparable across prefixes."""
+    h = hashlib.sha256(json.dumps([str(c) for c in df.columns]).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+# ---------------------------
+# Write
+# ---------------------------
+def _write(parts: List[pa.Table], path: pathlib.Path, manifest: dict, state: Optional[RollingState],
+           links: List[pathlib.Path] = ()):
+    """Write an entry to a temp dir and move it into place; `links` are reused part files of a base entry."""
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    for j, src in enumerate(links):
+        try:
+            os.link(src, tmp / f"part-{j}.parquet")
+        except OSError:
+            shutil.copy2(src, tmp / f"part-{j}.parquet")
+    for j, table in enumerate(parts, start=len(links)):
+        pq.write_table(table, tmp / f"part-{j}.parquet", row_group_size=ROW_GROUP_SIZE)
+    if state is not None:
+        state.save(tmp / STATE_FILE)
+    (tmp / "_manifest.json").write_text(json.dumps(manifest, indent=1), encoding="utf-8")
+    if path.exists():  # another run got there first; same key => same content
+        shutil.rmtree(tmp, ignore_errors=True)
+    else:
+        os.replace(tmp, path)
+
+def _parts(path) -> List[pathlib.Path]:
+    return sorted(pathlib.Path(path).glob("part-*.parquet"), key=lambda p: int(p.stem.split("-")[1]))
+
+def _base_entry(root: pathlib.Path, spec: str, df: pd.DataFrame) -> Optional[pathlib.Path]:
+    """Largest checkpointed entry (same spec) whose source rows are a strict prefix of df."""
+    cands = []
+    for mf in root.glob("*/_manifest.json"):
+        m = json.loads(mf.read_text(encoding="utf-8"))
+        if m.get("spec") == spec and m.get("rows_digest") and m["rows"] < len(df) \
+                and (mf.parent / STATE_FILE).exists():
+            cands.append((m["rows"], mf.parent, m["rows_digest"]))
+    for n, path, digest in sorted(cands, key=lambda c: -c[0]):
+        if rows_digest(df.iloc[:n]) == digest:
+            return path
+    return None
+
+def _append(base: pathlib.Path, df: pd.DataFrame, path: pathlib.Path, meta: dict) -> bool:
+    """Extend `base` with the rows of df past its prefix; False if it has to be a full build."""
+    m = manifest(base)
+    links = _parts(base)
+    if len(links) >= MAX_PARTS:
+        return False
+    new = df.iloc[m["rows"]:].copy()
+    new[ROW_COL] = np.arange(m["rows"], len(df), dtype=np.int64)
+    state = RollingState.load(base / STATE_FILE)
+    if state.pandas_version != pd.__version__ or not mirrors_pandas():
+        return False
+    if state.cols != m["stat_cols"] or not state.can_append(new, "player_id"):
+        return False
+
+    new = new.sort_values(SORT_KEYS).copy()
+    feats = state.update(new, "player_id", "p_")
+    new = pd.concat([new.drop(columns=[c for c in feats.columns if c in new.columns]), feats], axis=1)
+    new = new.sort_values(["position", "player_id", "season", "week"], na_position="last")
+    try:
+        table = pa.Table.from_pandas(new[m["columns"] + [ROW_COL]], schema=pq.read_schema(links[0]),
+                                     preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, KeyError, ValueError):
+        return False
+    _write([table], path, dict(m, **meta, rows=len(df), base=base.name, appended=len(new)), state, links)
+    return True
+
+def materialize(player_csv: str, lookbacks: List[int], stat_cols: List[str],
+                loader: Callable[[str], pd.DataFrame], root=None, refresh: bool = False,
+                incremental: bool = True) -> pathlib.Path:
+    """
+    Build the store for (CSV contents, stat cols, lookbacks) unless it already exists,
+    appending to an earlier entry when the CSV only gained rows (see module docstring).
+    """
+    root = pathlib.Path(root or STORE_DIR) / "player_weekly"
+    digest = file_digest(player_csv)
+    # stat cols are narrowed to what the CSV has, so key on the requested list
+    path = root / store_key(digest, stat_cols, lookbacks)
+    if path.exists() and not refresh:
+        print(f"[feature_store] hit {path}")
+        return path
+
+    t0 = time.perf_counter()
+    df = loader(player_csv)
+    spec = store_key("", stat_cols, lookbacks)
+    meta = {"source": str(player_csv), "sha256": digest, "spec": spec, "rows_digest": rows_digest(df),
+            "built_at": time.strftime("%Y-%m-%dT%H:%M:%S")}
+    if refresh and path.exists():
+        shutil.rmtree(path)
+
+    base = _base_entry(root, spec, df) if incremental and not refresh else None
+    if base is not None and _append(base, df, path, meta):
+        print(f"[feature_store] appended {len(df) - manifest(base)['rows']:,} rows to {base.name} -> {path} "
+              f"in {time.perf_counter() - t0:.1f}s")
+        return path
+
+    df[ROW_COL] = np.arange(len(df), dtype=np.int64)
+    cols = [c for c in stat_cols if c in df.columns]
+    df = df.sort_values(SORT_KEYS).copy()
+    if mirrors_pandas():
+        state, feats = RollingState.from_frame(df, "player_id", cols, lookbacks, "p_")  # == lagged_means()
+    else:
+        print(f"[feature_store] RollingState does not match pandas {pd.__version__}'s rolling mean; "
+              f"full build without a checkpoint")
+        state, feats = None, lagged_means(df, "player_id", cols, lookbacks, "p_")
+    df = pd.concat([df.drop(columns=[c for c in feats.columns if c in df.columns]), feats], axis=1)
+    df = df.sort_values(["position", "player_id", "season", "week"], na_position="last")  # tight row-group stats
+
+    _write([pa.Table.from_pandas(df, preserve_index=False)], path, dict(meta,
+        stat_cols=cols, lookbacks=list(lookbacks), feature_version=FEATURE_VERSION, rows=len(df),
+        columns=[c for c in df.columns if c != ROW_COL]), state)
+    print(f"[feature_store] built {path} ({len(df):,} rows) in {time.perf_counter() - t0:.1f}s")
+    return path
+
+
+# ---------------------------
+# Read
+# ---------------------------
+def manifest(path) -> dict:
+    return json.loads((pathlib.Path(path) / "_manifest.json").read_text(encoding="utf-8"))
+
+def _dataset(path):
+    return ds.dataset([str(p) for p in _parts(path)], format="parquet")
+
+def _filter(positions=None, player_ids=None, seasons=None):
+    f = None
+    def _and(a, b): return b if a is None else (a & b)
+    if positions:  f = _and(f, ds.field("position").isin(list(positions)))
+    if player_ids: f = _and(f, ds.field("player_id").isin(list(player_ids)))
+    if seasons:    f = _and(f, ds.field("season").isin([int(s) for s in seasons]))
+    return f
+
+def _to_frame(table: pa.Table, columns: List[str]) -> pd.DataFrame:
+    df = table.to_pandas().set_index(ROW_COL).sort_index()
+    df.index.name = None
+    for c in ("season", "week"):
+        if c in df.columns: df[c] = df[c].astype(int)
+    for c in df.columns[df.dtypes == object]:
+        df[c] = df[c].where(df[c].notna(), np.nan)   # pyarrow nulls -> NaN like read_csv
+    return df[[c for c in columns if c in df.columns]]
+
+def load_rows(path, columns: List[str], positions=None, player_ids=None, seasons=None) -> pd.DataFrame:
+    """Projected + filtered read, in source-CSV order (index = CSV row number)."""
+    want = list(dict.fromkeys(list(columns) + [ROW_COL]))
+    table = _dataset(path).to_table(columns=want, filter=_filter(positions, player_ids, seasons))
+    return _to_frame(table, columns)
+
+def player_features(path, columns: Optional[List[str]] = None, positions=None, player_ids=None) -> pd.DataFrame:
+    """
+    Equivalent of add_player_rolling_and_season() on the filtered CSV rows.
+    `columns` limits the raw columns read (None = all); the keys, stat
+    columns and every p_* feature are always included, in the original order.
+    """
+    m = manifest(path)
+    stat_cols, lookbacks = m["stat_cols"], m["lookbacks"]
+    feats = set(feature_names(stat_cols, lookbacks, "p_"))
+    keep = set(m["columns"]) if columns is None else set(columns) | feats | set(SORT_KEYS + ["position"] + stat_cols)
+    cols = [c for c in m["columns"] if c in keep]
+
+    df = load_rows(path, cols, positions, player_ids)
+    df = df.sort_values(SORT_KEYS).copy()
+
+    # players whose history here differs from the full history the store was built on
+    keys = load_rows(path, ["player_id", "position", "season", "week"], player_ids=player_ids)
+    dirty = set(keys.loc[keys.duplicated(SORT_KEYS, keep=False), "player_id"].dropna())
+    if positions:
+        dirty |= set(keys.loc[~keys["position"].isin(positions), "player_id"].dropna())
+    sel = df["player_id"].isin(dirty).to_numpy()
+    if sel.any():
+        redo = lagged_means(df.loc[sel], "player_id", stat_cols, lookbacks, "p_")
+        have = [c for c in redo.columns if c in df.columns]
+        df.loc[sel, have] = redo[have].to_numpy()
+    return df
+
+
+# ---------------------------
+# CLI
+# ---------------------------
+def main():
+    from ml_player_pipeline import STAT_COLS, load_player_weekly
+    ap = argparse.ArgumentParser(description="Materialize the ml_player_pipeline feature store.")
+    ap.add_argument("--player_csv", required=True)
+    ap.add_argument("--lookbacks", nargs="+", type=int, default=[3])
+    ap.add_argument("--store_dir", default=str(STORE_DIR))
+    ap.add_argument("--refresh", action="store_true", help="Rebuild even if the key already exists")
+    ap.add_argument("--full", action="store_true", help="Never append to an earlier entry")
+    args = ap.parse_args()
+    path = materialize(args.player_csv, args.lookbacks, STAT_COLS, load_player_weekly, args.store_dir,
+                       args.refresh, incremental=not args.full)
+    m = manifest(path)
+    print(f"[feature_store] {path} | {m['rows']:,} rows | {len(_parts(path))} parts | {len(m['columns'])} columns")
+
+if __name__ == "__main__":
+    main()
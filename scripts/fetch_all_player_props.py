@@ -1,8 +1,29 @@
 #!/usr/bin/env python3
 # scripts/fetch_all_player_props.py
-import os, sys, time, pathlib
+"""
+Fetch every NFL player-prop market for each game in data/odds/latest.csv.
+
+Events are requested concurrently (asyncio over a bounded pool of HTTP
+connections) under a token-bucket rate limit, through the shared on-disk
+cache in odds_cache.py (repeat runs within the TTL make no network calls),
+then flattened into the latest_all_props.csv schema:
+  game_id, commence_time, home_team, away_team, bookmaker, market, player, name, price, point
+
+Every fetch is also appended to the snapshot archive (odds_archive.py,
+data/archive/props) so line movement is kept; --no_archive skips it. A run
+served entirely from the cache appends nothing (that snapshot is already in).
+
+Usage:
+  python3 scripts/fetch_all_player_props.py --season 2025 --week 1 \
+    --out data/props/latest_all_props.csv --concurrency 8 --rps 5 [--refresh]
+"""
+import argparse, asyncio, os, sys, time, pathlib
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import requests as rq
+from requests.adapters import HTTPAdapter
+from odds_cache import cached_get, is_fresh, print_summary, snapshot_time
+from odds_archive import append_snapshot
 
 SPORT   = "americanfootball_nfl"
 REGIONS = "us"
@@ -23,53 +44,137 @@ MARKETS = [
 OUT_DIR = pathlib.Path("data/props"); OUT_DIR.mkdir(parents=True, exist_ok=True)
 OUT = OUT_DIR / "latest_all_props.csv"
 
-def j(url, params):
-    r = rq.get(url, params={**params, "apiKey": API_KEY}, timeout=30)
+def j(url, params, session=rq, refresh=None):
+    """(payload, response); payload is None on 404."""
+    r = cached_get(url, {**params, "apiKey": API_KEY}, session=session, refresh=refresh)
     if r.status_code == 404:  # no props for this game yet
-        return None
+        return None, r
     r.raise_for_status()
-    return r.json()
+    return r.json(), r
+
+# ---------- concurrency ----------
+class TokenBucket:
+    """Async token bucket: refills `rate` tokens/sec, holds at most `capacity`."""
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = float(rate)
+        self.capacity = float(capacity) if capacity else max(1.0, self.rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self.tokens) / self.rate)
+
+async def fetch_events(event_ids, params, base=BASE, concurrency=8, rps=5.0, refresh=None):
+    """
+    Fetch /events/{id}/odds for every id with at most `concurrency` requests in
+    flight and at most `rps` request starts per second (rps<=0 disables the limit).
+    Returns (payloads in the same order as `event_ids` (None for 404s),
+    snapshot fetch time, None when every event was a cache hit).
+    """
+    concurrency = max(1, int(concurrency))
+    session = rq.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    sem = asyncio.Semaphore(concurrency)
+    bucket = TokenBucket(rps) if rps and rps > 0 else None
+    loop = asyncio.get_running_loop()
+
+    with session, ThreadPoolExecutor(max_workers=concurrency) as pool:
+        async def one(event_id):
+            url = f"{base}/sports/{SPORT}/events/{event_id}/odds"
+            async with sem:
+                # fresh cache hits cost no credits, so they skip the rate limiter
+                if bucket is not None and not is_fresh(url, params, refresh):
+                    await bucket.acquire()
+                return await loop.run_in_executor(pool, j, url, params, session, refresh)
+        results = await asyncio.gather(*(one(e) for e in event_ids))
+    return [data for data, _ in results], snapshot_time(r for _, r in results)
+
+def flatten_event(g, data):
+    """One row per (bookmaker, market, outcome) for a single event payload."""
+    rows = []
+    for bk in (data or {}).get("bookmakers", []):
+        btitle = bk.get("title") or bk.get("key")
+        for m in bk.get("markets", []):
+            mkey = m.get("key")
+            for oc in m.get("outcomes", []):
+                rows.append({
+                    "game_id": g["game_id"],
+                    "commence_time": g["commence_time"],
+                    "home_team": g["home_team"],
+                    "away_team": g["away_team"],
+                    "bookmaker": btitle,
+                    "market": mkey,
+                    "player": oc.get("description") or oc.get("participant") or "",
+                    "name": oc.get("name"),   # Over / Under OR Yes / No
+                    "price": oc.get("price"),
+                    "point": oc.get("point")
+                })
+    return rows
+
+def parse_args():
+    ap = argparse.ArgumentParser(description="Fetch all NFL player-prop markets per event (concurrent).")
+    ap.add_argument("--season", type=int, default=None)
+    ap.add_argument("--week", type=int, default=None)
+    ap.add_argument("--odds_csv", default="data/odds/latest.csv", help="Games list (game_id, commence_time, teams)")
+    ap.add_argument("--out", default=str(OUT))
+    ap.add_argument("--api_base", default=BASE)
+    ap.add_argument("--concurrency", type=int, default=8, help="Max requests in flight (1 = sequential)")
+    ap.add_argument("--rps", type=float, default=5.0, help="Max request starts per second (<=0 disables)")
+    ap.add_argument("--refresh", action="store_true", default=None, help="Bypass the Odds API cache")
+    ap.add_argument("--no_archive", action="store_true", help="Don't append this fetch to data/archive/props")
+    return ap.parse_args()
 
 def main():
+    args = parse_args()
     if not API_KEY:
         print("Missing ODDS_API_KEY (or THE_ODDS_API_KEY).", file=sys.stderr)
         sys.exit(2)
-    odds_latest = pathlib.Path("data/odds/latest.csv")
+    odds_latest = pathlib.Path(args.odds_csv)
     if not odds_latest.exists():
-        print("Missing data/odds/latest.csv. Run: make odds", file=sys.stderr)
+        print(f"Missing {odds_latest}. Run: make odds", file=sys.stderr)
         sys.exit(2)
 
     games = pd.read_csv(odds_latest, low_memory=False)[["game_id","commence_time","home_team","away_team"]].drop_duplicates()
+    params = {"regions": REGIONS, "oddsFormat": ODDSFMT, "markets": ",".join(MARKETS)}
+
+    t0 = time.perf_counter()
+    payloads, fetched_at = asyncio.run(fetch_events(games["game_id"].tolist(), params, base=args.api_base,
+                                        concurrency=args.concurrency, rps=args.rps,
+                                        refresh=args.refresh))
+    elapsed = time.perf_counter() - t0
+    print_summary()
+
     rows = []
-    for _, g in games.iterrows():
-        event_id = g["game_id"]
-        url = f"{BASE}/sports/{SPORT}/events/{event_id}/odds"
-        data = j(url, {"regions": REGIONS, "oddsFormat": ODDSFMT, "markets": ",".join(MARKETS)})
-        if not data:
-            time.sleep(0.2);
-            continue
-        for bk in data.get("bookmakers", []):
-            btitle = bk.get("title") or bk.get("key")
-            for m in bk.get("markets", []):
-                mkey = m.get("key")
-                for oc in m.get("outcomes", []):
-                    rows.append({
-                        "game_id": g["game_id"],
-                        "commence_time": g["commence_time"],
-                        "home_team": g["home_team"],
-                        "away_team": g["away_team"],
-                        "bookmaker": btitle,
-                        "market": mkey,
-                        "player": oc.get("description") or oc.get("participant") or "",
-                        "name": oc.get("name"),   # Over / Under OR Yes / No
-                        "price": oc.get("price"),
-                        "point": oc.get("point")
-                    })
-        time.sleep(0.2)
-
-    df = pd.DataFrame(rows)
-    df.to_csv(OUT, index=False)
-    print(f"Wrote {OUT} with {len(df):,} rows across {games.shape[0]} events")
+    for g, data in zip(games.to_dict("records"), payloads):
+        if data:
+            rows.extend(flatten_event(g, data))
+
+    cols = ["game_id","commence_time","home_team","away_team","bookmaker","market","player","name","price","point"]
+    df = pd.DataFrame(rows, columns=cols)
+    out = pathlib.Path(args.out); out.parent.mkdir(parents=True, exist_ok=True)
+    df.to_csv(out, index=False)
+    print(f"Wrote {out} with {len(df):,} rows across {games.shape[0]} events "
+          f"in {elapsed:.1f}s (concurrency={args.concurrency}, rps={args.rps:g})")
+
+    if fetched_at is None and not args.no_archive:
+        print("[archive] every event came from the cache; props snapshot already archived", file=sys.stderr)
+    elif not args.no_archive:
+        try:
+            append_snapshot(df, "props", args.season, args.week, fetched_at=fetched_at)
+        except Exception as e:
+            print(f"[WARN] props archive append skipped: {e}", file=sys.stderr)
 
 if __name__ == "__main__":
     main()
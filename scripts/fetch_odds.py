@@ -5,6 +5,12 @@ Fetch NFL odds from The Odds API and OUTPUT a FLAT CSV of games to STDOUT.
 Columns:
   game_id, commence_time, home_team, away_team
 
+Requests go through the shared Odds API cache (scripts/odds_cache.py);
+pass --refresh (or ODDS_CACHE_REFRESH=1) to bypass it. The full per-book
+h2h/spreads/totals quotes are appended to the snapshot archive
+(data/archive/game_odds, see odds_archive.py) unless --no_archive or the
+response was a cache hit (already archived by the run that fetched it).
+
 Usage (example):
   python3 scripts/fetch_odds.py \
     --sport_key americanfootball_nfl \
@@ -12,13 +18,16 @@ Usage (example):
     --regions us \
     --odds_format american > data/odds/latest.csv
 """
-import argparse, os, sys, json, urllib.parse, urllib.request
+import argparse, os, sys, json, urllib.parse
 import pandas as pd
+from odds_cache import cached_get, snapshot_time
+from odds_archive import append_snapshot
 
-def fetch_json(url: str, timeout: int = 30):
-    req = urllib.request.Request(url, headers={"User-Agent": "nfl-2025/1.0"})
-    with urllib.request.urlopen(req, timeout=timeout) as r:
-        data = r.read().decode("utf-8", errors="ignore")
+def fetch_json(url: str, params: dict, timeout: int = 30, refresh=None):
+    """(parsed array, snapshot fetch time or None for a cache hit)."""
+    r = cached_get(url, params, headers={"User-Agent": "nfl-2025/1.0"}, timeout=timeout, refresh=refresh)
+    r.raise_for_status()
+    data = r.text
     # Some plans prepend info lines; strip them out here
     lines = [ln for ln in data.splitlines() if not ln.lstrip().startswith("[info]")]
     txt = "\n".join(lines).strip()
@@ -26,10 +35,32 @@ def fetch_json(url: str, timeout: int = 30):
     if not txt or txt[0] != "[":
         raise SystemExit("Odds API response is not a JSON array. First chars: " + txt[:80])
     try:
-        return json.loads(txt)
+        return json.loads(txt), snapshot_time([r])
     except json.JSONDecodeError as e:
         raise SystemExit(f"Failed to parse Odds API JSON: {e}")
 
+def flatten_quotes(arr):
+    """One row per (game, bookmaker, market, outcome) for the snapshot archive."""
+    rows = []
+    for g in arr:
+        for bk in g.get("bookmakers", []):
+            btitle = bk.get("title") or bk.get("key")
+            for m in bk.get("markets", []):
+                for oc in m.get("outcomes", []):
+                    rows.append({
+                        "game_id": g.get("id") or g.get("event_id"),
+                        "commence_time": g.get("commence_time"),
+                        "home_team": g.get("home_team"),
+                        "away_team": g.get("away_team"),
+                        "bookmaker": btitle,
+                        "market": m.get("key"),
+                        "player": "",
+                        "name": oc.get("name"),
+                        "price": oc.get("price"),
+                        "point": oc.get("point"),
+                    })
+    return pd.DataFrame(rows)
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--sport_key", default="americanfootball_nfl")
@@ -37,6 +68,10 @@ def main():
     ap.add_argument("--markets", default="h2h,spreads,totals")
     ap.add_argument("--odds_format", default="american")
     ap.add_argument("--api_base", default="https://api.the-odds-api.com/v4")
+    ap.add_argument("--refresh", action="store_true", default=None, help="Bypass the Odds API cache")
+    ap.add_argument("--season", type=int, default=None, help="Archive partition (default: inferred from kickoffs)")
+    ap.add_argument("--week", type=int, default=None, help="Archive partition (default: inferred from kickoffs)")
+    ap.add_argument("--no_archive", action="store_true", help="Don't append quotes to data/archive/game_odds")
     args = ap.parse_args()
 
     api_key = os.getenv("ODDS_API_KEY")
@@ -44,16 +79,16 @@ def main():
         print("ERROR: ODDS_API_KEY not set in environment (.env)", file=sys.stderr)
         sys.exit(1)
 
-    # Build URL
+    # Build request (the cache keys on url + params, minus apiKey)
     q = {
         "regions": args.regions,
         "markets": args.markets,
         "oddsFormat": args.odds_format,
         "apiKey": api_key,
     }
-    url = f"{args.api_base}/sports/{urllib.parse.quote(args.sport_key)}/odds?{urllib.parse.urlencode(q)}"
+    url = f"{args.api_base}/sports/{urllib.parse.quote(args.sport_key)}/odds"
 
-    arr = fetch_json(url)
+    arr, fetched_at = fetch_json(url, q, refresh=args.refresh)
 
     # Flatten to one row per game
     rows = []
@@ -70,5 +105,13 @@ def main():
     # Output FLAT CSV to STDOUT
     df.to_csv(sys.stdout, index=False)
 
+    if fetched_at is None and not args.no_archive:
+        print("[archive] odds came from the cache; snapshot already archived", file=sys.stderr)
+    elif not args.no_archive:
+        try:
+            append_snapshot(flatten_quotes(arr), "game_odds", args.season, args.week, fetched_at=fetched_at)
+        except Exception as e:
+            print(f"[WARN] game odds archive append skipped: {e}", file=sys.stderr)
+
 if __name__ == "__main__":
     main()
@@ -3,6 +3,8 @@
 import os, sys, time, pathlib, json
 import pandas as pd
 import requests as rq
+from odds_cache import cached_get, is_fresh, print_summary, snapshot_time
+from odds_archive import append_snapshot
 
 SPORT = "americanfootball_nfl"
 MARKETS = ["player_pass_yds"]  # add more later (player_reception_yds, etc.)
@@ -15,9 +17,12 @@ BASE = "https://api.the-odds-api.com/v4"
 OUT_DIR = pathlib.Path("data/props")
 OUT_DIR.mkdir(parents=True, exist_ok=True)
 
-def get(url, params):
+REFRESH = "--refresh" in sys.argv[1:] or None  # bypass the Odds API cache
+
+def get(url, params, responses):
     params = dict(params, apiKey=API_KEY)
-    r = rq.get(url, params=params, timeout=30)
+    r = cached_get(url, params, refresh=REFRESH)
+    responses.append(r)
     r.raise_for_status()
     return r.json()
 
@@ -35,16 +40,18 @@ def main():
         ["game_id","commence_time","home_team","away_team"]
     ].drop_duplicates()
 
-    rows = []
+    rows, responses = [], []
     for i, ev in games.iterrows():
         event_id = ev["game_id"]
         url = f"{BASE}/sports/{SPORT}/events/{event_id}/odds"
+        req = {
+            "regions": REGIONS,
+            "oddsFormat": ODDS_FMT,
+            "markets": ",".join(MARKETS),
+        }
+        cached = is_fresh(url, req, REFRESH)
         try:
-            js = get(url, {
-                "regions": REGIONS,
-                "oddsFormat": ODDS_FMT,
-                "markets": ",".join(MARKETS),
-            })
+            js = get(url, req, responses)
         except rq.HTTPError as e:
             # 404 is common if no props yet; skip silently
             if e.response is not None and e.response.status_code == 404:
@@ -75,13 +82,26 @@ def main():
                         "price": price,
                         "point": point,
                     })
-        # polite pacing
-        time.sleep(0.2)
+        # polite pacing (cache hits cost nothing, so only pace real calls)
+        if not cached:
+            time.sleep(0.2)
 
+    print_summary()
     df = pd.DataFrame(rows)
     out_csv = OUT_DIR / "latest_player_pass_yds.csv"
     df.to_csv(out_csv, index=False)
     print(f"Wrote {out_csv} with {len(df):,} rows across {games.shape[0]} events")
 
+    # keep line history (data/archive/props); season/week inferred from kickoffs.
+    # An all-cache run was archived by the run that fetched it.
+    fetched_at = snapshot_time(responses)
+    if fetched_at is None and "--no_archive" not in sys.argv[1:]:
+        print("[archive] every event came from the cache; props snapshot already archived", file=sys.stderr)
+    elif "--no_archive" not in sys.argv[1:]:
+        try:
+            append_snapshot(df, "props", fetched_at=fetched_at)
+        except Exception as e:
+            print(f"[WARN] props archive append skipped: {e}", file=sys.stderr)
+
 if __name__ == "__main__":
     main()
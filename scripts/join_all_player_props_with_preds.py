@@ -1,37 +1,15 @@
 #!/usr/bin/env python3
 # scripts/join_all_player_props_with_preds.py
-import math, pathlib
+import pathlib
 import pandas as pd
 import numpy as np
-from math import erf, sqrt, exp
+from prob_kernels import american_to_prob, bernoulli, norm_sf, poisson_sf
 
 PROPS = pathlib.Path("data/props/latest_all_props.csv")
 PREDS = pathlib.Path("data/predictions/player_all_props_params.csv")
 OUT   = pathlib.Path("data/merged/player_props_latest.csv")
 OUT.parent.mkdir(parents=True, exist_ok=True)
 
-def american_to_prob(odds):
-    if pd.isna(odds): return np.nan
-    o = float(odds)
-    return 100.0/(o+100.0) if o>0 else abs(o)/(abs(o)+100.0)
-
-# vectorized normal CDF
-_vec_erf = np.vectorize(erf)
-def norm_cdf_vec(z_arr):
-    return 0.5*(1.0 + _vec_erf(z_arr/np.sqrt(2.0)))
-
-def poisson_sf(lam, L):
-    """P(X > L) for Poisson(lam), with L possibly fractional (uses floor)."""
-    if lam <= 0: return 0.0
-    k = int(math.floor(L))
-    cdf = 0.0
-    term = exp(-lam)  # k=0
-    cdf += term
-    for i in range(1, k+1):
-        term *= lam / i
-        cdf += term
-    return max(0.0, 1.0 - cdf)
-
 # ---- Friendly market labels ----
 MARKET_LABELS = {
     "player_pass_yds": "QB Passing Yards",
@@ -89,7 +67,7 @@ def main():
 
     side = df["name"].astype(str).str.lower()   # "over"/"under" or "yes"/"no"
     line = pd.to_numeric(df["point"], errors="coerce")
-    price_prob = df["price"].apply(american_to_prob) / 100.0
+    price_prob = american_to_prob(pd.to_numeric(df["price"], errors="coerce"))
 
     model = df["model"].fillna("normal").astype(str).values
     mu    = pd.to_numeric(df.get("mu"), errors="coerce").fillna(0.0)
@@ -99,17 +77,19 @@ def main():
 
     # P(Over)
     z = ((line.fillna(0.0) - mu) / sd).to_numpy()
-    p_over_norm = 1.0 - norm_cdf_vec(z)
-    line_np, lam_np = line.fillna(0.0).to_numpy(), lam.to_numpy()
-    p_over_pois = np.array([poisson_sf(Lv, lv) for Lv, lv in zip(line_np, lam_np)])
+    p_over_norm = norm_sf(z)
+    # Poisson rows only: the pmf loop runs up to the largest line, and yardage lines are in the hundreds
+    pois = model == "poisson"
+    p_over_pois = np.zeros(len(df))
+    p_over_pois[pois] = np.where(lam[pois] > 0, poisson_sf(line.fillna(0.0)[pois], lam[pois]), 0.0)
     p_over_bern = p_yes.to_numpy()
 
     p_over = np.where(model=="normal",  p_over_norm,
               np.where(model=="poisson", p_over_pois, p_over_bern))
 
     side_over = side.isin(["over","yes"]).to_numpy()
-    df["model_prob"]   = np.where(side_over, p_over, 1.0 - p_over)
-    df["implied_prob"] = price_prob.fillna(np.nan).to_numpy()
+    df["model_prob"]   = bernoulli(p_over, side_over)
+    df["implied_prob"] = price_prob
     df["edge_prob"]    = df["model_prob"] - df["implied_prob"]
 
     # Points-based edge (EV gap vs line)
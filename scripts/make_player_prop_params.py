@@ -15,57 +15,71 @@ import numpy as np
 # ---- BEGIN ADDED HELPERS (anytime TD) ----
 import math
 
-def _prob_to_american(p: float) -> float:
-    if p is None or p <= 0 or p >= 1:
-        return float('nan')
-    return -(p/(1-p))*100.0 if p >= 0.5 else ((1-p)/p)*100.0
+def _prob_to_american(p):
+    """Vectorized; same expression order as the old scalar helper so prices round-trip identically."""
+    p = np.asarray(p, dtype=float)
+    ok = (p > 0) & (p < 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = np.where(p >= 0.5, -(p/(1-p))*100.0, ((1-p)/p)*100.0)
+    return np.where(ok, out, np.nan)
 
 _FALLBACK = {
     "rush_att_td_rate": 0.028,
     "rec_td_per_rec":   0.055,
 }
+_DIRECT_TD = ('player_rush_tds','rush_tds','player_reception_tds','rec_tds')
 
 def _std_market(s: str) -> str:
     return s.lower().replace(" ", "_").replace(".", "")
 
-def _build_anytime_td_rows(params_df):
-    import pandas as pd
-    import numpy as np
-    out_rows = []
+def _first_mu(mu, market_std, gid, n_groups, markets):
+    """Per group: mu of the group's first row whose market is in `markets` (NaN if none)."""
+    sel = market_std.isin(markets).to_numpy()
+    first = pd.Series(mu[sel], index=gid[sel])
+    first = first[~first.index.duplicated()]
+    return first.reindex(np.arange(n_groups)).to_numpy(dtype=float)
+
+def _build_anytime_td_rows(params_df) -> pd.DataFrame:
+    """One player_anytime_td row per player (and team): lambda from TD means, else attempts/receptions rates."""
     have_team = 'team' in params_df.columns
     group_cols = ['player'] + (['team'] if have_team else [])
-    for _, g in params_df.groupby(group_cols, dropna=False):
-        gg = g.copy()
-        gg['market_std'] = gg['market'].map(_std_market)
-        lam = 0.0
-        # prefer direct TD mus
-        for m in ('player_rush_tds','rush_tds','player_reception_tds','rec_tds'):
-            v = gg.loc[gg['market_std']==_std_market(m),'mu']
-            if not v.empty and pd.notna(v.iloc[0]):
-                lam += float(v.iloc[0])
-        # fallback if no direct
-        if lam <= 0.0:
-            ra = gg.loc[gg['market_std'].isin(['player_rush_attempts','rush_att']),'mu']
-            if not ra.empty and pd.notna(ra.iloc[0]):
-                lam += float(ra.iloc[0]) * _FALLBACK['rush_att_td_rate']
-            rc = gg.loc[gg['market_std'].isin(['player_receptions','rec']),'mu']
-            if not rc.empty and pd.notna(rc.iloc[0]):
-                lam += float(rc.iloc[0]) * _FALLBACK['rec_td_per_rec']
-        lam = max(0.0, lam)
-        p_any = 1 - math.exp(-lam) if lam>0 else 0.0
-        fair = _prob_to_american(p_any)
-        out = {
-            'player': g['player'].iloc[0],
-            'market': 'player_anytime_td',
-            'mu': lam,
-            'sigma': float('nan'),
-            'model_prob': p_any,
-            'model_price': fair,
-            'model_line': fair,
-        }
-        if have_team: out['team'] = g['team'].iloc[0]
-        out_rows.append(out)
-    return out_rows
+    if params_df.empty:
+        return pd.DataFrame()
+    gid = params_df.groupby(group_cols, dropna=False, sort=True).ngroup().to_numpy()
+    n = int(gid.max()) + 1
+    market_std = params_df['market'].map(_std_market)
+    mu = params_df['mu'].to_numpy(dtype=float)
+    first_mu = lambda markets: _first_mu(mu, market_std, gid, n, markets)
+
+    # prefer direct TD mus (summed in this order, skipping missing)
+    lam = np.zeros(n)
+    for m in _DIRECT_TD:
+        v = first_mu([_std_market(m)])
+        lam = lam + np.where(np.isnan(v), 0.0, v)
+    # fallback if no direct
+    ra = first_mu(['player_rush_attempts','rush_att'])
+    rc = first_mu(['player_receptions','rec'])
+    fb = lam + np.where(np.isnan(ra), 0.0, ra * _FALLBACK['rush_att_td_rate'])
+    fb = fb + np.where(np.isnan(rc), 0.0, rc * _FALLBACK['rec_td_per_rec'])
+    lam = np.where(lam <= 0.0, fb, lam)
+    lam = np.where(lam > 0.0, lam, 0.0)
+    # math.exp, not np.exp: np.exp can differ in the last ulp and the CSV must not change
+    p_any = np.where(lam > 0, 1 - np.fromiter(map(math.exp, -lam), float, n), 0.0)
+    fair = _prob_to_american(p_any)
+
+    first = ~pd.Series(gid).duplicated().to_numpy()
+    keys = params_df.loc[first, group_cols].iloc[np.argsort(gid[first], kind="stable")]
+    out = pd.DataFrame({
+        'player': keys['player'].to_numpy(),
+        'market': 'player_anytime_td',
+        'mu': lam,
+        'sigma': np.nan,
+        'model_prob': p_any,
+        'model_price': fair,
+        'model_line': fair,
+    })
+    if have_team: out['team'] = keys['team'].to_numpy()
+    return out
 # ---- END ADDED HELPERS ----
 
 
@@ -80,6 +94,8 @@ def parse_args():
     ap.add_argument("--props_csv", default="data/props/latest_all_props.csv",
                     help="Props CSV that limits which players to output")
     ap.add_argument("--out", default="data/predictions/player_all_props_params.csv")
+    ap.add_argument("--team_features", default=None,
+                    help="team_features.py output dir: add each player's team and its season-to-date offense rates")
     return ap.parse_args()
 
 # Market → model + stat key
@@ -149,12 +165,13 @@ def first_col(df, names):
     return None
 
 def load_weekly_for_target(season:int, week:int, back_seasons:int):
-    import nfl_data_py as nfl
+    import nfl_data  # local Parquet dumps first; nflverse only for missing / stale seasons
     if week <= 1:
         seasons = list(range(season - back_seasons, season))
+        weekly = nfl_data.weekly(seasons)
     else:
         seasons = [season]
-    weekly = nfl.import_weekly_data(seasons)
+        weekly = nfl_data.weekly(seasons, through_week=week - 1)
 
     # limit to weeks < target week for current season runs
     if week > 1:
@@ -166,6 +183,14 @@ def load_weekly_for_target(season:int, week:int, back_seasons:int):
     weekly["player"] = weekly[name_col].astype(str).str.replace(r"\s+"," ",regex=True).str.strip()
     return weekly
 
+def _stat_matrix(params, stats, suffix):
+    """(players x markets) values of <stat><suffix>; NaN where the column doesn't exist."""
+    out = np.full((len(params), len(stats)), np.nan)
+    for j, st in enumerate(stats):
+        if f"{st}{suffix}" in params.columns:
+            out[:, j] = params[f"{st}{suffix}"].to_numpy(dtype=float)
+    return out
+
 def build_params(weekly: pd.DataFrame, want_players: list[str]) -> pd.DataFrame:
     # map canonical stats
     for key, aliases in CANDIDATES.items():
@@ -217,24 +242,42 @@ def build_params(weekly: pd.DataFrame, want_players: list[str]) -> pd.DataFrame:
     # anytime TD prior
     params["anytime_td_rate"] = params["anytime_td_rate"].fillna(0.08)
 
-    # tidy rows
-    rows = []
-    for _, r in params.iterrows():
-        for mkt,(kind, stat) in MARKET_MODEL.items():
-            if kind == "normal":
-                mu = float(r.get(f"{stat}_mean", np.nan))
-                sd = float(r.get(f"{stat}_std",  np.nan))
-                if not (sd==sd) or sd <= 0: sd = DEFAULTS_NORMAL.get(stat,(0,10))[1]
-                rows.append({"player": r["player"], "market": mkt, "model": "normal", "mu": mu, "sigma": max(1e-6, sd), "games": int(r["games"])})
-            elif kind == "poisson":
-                lam = float(r.get(f"{stat}_mean", np.nan))
-                if not (lam==lam) or lam <= 0: lam = 0.1
-                rows.append({"player": r["player"], "market": mkt, "model": "poisson", "lam": max(1e-9, lam), "games": int(r["games"])})
-            else:  # bernoulli
-                p = float(r.get("anytime_td_rate", np.nan))
-                if not (p==p) or p <= 0: p = 0.05
-                rows.append({"player": r["player"], "market": mkt, "model": "bernoulli", "p": min(max(p,0.001),0.95), "games": int(r["games"])})
-    return pd.DataFrame(rows)
+    # tidy rows: players x markets, player-major, markets in MARKET_MODEL order
+    mkts = pd.DataFrame([(m, k, st) for m,(k,st) in MARKET_MODEL.items()], columns=["market","model","stat"])
+    n_p, n_m = len(params), len(mkts)
+    kind = np.tile(mkts["model"].to_numpy(), n_p)
+    mean = _stat_matrix(params, mkts["stat"], "_mean").ravel()
+    std  = _stat_matrix(params, mkts["stat"], "_std").ravel()
+    td   = np.repeat(params["anytime_td_rate"].to_numpy(dtype=float), n_m)
+    sd0  = np.tile([DEFAULTS_NORMAL.get(st,(0,10))[1] for st in mkts["stat"]], n_p)
+
+    with np.errstate(invalid="ignore"):
+        sd  = np.where(np.isnan(std) | (std <= 0), sd0, std)
+        lam = np.where(np.isnan(mean) | (mean <= 0), 0.1, mean)
+        p   = np.where(np.isnan(td) | (td <= 0), 0.05, td)
+    is_normal = kind == "normal"
+    # column order as the old per-row dicts produced it (normal, then poisson, then bernoulli fields)
+    return pd.DataFrame({
+        "player": np.repeat(params["player"].to_numpy(), n_m),
+        "market": np.tile(mkts["market"].to_numpy(), n_p),
+        "model":  kind,
+        "mu":     np.where(is_normal, mean, np.nan),
+        "sigma":  np.where(is_normal, np.maximum(1e-6, sd), np.nan),
+        "games":  np.repeat(params["games"].to_numpy().astype(int), n_m),
+        "lam":    np.where(kind == "poisson", np.maximum(1e-9, lam), np.nan),
+        "p":      np.where(kind == "bernoulli", np.clip(p, 0.001, 0.95), np.nan),
+    })
+
+def attach_team_context(params, weekly, season, week, root):
+    """Player's latest team + that team's pre-week offense rates (EPA/play, PROE, pace, ...)."""
+    import team_features
+    team_col = first_col(weekly, ["team", "recent_team"])
+    if team_col is None:
+        return params
+    last = weekly.sort_values(["season", "week"]).groupby("player")[team_col].last().rename("team")
+    ctx = team_features.as_of("offense", season, week, root)
+    out = params.drop(columns=["team"], errors="ignore").merge(last, left_on="player", right_index=True, how="left")
+    return out.merge(ctx, on="team", how="left")
 
 def main():
     args = parse_args()
@@ -253,8 +296,10 @@ def main():
 
     # --- add anytime TD rows ---
     anytime_rows = _build_anytime_td_rows(params)
-    if anytime_rows:
-        params = pd.concat([params, pd.DataFrame(anytime_rows)], ignore_index=True)
+    if not anytime_rows.empty:
+        params = pd.concat([params, anytime_rows], ignore_index=True)
+    if args.team_features:
+        params = attach_team_context(params, weekly, args.season, args.week, args.team_features)
 
     # reorder columns so new fields show up consistently
     cols = ['player','team','market','mu','sigma','model_line','model_prob','model_price']
@@ -1,37 +1,43 @@
 #!/usr/bin/env python3
 # scripts/make_predictions_from_elo.py
-import argparse, pathlib
-import pandas as pd
+"""
+Game predictions from Elo ratings for the matchups in an odds file.
+
+Win probabilities and the Elo margin proxy are computed over arrays (elo.py game
+model), so any number of games costs one vectorized pass; --matrix also writes
+every home/away pairing of the rated teams (32 x 32) for lookahead lines.
+
+Odds input is an Odds API dump (JSON array, possibly with "[info]" log lines or
+trailing text around it) or a flat CSV with game_id, commence_time, home_team,
+away_team.
+
+Usage:
+  python3 scripts/make_predictions_from_elo.py --odds data/odds/latest.csv
+  python3 scripts/make_predictions_from_elo.py --season 2025 --week 7 --matrix data/predictions/elo_matrix.csv
+"""
+import argparse, io, json, pathlib, re
 import numpy as np
-# --- odds loader that accepts JSON array or CSV ---
-# ---- Robust loader for Odds API output (JSON-with-noise or CSV) ----
-import json, pathlib, re, pandas as pd, sys
-
-def _extract_first_json_array(txt: str) -> str | None:
-    """Return the first well-balanced JSON array substring, or None."""
-    i = txt.find('[')
-    if i == -1:
+import pandas as pd
+
+import elo
+from prob_kernels import prob_to_american
+
+ODDS_COLS = ["game_id", "commence_time", "home_team", "away_team"]
+HFA = elo.PARAMS["hfa"]
+ELO_PER_POINT = 25.0   # rough points proxy: Elo difference / 25
+
+
+# ---------- odds ----------
+def _json_games(txt: str):
+    """The first JSON array in txt (text after it is ignored; one trailing-comma repair), or None."""
+    if "[" not in txt:
         return None
-    depth = 0
-    in_str = False
-    esc = False
-    for j, ch in enumerate(txt[i:], start=i):
-        if in_str:
-            if esc:
-                esc = False
-            elif ch == '\\':
-                esc = True
-            elif ch == '"':
-                in_str = False
+    dec = json.JSONDecoder()
+    for blob in (txt, re.sub(r",\s*([}\]])", r"\1", txt)):
+        try:
+            return dec.raw_decode(blob, blob.find("["))[0]
+        except json.JSONDecodeError:
             continue
-        if ch == '"':
-            in_str = True
-        elif ch == '[':
-            depth += 1
-        elif ch == ']':
-            depth -= 1
-            if depth == 0:
-                return txt[i:j+1]
     return None
 
 def load_odds(path: str) -> pd.DataFrame:
@@ -41,41 +47,30 @@ def load_odds(path: str) -> pd.DataFrame:
         raise SystemExit(f"odds file is empty: {path}")
 
     # Strip chatty lines like "[info] ..."
-    lines = [ln for ln in raw.splitlines() if not ln.lstrip().startswith("[info]")]
-    txt = "\n".join(lines).strip()
-
-    # Try CSV first (cheap if it's already flat)
-    try:
-        df = pd.read_csv(pd.compat.StringIO(txt))
-        if {"game_id","commence_time","home_team","away_team"}.issubset(df.columns):
-            return df
-    except Exception:
-        pass
-
-    # Try to isolate the first balanced JSON array anywhere in the text
-    blob = _extract_first_json_array(txt)
-    if blob:
+    txt = "\n".join(ln for ln in raw.splitlines() if not ln.lstrip().startswith("[info]")).strip()
+
+    # Flat CSV unless it looks like JSON; anything else gets one JSON pass
+    if txt[0] not in "[{":
         try:
-            arr = json.loads(blob)
-        except json.JSONDecodeError:
-            # Light repair: remove trailing commas before ] or }
-            repaired = re.sub(r",\s*([}\]])", r"\1", blob)
-            arr = json.loads(repaired)  # will raise if still invalid
-        rows = [{
-            "game_id": g.get("id") or g.get("event_id"),
-            "commence_time": g.get("commence_time"),
-            "home_team": g.get("home_team"),
-            "away_team": g.get("away_team"),
-        } for g in arr]
-        return pd.DataFrame(rows)
+            df = pd.read_csv(io.StringIO(txt))
+            if set(ODDS_COLS).issubset(df.columns):
+                return df
+        except (pd.errors.ParserError, pd.errors.EmptyDataError):
+            pass
+    arr = _json_games(txt)
+    if arr is not None:
+        df = pd.DataFrame(arr)
+        if "game_id" not in df.columns:
+            ids = df["id"] if "id" in df.columns else pd.Series(index=df.index, dtype=object)
+            df["game_id"] = ids.fillna(df["event_id"]) if "event_id" in df.columns else ids
+        return df.reindex(columns=ODDS_COLS)
 
     # Fallback: if a sibling flat file exists, use it
     alt = p.with_name("games_latest.csv")
     if alt.exists():
-        df = pd.read_csv(alt)
-        return df
+        return pd.read_csv(alt)
 
-    snippet = txt[:200].replace("\n","\\n")
+    snippet = txt[:200].replace("\n", "\\n")
     raise SystemExit(f"Could not parse odds as JSON or CSV. Snippet='{snippet}'")
 
 
@@ -92,35 +87,79 @@ TEAM_MAP = {
     "Carolina Panthers":"CAR","Chicago Bears":"CHI","Cincinnati Bengals":"CIN","Cleveland Browns":"CLE",
     "Dallas Cowboys":"DAL","Denver Broncos":"DEN","Detroit Lions":"DET","Green Bay Packers":"GB",
     "Houston Texans":"HOU","Indianapolis Colts":"IND","Jacksonville Jaguars":"JAX","Kansas City Chiefs":"KC",
-    "Las Vegas Raiders":"LV","Los Angeles Chargers":"LAC","Los Angeles Rams":"LAR","Miami Dolphins":"MIA",
+    "Las Vegas Raiders":"LV","Los Angeles Chargers":"LAC","Los Angeles Rams":"LA","Miami Dolphins":"MIA",
     "Minnesota Vikings":"MIN","New England Patriots":"NE","New Orleans Saints":"NO","New York Giants":"NYG",
     "New York Jets":"NYJ","Philadelphia Eagles":"PHI","Pittsburgh Steelers":"PIT","San Francisco 49ers":"SF",
     "Seattle Seahawks":"SEA","Tampa Bay Buccaneers":"TB","Tennessee Titans":"TEN","Washington Commanders":"WAS"
 }
 
-def elo_wp(home_elo, away_elo, hfa=55.0):
-    return 1.0 / (1.0 + 10 ** ( -(((home_elo + hfa) - away_elo) / 400.0) ))
+
+# ---------- predictions ----------
+def elo_wp(home_elo, away_elo, hfa=HFA):
+    """Home win probability; scalars or arrays."""
+    return elo.expected_home_win_prob(home_elo, away_elo, hfa)
+
+def predict(home_elo, away_elo, hfa=HFA) -> dict:
+    """home_win_prob, away_win_prob, pred_margin (home perspective) for arrays of matchups."""
+    home_elo = np.asarray(home_elo, dtype=float)
+    away_elo = np.asarray(away_elo, dtype=float)
+    p = elo_wp(home_elo, away_elo, hfa)
+    return {"home_win_prob": p, "away_win_prob": 1.0 - p,
+            "pred_margin": ((home_elo + hfa) - away_elo) / ELO_PER_POINT}
+
+def team_rows(games: pd.DataFrame) -> pd.DataFrame:
+    """Two rows per game (every home row, then every away row) with the team's win prob."""
+    n = len(games)
+    out = {c: np.tile(games[c].to_numpy(), 2) for c in ["game_id", "commence_time", "home_team", "away_team"]}
+    out["team"] = np.concatenate([games["home_team"].to_numpy(), games["away_team"].to_numpy()])
+    out["team_win_prob"] = np.concatenate([games["home_win_prob"].to_numpy(), games["away_win_prob"].to_numpy()])
+    out["pred_margin"] = np.tile(games["pred_margin"].to_numpy(), 2)
+    return pd.DataFrame(out, index=pd.RangeIndex(2 * n))
+
+def matchup_matrix(elo_map: dict, hfa=HFA) -> pd.DataFrame:
+    """Every ordered (home, away) pair of rated teams: win prob, margin, fair home moneyline."""
+    teams = np.array(sorted(elo_map))
+    r = np.array([elo_map[t] for t in teams], dtype=float)
+    h, a = np.nonzero(~np.eye(len(teams), dtype=bool))
+    pred = predict(r[h], r[a], hfa)
+    return pd.DataFrame({"home": teams[h], "away": teams[a], "home_elo": r[h], "away_elo": r[a],
+                         "home_win_prob": pred["home_win_prob"], "pred_margin": pred["pred_margin"],
+                         "home_fair_american": prob_to_american(pred["home_win_prob"], rounded=True)})
+
 
 def main():
-    ap = argparse.ArgumentParser(description="Make Week-1 predictions from 2024 Elo and odds matchups.")
+    ap = argparse.ArgumentParser(description="Make predictions from Elo ratings and odds matchups.")
     ap.add_argument("--elo", default="data/models/elo_2024.csv")
+    ap.add_argument("--season", type=int, default=None, help="With --week: ratings entering that week from elo.py history")
+    ap.add_argument("--week", type=int, default=None)
     ap.add_argument("--odds", default="data/odds/latest.csv")
     ap.add_argument("--out",  default="data/predictions/latest_predictions.csv")
+    ap.add_argument("--matrix", default=None, help="Also write every home/away pairing of the rated teams here")
     args = ap.parse_args()
 
     # Load Elo table (abbr -> rating)
-    elos = pd.read_csv(args.elo)
-    elo_map = dict(zip(elos["team"], elos["elo_2024_final"]))
+    if args.season is not None and args.week is not None:
+        elos = elo.ratings(args.season, args.week)
+        print(f"Elo entering {args.season} week {args.week} from {elo.ELO_DIR}")
+    else:
+        elos = pd.read_csv(args.elo)
+    elo_col = "elo" if "elo" in elos.columns else [c for c in elos.columns if c.startswith("elo_")][0]
+    elo_map = dict(zip(elos["team"], elos[elo_col]))
+
+    if args.matrix:
+        m = matchup_matrix(elo_map)
+        pathlib.Path(args.matrix).parent.mkdir(parents=True, exist_ok=True)
+        m.to_csv(args.matrix, index=False)
+        print(f"Wrote {args.matrix} with {len(m)} matchups")
 
     # Load unique games from odds
     odds = load_odds(args.odds)
-    required = ["game_id","commence_time","home_team","away_team"]
-    missing = [c for c in required if c not in odds.columns]
+    missing = [c for c in ODDS_COLS if c not in odds.columns]
     if missing:
         raise SystemExit(f"Odds missing required columns: {missing}. "
                          f"Columns present: {list(odds.columns)} from {args.odds}")
 
-    games = odds[["game_id","commence_time","home_team","away_team"]].drop_duplicates().copy()
+    games = odds[ODDS_COLS].drop_duplicates().copy()
 
     # Fix common short names
     games["home_team"] = games["home_team"].replace(NAME_FIX)
@@ -136,26 +175,11 @@ def main():
 
     games["home_elo"] = games["home_abbr"].map(elo_map).fillna(1500.0)
     games["away_elo"] = games["away_abbr"].map(elo_map).fillna(1500.0)
+    for c, v in predict(games["home_elo"], games["away_elo"]).items():
+        games[c] = v
 
-    # Win probabilities & a simple margin proxy from Elo diff
-    games["home_win_prob"] = games.apply(lambda r: elo_wp(r["home_elo"], r["away_elo"]), axis=1)
-    games["away_win_prob"] = 1.0 - games["home_win_prob"]
-    elo_diff = (games["home_elo"] + 55.0) - games["away_elo"]
-    games["pred_margin"] = elo_diff / 25.0  # rough points proxy
-
-    # Build team-level prediction rows without losing home_team/away_team columns
-    home_rows = games.copy()
-    home_rows["team"] = home_rows["home_team"]
-    home_rows["team_win_prob"] = home_rows["home_win_prob"]
-
-    away_rows = games.copy()
-    away_rows["team"] = away_rows["away_team"]
-    away_rows["team_win_prob"] = away_rows["away_win_prob"]
-
-    preds_cols = ["game_id","commence_time","home_team","away_team","team","team_win_prob","pred_margin"]
-    preds = pd.concat([home_rows[preds_cols], away_rows[preds_cols]], ignore_index=True)
-
-    pathlib.Path("data/predictions").mkdir(parents=True, exist_ok=True)
+    preds = team_rows(games)
+    pathlib.Path(args.out).parent.mkdir(parents=True, exist_ok=True)
     preds.to_csv(args.out, index=False)
     print(f"Wrote {args.out} with {len(preds)} rows")
 
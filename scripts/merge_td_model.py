@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
-import argparse, re, math
+import argparse, re
 import pandas as pd
 import numpy as np
+from prob_kernels import american_to_prob, norm_cdf, poisson_cdf, prob_to_american
 
 # ---------- Helpers ----------
 
@@ -39,76 +40,51 @@ def norm_market(s: str) -> str:
     }
     return aliases.get(s0, s0)
 
-def american_to_prob(odds):
-    if pd.isna(odds): return np.nan
-    o = float(odds)
-    return 100/(-o+100) if o < 0 else 100/(o+100)
-
-def prob_to_american(p):
-    if p is None or (isinstance(p,float) and (np.isnan(p) or p<=0 or p>=1)):
-        return np.nan
-    return -100*p/(1-p) if p>=0.5 else 100*(1-p)/p
-
-# Normal CDF
-def norm_cdf(x, mu, sigma):
-    if sigma is None or sigma<=0 or np.isnan(sigma): return None
-    z = (x - mu) / (sigma * math.sqrt(2.0))
-    return 0.5 * (1.0 + math.erf(z))
-
-# Poisson
-def poisson_pmf(k, lam):
-    if lam is None or lam<0 or np.isnan(lam) or k<0: return 0.0
-    return math.exp(-lam) * (lam**k) / math.factorial(k)
-
-def poisson_cdf(k, lam):
-    k = int(math.floor(k))
-    s = 0.0
-    for i in range(0, k+1):
-        s += poisson_pmf(i, lam)
-    return s
-
 # ---------- Core modeling ----------
 
-def compute_model_prob(row):
-    mkt = (row.get("market_std") or "").lower()
-    name = (row.get("name") or row.get("outcome") or "").lower()
-    mu = row.get("mu", np.nan)
-    sigma = row.get("sigma", np.nan)
-    point = row.get("point", np.nan)
+CONTINUOUS = {"rushing_yds","receiving_yds","receptions","passing_yds",
+              "pass_attempts","pass_completions","rush_attempts"}
+POISSON_DISC = {"passing_tds","rushing_tds","receiving_tds","interceptions",
+                "sacks","tackles_assists","solo_tackles","field_goals","kicking_points"}
+
+def _num(df, col):
+    return pd.to_numeric(df[col], errors="coerce") if col in df.columns else pd.Series(np.nan, index=df.index)
+
+def compute_model_prob(df: pd.DataFrame) -> np.ndarray:
+    """
+    model_prob for every row at once:
+      anytime_td  -> existing model_prob, else 1 - exp(-mu)
+      continuous  -> Normal(mu, sigma) over/under the point
+      counts      -> Poisson(mu) over/under floor(point)
+    Anything else (or missing inputs) is NaN.
+    """
+    mkt = df["market_std"].fillna("").astype(str).str.lower() if "market_std" in df.columns else pd.Series("", index=df.index)
+    name = df["name"] if "name" in df.columns else pd.Series(np.nan, index=df.index)
+    if "outcome" in df.columns:
+        name = name.fillna(df["outcome"])
+    name = name.fillna("").astype(str).str.lower()
+    over = name.str.contains("over", regex=False).to_numpy()
+    under = ~over & name.str.contains("under", regex=False).to_numpy()
+
+    mu, sigma, point = _num(df, "mu").to_numpy(), _num(df, "sigma").to_numpy(), _num(df, "point").to_numpy()
+    prior = _num(df, "model_prob").to_numpy()
 
     # Anytime TD
-    if mkt == "anytime_td":
-        if not pd.isna(row.get("model_prob", np.nan)):
-            return row["model_prob"]
-        if pd.isna(mu): return None
-        return 1.0 - math.exp(-float(mu))
+    p_any = np.where(np.isnan(prior), 1.0 - np.exp(-mu), prior)
 
     # Continuous (Normal CDF)
-    continuous = {"rushing_yds","receiving_yds","receptions","passing_yds",
-                  "pass_attempts","pass_completions","rush_attempts"}
-    if mkt in continuous:
-        if pd.isna(mu) or pd.isna(sigma) or pd.isna(point): return None
-        cdf = norm_cdf(float(point), float(mu), float(sigma))
-        if cdf is None: return None
-        if "over" in name:  return max(0.0, min(1.0, 1.0 - cdf))
-        if "under" in name: return max(0.0, min(1.0, cdf))
-        return None
-
-    # Discrete counts (Poisson)
-    poisson_disc = {"passing_tds","rushing_tds","receiving_tds","interceptions",
-                    "sacks","tackles_assists","solo_tackles","field_goals","kicking_points"}
-    if mkt in poisson_disc:
-        if pd.isna(mu) or pd.isna(point): return None
-        lam = float(mu); line = float(point)
-        if "over" in name:
-            k = int(math.floor(line) + 1)
-            return max(0.0, min(1.0, 1.0 - poisson_cdf(k-1, lam)))
-        if "under" in name:
-            k = int(math.floor(line))
-            return max(0.0, min(1.0, poisson_cdf(k, lam)))
-        return None
-
-    return None
+    cdf = norm_cdf(point, mu, sigma)
+    p_cont = np.where(over, 1.0 - cdf, np.where(under, cdf, np.nan))
+
+    # Discrete counts (Poisson): Over = P(X > floor(line)), Under = P(X <= floor(line)).
+    # Count rows only: the pmf loop runs up to the largest line, and yardage lines are in the hundreds.
+    disc = mkt.isin(POISSON_DISC).to_numpy()
+    pcdf = np.full(len(df), np.nan)
+    pcdf[disc] = poisson_cdf(point[disc], mu[disc])
+    p_disc = np.where(over, 1.0 - pcdf, np.where(under, pcdf, np.nan))
+
+    return np.select([(mkt == "anytime_td").to_numpy(), mkt.isin(CONTINUOUS).to_numpy(), disc],
+                    [p_any, np.clip(p_cont, 0.0, 1.0), np.clip(p_disc, 0.0, 1.0)], default=np.nan)
 
 # ---------- Main ----------
 
@@ -152,13 +128,13 @@ def main():
 
     # implied probs
     if "price" in merged.columns:
-        merged["market_prob"] = merged["price"].map(american_to_prob)
+        merged["market_prob"] = american_to_prob(merged["price"])
 
     # model probs
-    merged["model_prob"] = merged.apply(compute_model_prob, axis=1)
+    merged["model_prob"] = compute_model_prob(merged)
 
     # fair odds & edge
-    merged["model_price"] = merged["model_prob"].apply(prob_to_american)
+    merged["model_price"] = prob_to_american(merged["model_prob"])
     if "market_prob" in merged.columns:
         merged["edge_prob"] = merged["model_prob"] - merged["market_prob"]
 
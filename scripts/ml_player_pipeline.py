@@ -6,15 +6,25 @@ NFL Player ML Pipeline (player features + opponent-defense features)
 - Flexible filters (positions, player_ids)
 - Season-holdout or random split
 - Weekly prediction: only for weeks that already exist in weekly_player_stats.csv
+- Multi-target mode (--jobs): one process, shared feature store, models fit in a process pool
+- Model cache: fitted models are reused while the training data and settings match
+- Walk-forward backtest (--backtest): refit on all prior weeks, score each week, folds in a process pool
+- Optional PBP team context (--team_features): lagged team offense / opponent defense rates (team_features.py)
 """
 
-import argparse
+import argparse, os, time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
 from typing import List, Optional, Tuple
 import numpy as np
 import pandas as pd
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_absolute_error
+from rolling_features import lagged_means
+import feature_store
+import model_cache
+import team_features
 
 # ---------------------------
 # Column normalization
@@ -55,14 +65,23 @@ def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
         df = df.rename(columns={"name": "player_name"})
     return df
 
-def resolve_target_name(user_target: str, df: pd.DataFrame) -> str:
-    if user_target in df.columns:
+STAT_COLS = [
+    "passing_yards","rushing_yards","receiving_yards",
+    "attempts","completions","carries","targets",
+    "fantasy_points_ppr","rush_tds","rec_tds","pass_tds",
+    "receptions","sacks","interceptions","fumbles"
+]
+KEY_COLS = ["player_id","player_name","position","team","opponent_team","season","week"]
+
+def resolve_target_name(user_target: str, df) -> str:
+    cols = df.columns if hasattr(df, "columns") else df
+    if user_target in cols:
         return user_target
     if user_target in COL_ALIASES:
         canon = COL_ALIASES[user_target]
-        if canon in df.columns:
+        if canon in cols:
             return canon
-    raise ValueError(f"Target '{user_target}' not found. Sample cols: {sorted(df.columns)[:40]} ...")
+    raise ValueError(f"Target '{user_target}' not found. Sample cols: {sorted(cols)[:40]} ...")
 
 # ---------------------------
 # Load + Features
@@ -76,17 +95,13 @@ def load_player_weekly(csv_path: str) -> pd.DataFrame:
         df["player_name"] = df["player_id"]
     return df
 
+def _with_features(df, feats):
+    return pd.concat([df.drop(columns=[c for c in feats.columns if c in df.columns]), feats], axis=1)
+
 def add_player_rolling_and_season(df, cols, lookbacks, group_col="player_id", prefix="p_"):
     df = df.sort_values([group_col,"season","week"]).copy()
-    for col in cols:
-        for k in lookbacks:
-            df[f"{prefix}{col}_last{k}"] = (
-                df.groupby(group_col)[col].transform(lambda s: s.shift().rolling(k,min_periods=1).mean())
-            )
-        df[f"{prefix}{col}_season_avg"] = (
-            df.groupby([group_col,"season"])[col].transform(lambda s: s.shift().expanding().mean())
-        )
-    return df
+    # shifted last-k and season-to-date means for every col in one pass (see rolling_features.py)
+    return _with_features(df, lagged_means(df, group_col, cols, lookbacks, prefix))
 
 def build_defense_allowed(df_players, agg_cols, lookbacks):
     defense = (df_players.groupby(["season","week","opponent_team"], dropna=False)[agg_cols]
@@ -94,15 +109,7 @@ def build_defense_allowed(df_players, agg_cols, lookbacks):
                .reset_index()
                .rename(columns={"opponent_team":"def_team"}))
     defense = defense.sort_values(["def_team","season","week"]).copy()
-    for col in agg_cols:
-        for k in lookbacks:
-            defense[f"def_allowed_{col}_last{k}"] = (
-                defense.groupby("def_team")[col].transform(lambda s: s.shift().rolling(k,min_periods=1).mean())
-            )
-        defense[f"def_allowed_{col}_season_avg"] = (
-            defense.groupby(["def_team","season"])[col].transform(lambda s: s.shift().expanding().mean())
-        )
-    return defense
+    return _with_features(defense, lagged_means(defense, "def_team", agg_cols, lookbacks, "def_allowed_"))
 
 def join_defense_allowed(df_players, defense, feat_cols):
     use_cols = ["season","week","def_team"] + feat_cols
@@ -114,7 +121,7 @@ def join_defense_allowed(df_players, defense, feat_cols):
     )
     return merged.drop(columns=["def_team"])
 
-def build_dataset(player_csv, target, positions, player_ids, lookbacks):
+def _player_frame_from_csv(player_csv, target, positions, player_ids, lookbacks):
     df = load_player_weekly(player_csv)
     target = resolve_target_name(target, df)
 
@@ -123,17 +130,28 @@ def build_dataset(player_csv, target, positions, player_ids, lookbacks):
     if player_ids:
         df = df[df["player_id"].isin(player_ids)]
 
-    candidates = [
-        "passing_yards","rushing_yards","receiving_yards",
-        "attempts","completions","carries","targets",
-        "fantasy_points_ppr","rush_tds","rec_tds","pass_tds",
-        "receptions","sacks","interceptions","fumbles"
-    ]
-    num_cols = [c for c in candidates if c in df.columns]
-
+    num_cols = [c for c in STAT_COLS if c in df.columns]
     df = add_player_rolling_and_season(df, num_cols, lookbacks, "player_id", "p_")
+    return df, target, num_cols
 
-    def_cols = list(set(num_cols+[target]))
+def _player_frame_from_store(store_dir, player_csv, target, positions, player_ids, lookbacks, refresh=False):
+    path = feature_store.materialize(player_csv, lookbacks, STAT_COLS, load_player_weekly, store_dir, refresh)
+    m = feature_store.manifest(path)
+    target = resolve_target_name(target, m["columns"])
+    # project: keys, stats, target, and any raw column that would land in X
+    cols = KEY_COLS + [target] + [c for c in m["columns"] if c.startswith(("p_", "def_allowed_"))]
+    df = feature_store.player_features(path, cols, positions, player_ids)
+    return df, target, m["stat_cols"]
+
+def build_dataset(player_csv, target, positions, player_ids, lookbacks, store_dir=None, refresh_store=False,
+                  team_features_dir=None):
+    if store_dir:
+        df, target, num_cols = _player_frame_from_store(store_dir, player_csv, target, positions,
+                                                        player_ids, lookbacks, refresh_store)
+    else:
+        df, target, num_cols = _player_frame_from_csv(player_csv, target, positions, player_ids, lookbacks)
+
+    def_cols = list(dict.fromkeys(num_cols+[target]))  # stable feature order across runs
     defense = build_defense_allowed(df, def_cols, lookbacks)
 
     def_feats = []
@@ -142,6 +160,8 @@ def build_dataset(player_csv, target, positions, player_ids, lookbacks):
             def_feats.append(f"def_allowed_{col}_last{k}")
         def_feats.append(f"def_allowed_{col}_season_avg")
     df = join_defense_allowed(df, defense, def_feats)
+    if team_features_dir:
+        df = team_features.join(df, lookbacks, team_features_dir)
 
     need_cols = [f"p_{target}_season_avg"] + [f"p_{target}_last{k}" for k in lookbacks]
     need_cols = [c for c in need_cols if c in df.columns]
@@ -150,6 +170,8 @@ def build_dataset(player_csv, target, positions, player_ids, lookbacks):
     feat_cols = []
     feat_cols += [c for c in df.columns if c.startswith("p_")]
     feat_cols += [c for c in df.columns if c.startswith("def_allowed_")]
+    if team_features_dir:
+        feat_cols += team_features.feature_names(lookbacks)
     if "week" in df.columns: feat_cols.append("week")
     X = df[feat_cols].fillna(0)
     y = df[target].astype(float)
@@ -166,9 +188,7 @@ def season_holdout_split(df_keys, X, y, holdout_season):
 def random_split(X,y,test_size=0.2,seed=42):
     return train_test_split(X,y,test_size=test_size,random_state=seed,shuffle=True)
 
-def train_and_eval(X_train,y_train,X_test,y_test,n_estimators=600,seed=42):
-    model = RandomForestRegressor(n_estimators=n_estimators,random_state=seed,n_jobs=-1)
-    model.fit(X_train,y_train)
+def evaluate(model,X_test,y_test):
     if len(X_test):
         preds = model.predict(X_test)
         mae = mean_absolute_error(y_test,preds)
@@ -176,7 +196,47 @@ def train_and_eval(X_train,y_train,X_test,y_test,n_estimators=600,seed=42):
     else:
         mae = None
         print("No test rows available for MAE.")
-    return model, mae
+    return mae
+
+def train_and_eval(X_train,y_train,X_test,y_test,n_estimators=600,seed=42,n_jobs=-1):
+    model = RandomForestRegressor(n_estimators=n_estimators,random_state=seed,n_jobs=n_jobs)
+    model.fit(X_train,y_train)
+    return model, evaluate(model,X_test,y_test)
+
+def model_spec(opts: dict, target: str, positions, feat_cols) -> dict:
+    """Everything besides the training rows that determines the fitted model."""
+    window = ({"holdout_season": opts["holdout_season"]} if opts["split"]=="season_holdout"
+              else {"test_size": opts["test_size"]})
+    return {"target": target, "positions": sorted(positions or []), "player_ids": sorted(opts["player_ids"] or []),
+            "lookbacks": list(opts["lookbacks"]), "split": opts["split"], **window,
+            "model": "RandomForestRegressor", "n_estimators": opts["n_estimators"], "seed": opts["seed"],
+            "features": list(feat_cols)}
+
+def fit_or_load(opts, target, positions, X_train, y_train, X_test, y_test, tag=""):
+    """Reuse the cached model for this spec + training data, else fit (and cache) it. Returns (model, mae, source)."""
+    if opts.get("no_model_cache"):
+        model,mae=train_and_eval(X_train,y_train,X_test,y_test,opts["n_estimators"],opts["seed"],opts.get("n_jobs",-1))
+        return model, mae, "fit"
+    spec = model_spec(opts, target, positions, X_train.columns)
+    key = model_cache.artifact_key(spec, X_train, y_train)
+    model, meta = (None, None) if opts.get("refit") else model_cache.load(key, opts["model_cache"])
+    if model is not None:
+        print(f"{tag}[model_cache] hit {key} (trained {meta.get('saved_at')})")
+        if opts.get("predict_only"):
+            mae = meta.get("mae")
+            print(f"MAE: {mae:.3f} (cached)" if mae is not None else "No cached MAE.")
+        else:
+            mae = evaluate(model,X_test,y_test)
+        return model, mae, "cache"
+    if opts.get("predict_only"):
+        raise SystemExit(f"{tag}--predict_only: no cached model {key} for target={target} positions={positions} "
+                         f"in {opts['model_cache']} (run once without --predict_only)")
+    t0 = time.perf_counter()
+    model,mae=train_and_eval(X_train,y_train,X_test,y_test,opts["n_estimators"],opts["seed"],opts.get("n_jobs",-1))
+    path = model_cache.save(model, key, spec, {"mae": mae, "train_rows": len(y_train), "test_rows": len(y_test),
+                                               "fit_s": round(time.perf_counter() - t0, 2)}, opts["model_cache"])
+    print(f"{tag}[model_cache] saved {path}")
+    return model, mae, "fit"
 
 def predict_week_existing_rows(model,df_all,X_all,season,week):
     mask = (df_all["season"]==season)&(df_all["week"]==week)
@@ -189,13 +249,205 @@ def predict_week_existing_rows(model,df_all,X_all,season,week):
     out["prediction"] = preds
     return out.sort_values(["team","position","player_name"])
 
+# ---------------------------
+# Jobs
+# ---------------------------
+def parse_job(spec: str) -> dict:
+    """NAME=TARGET[:POS1,POS2,...]  e.g. wrte_rec=receiving_yards:WR,TE"""
+    name, _, rest = spec.partition("=")
+    target, _, pos = rest.partition(":")
+    if not name or not target:
+        raise argparse.ArgumentTypeError(f"Bad job '{spec}' (expected NAME=TARGET[:POS1,POS2])")
+    return {"name": name, "target": target, "positions": [p for p in pos.split(",") if p] or None}
+
+def run_job(opts: dict, job: dict) -> dict:
+    """Build (from the feature store), fit, evaluate and optionally predict one target."""
+    t0 = time.perf_counter()
+    tag = f"[{job['name']}] " if job.get("name") else ""
+    store_dir = None if opts["no_feature_store"] else opts["feature_store"]
+    X,y,df_all = build_dataset(opts["player_csv"],job["target"],job["positions"],opts["player_ids"],opts["lookbacks"],
+                               store_dir,opts["refresh_features"],opts.get("team_features"))
+    t_build = time.perf_counter()
+    print(f"{tag}Rows: {len(df_all)} | Features: {X.shape[1]}")
+    if opts["split"]=="season_holdout":
+        X_train,X_test,y_train,y_test=season_holdout_split(df_all,X,y,opts["holdout_season"])
+    else:
+        X_train,X_test,y_train,y_test=random_split(X,y,opts["test_size"],opts["seed"])
+    print(f"{tag}Train rows: {len(y_train)} | Test rows: {len(y_test)}")
+    model,mae,source=fit_or_load(opts,resolve_target_name(job["target"],df_all),job["positions"],
+                                 X_train,y_train,X_test,y_test,tag)
+    t_fit = time.perf_counter()
+
+    n_preds, out_path = 0, None
+    if opts["predict_season"] is not None and opts["predict_week"] is not None:
+        preds_df=predict_week_existing_rows(model,df_all,X,opts["predict_season"],opts["predict_week"])
+        out_path = job.get("save_preds")
+        if out_path and not preds_df.empty:
+            preds_df.to_csv(out_path,index=False)
+            print(f"{tag}Saved predictions -> {out_path}")
+        elif preds_df.empty:
+            print(f"{tag}No predictions to write (empty).")
+            out_path = None
+        else:
+            print(f"{tag}Predictions ready.")
+        n_preds = len(preds_df)
+    t_end = time.perf_counter()
+    return {"name": job.get("name"), "target": job["target"], "positions": " ".join(job["positions"] or []),
+            "rows": len(df_all), "features": X.shape[1], "train_rows": len(y_train), "test_rows": len(y_test),
+            "mae": mae, "model": source, "predictions": n_preds, "preds_csv": out_path,
+            "build_s": round(t_build - t0, 2), "fit_s": round(t_fit - t_build, 2),
+            "predict_s": round(t_end - t_fit, 2), "total_s": round(t_end - t0, 2)}
+
+def run_jobs(opts: dict, jobs: list, workers: int = 0) -> pd.DataFrame:
+    """
+    Run every job in one invocation: the feature store entry is materialized
+    once up front, then the fits run concurrently in a process pool. Each
+    worker's RandomForest gets an equal share of the cores.
+    """
+    t0 = time.perf_counter()
+    cores = os.cpu_count() or 1
+    workers = max(1, min(len(jobs), workers or cores))
+    opts = dict(opts, n_jobs=max(1, cores // workers))
+    if not opts["no_feature_store"]:
+        feature_store.materialize(opts["player_csv"], opts["lookbacks"], STAT_COLS, load_player_weekly,
+                                  opts["feature_store"], opts["refresh_features"])
+        opts["refresh_features"] = False
+    print(f"[jobs] {len(jobs)} jobs | {workers} workers x {opts['n_jobs']} RF threads")
+
+    rows = []
+    if workers == 1:
+        rows = [run_job(opts, job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futs = {pool.submit(run_job, opts, job): job["name"] for job in jobs}
+            for fut in as_completed(futs):
+                rows.append(fut.result())
+                print(f"[jobs] done {futs[fut]} ({rows[-1]['total_s']:.1f}s)")
+    order = {job["name"]: i for i, job in enumerate(jobs)}
+    summary = pd.DataFrame(sorted(rows, key=lambda r: order[r["name"]]))
+    print(summary[["name","target","positions","train_rows","test_rows","mae","model","predictions","build_s","fit_s","total_s"]]
+          .to_string(index=False))
+    print(f"[jobs] wall {time.perf_counter() - t0:.1f}s vs {summary['total_s'].sum():.1f}s serial job time")
+    return summary
+
+# ---------------------------
+# Walk-forward backtest
+# ---------------------------
+_SHARED = {}   # per-process views of the feature matrix (see _attach_shared)
+
+def parse_season_week(spec: str) -> Tuple[int, Optional[int]]:
+    """SEASON or SEASON:WEEK  e.g. 2023 or 2024:5"""
+    season, _, week = spec.partition(":")
+    try:
+        return int(season), (int(week) if week else None)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Bad season/week '{spec}' (expected SEASON or SEASON:WEEK)")
+
+def _share_arrays(arrays: dict):
+    """Copy arrays into named shared-memory blocks; workers attach by name instead of unpickling copies."""
+    blocks, spec = [], {}
+    for name, a in arrays.items():
+        a = np.ascontiguousarray(a)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, a.nbytes))
+        np.ndarray(a.shape, a.dtype, buffer=shm.buf)[...] = a
+        blocks.append(shm)
+        spec[name] = (shm.name, a.shape, a.dtype.str)
+    return blocks, spec
+
+def _attach_shared(spec: dict):
+    """Pool initializer: map the parent's blocks (read-only use; the parent owns and unlinks them)."""
+    for name, (shm_name, shape, dtype) in spec.items():
+        shm = shared_memory.SharedMemory(name=shm_name)
+        _SHARED[name] = np.ndarray(shape, np.dtype(dtype), buffer=shm.buf)
+        _SHARED["_blocks"] = _SHARED.get("_blocks", []) + [shm]
+
+def _backtest_fold(fold: dict) -> List[dict]:
+    """Fit on every row before the fold's first week, score each week in the fold."""
+    t0 = time.perf_counter()
+    X, y, wk = _SHARED["X"], _SHARED["y"], _SHARED["wk"]
+    train = wk < fold["weeks"][0]
+    model = RandomForestRegressor(n_estimators=fold["n_estimators"],random_state=fold["seed"],n_jobs=fold["n_jobs"])
+    model.fit(X[train],y[train])
+    fit_s = time.perf_counter() - t0
+    rows = []
+    for j, w in enumerate(fold["weeks"]):
+        test = wk == w
+        err = model.predict(X[test]) - y[test]
+        rows.append({"season": w // 100, "week": w % 100, "train_rows": int(train.sum()), "test_rows": int(test.sum()),
+                     "mae": np.abs(err).mean(), "rmse": np.sqrt((err**2).mean()), "bias": err.mean(),
+                     "sum_abs": np.abs(err).sum(), "sum_sq": (err**2).sum(), "sum_err": err.sum(),
+                     "fit_s": round(fit_s, 2) if j == 0 else 0.0})   # later weeks reuse the fit
+    return rows
+
+def run_backtest(opts: dict, job: dict, start, end, refit_every: int = 1, workers: int = 0) -> pd.DataFrame:
+    """
+    Walk-forward evaluation: for each (season, week) in [start, end], train on all
+    earlier rows and score that week (features are lagged, so nothing leaks). With
+    refit_every=N one model scores N consecutive weeks. Folds run in a process pool
+    that maps X / y from shared memory.
+    """
+    t0 = time.perf_counter()
+    tag = f"[{job['name']}] " if job.get("name") else ""
+    store_dir = None if opts["no_feature_store"] else opts["feature_store"]
+    X,y,df_all = build_dataset(opts["player_csv"],job["target"],job["positions"],opts["player_ids"],opts["lookbacks"],
+                               store_dir,opts["refresh_features"],opts.get("team_features"))
+    wk = (df_all["season"]*100 + df_all["week"]).to_numpy(np.int64)
+    lo = start[0]*100 + (start[1] or 0)
+    hi = end[0]*100 + (end[1] or 99)
+    weeks = [w for w in np.unique(wk) if lo <= w <= hi and (wk < w).any()]
+    if not weeks:
+        print(f"{tag}No weeks to backtest in {start}..{end}.")
+        return pd.DataFrame()
+    cores = os.cpu_count() or 1
+    chunks = [weeks[i:i+refit_every] for i in range(0, len(weeks), max(1, refit_every))]
+    workers = max(1, min(len(chunks), workers or cores))
+    folds = [{"weeks": c, "n_estimators": opts["n_estimators"], "seed": opts["seed"],
+              "n_jobs": max(1, cores // workers)} for c in chunks][::-1]   # biggest training sets first
+    print(f"{tag}[backtest] {len(weeks)} weeks {weeks[0]}..{weeks[-1]} | {len(folds)} fits | "
+          f"{workers} workers x {folds[0]['n_jobs']} RF threads | X {X.shape[0]:,} x {X.shape[1]}")
+
+    # RF fits on float32 anyway; sharing it halves the mapped matrix
+    arrays = {"X": X.to_numpy(np.float32), "y": y.to_numpy(np.float64), "wk": wk}
+    rows = []
+    if workers == 1:
+        _SHARED.update(arrays)
+        for f in folds:
+            rows += _backtest_fold(f)
+    else:
+        blocks, spec = _share_arrays(arrays)
+        del arrays
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_attach_shared, initargs=(spec,)) as pool:
+                for fut in as_completed([pool.submit(_backtest_fold, f) for f in folds]):
+                    done = fut.result()
+                    rows += done
+                    print(f"{tag}[backtest] {done[0]['season']} wk{done[0]['week']}"
+                          f"{'+' + str(len(done) - 1) if len(done) > 1 else ''} done ({done[0]['fit_s']:.1f}s fit)")
+        finally:
+            for shm in blocks:
+                shm.close(); shm.unlink()
+
+    table = pd.DataFrame(rows).sort_values(["season","week"], ignore_index=True)
+    n = table["test_rows"].sum()
+    total = {"season": "ALL", "week": "", "train_rows": "", "test_rows": n,
+             "mae": table["sum_abs"].sum()/n, "rmse": np.sqrt(table["sum_sq"].sum()/n),
+             "bias": table["sum_err"].sum()/n, "fit_s": table["fit_s"].sum()}
+    table = pd.concat([table, pd.DataFrame([total])], ignore_index=True).drop(columns=["sum_abs","sum_sq","sum_err"])
+    print(table.to_string(index=False, float_format=lambda x: f"{x:.3f}"))
+    print(f"{tag}[backtest] wall {time.perf_counter() - t0:.1f}s vs {total['fit_s']:.1f}s serial fit time")
+    return table
+
 # ---------------------------
 # CLI
 # ---------------------------
 def parse_args():
     p=argparse.ArgumentParser()
     p.add_argument("--player_csv",required=True)
-    p.add_argument("--target",required=True)
+    p.add_argument("--target",default=None,help="Single-target mode (or use --jobs)")
+    p.add_argument("--jobs",nargs="+",type=parse_job,default=None,
+                   help="Multi-target mode: NAME=TARGET[:POS1,POS2] ... (ignores --target/--positions)")
+    p.add_argument("--workers",type=int,default=0,help="--jobs / --backtest process pool size (0 = one per core)")
+    p.add_argument("--save_dir",default="preds",help="--jobs: writes <season>_wk<week>_<name>.csv + _summary.csv here")
     p.add_argument("--positions",nargs="*",default=None)
     p.add_argument("--player_ids",nargs="*",default=None)
     p.add_argument("--lookbacks",nargs="+",type=int,default=[3])
@@ -207,28 +459,47 @@ def parse_args():
     p.add_argument("--predict_season",type=int,default=None)
     p.add_argument("--predict_week",type=int,default=None)
     p.add_argument("--save_preds",default=None)
-    return p.parse_args()
+    p.add_argument("--feature_store",default=str(feature_store.STORE_DIR),help="Parquet feature store root")
+    p.add_argument("--no_feature_store",action="store_true",help="Recompute features from the CSV")
+    p.add_argument("--refresh_features",action="store_true",help="Rebuild this CSV's feature store entry from scratch (no incremental append)")
+    p.add_argument("--model_cache",default=str(model_cache.MODEL_DIR),help="Fitted model artifact root")
+    p.add_argument("--no_model_cache",action="store_true",help="Always fit; don't read or write artifacts")
+    p.add_argument("--refit",action="store_true",help="Fit even if a matching artifact exists (and replace it)")
+    p.add_argument("--predict_only",action="store_true",help="Score with the cached model; error instead of fitting")
+    p.add_argument("--backtest",nargs=2,type=parse_season_week,default=None,metavar=("FROM","TO"),
+                   help="Walk-forward backtest over SEASON[:WEEK] FROM..TO (replaces the split/predict run)")
+    p.add_argument("--refit_every",type=int,default=1,help="--backtest: weeks scored per refit")
+    p.add_argument("--team_features",default=None,help="team_features.py output dir: add lagged PBP team offense / opponent defense features")
+    args=p.parse_args()
+    if not args.target and not args.jobs:
+        p.error("one of --target or --jobs is required")
+    return args
 
 def main():
     args=parse_args()
-    X,y,df_all=build_dataset(args.player_csv,args.target,args.positions,args.player_ids,args.lookbacks)
-    print(f"Rows: {len(df_all)} | Features: {X.shape[1]}")
-    if args.split=="season_holdout":
-        X_train,X_test,y_train,y_test=season_holdout_split(df_all,X,y,args.holdout_season)
-        print(f"Train rows: {len(y_train)} | Test rows: {len(y_test)}")
-    else:
-        X_train,X_test,y_train,y_test=random_split(X,y,args.test_size,args.seed)
-        print(f"Train rows: {len(y_train)} | Test rows: {len(y_test)}")
-    model,mae=train_and_eval(X_train,y_train,X_test,y_test,args.n_estimators,args.seed)
-    if args.predict_season is not None and args.predict_week is not None:
-        preds_df=predict_week_existing_rows(model,df_all,X,args.predict_season,args.predict_week)
-        if args.save_preds and not preds_df.empty:
-            preds_df.to_csv(args.save_preds,index=False)
-            print(f"Saved predictions -> {args.save_preds}")
-        elif preds_df.empty:
-            print("No predictions to write (empty).")
-        else:
-            print("Predictions ready.")
+    opts=vars(args)
+    if args.backtest:
+        os.makedirs(args.save_dir,exist_ok=True)
+        (f0,w0),(f1,w1)=args.backtest
+        span=f"{f0}{'wk'+str(w0) if w0 else ''}_{f1}{'wk'+str(w1) if w1 else ''}"
+        for job in args.jobs or [{"name":args.target,"target":args.target,"positions":args.positions}]:
+            table=run_backtest(opts,job,args.backtest[0],args.backtest[1],args.refit_every,args.workers)
+            if not table.empty:
+                out=os.path.join(args.save_dir,f"backtest_{job['name']}_{span}.csv")
+                table.to_csv(out,index=False)
+                print(f"Saved backtest -> {out}")
+        return
+    if args.jobs:
+        os.makedirs(args.save_dir,exist_ok=True)
+        stem=f"{args.predict_season}_wk{args.predict_week}" if args.predict_week is not None else "train"
+        for job in args.jobs:
+            job["save_preds"]=os.path.join(args.save_dir,f"{stem}_{job['name']}.csv")
+        summary=run_jobs(opts,args.jobs,args.workers)
+        out=os.path.join(args.save_dir,f"{stem}_summary.csv")
+        summary.to_csv(out,index=False)
+        print(f"Saved summary -> {out}")
+        return
+    run_job(opts,{"name":None,"target":args.target,"positions":args.positions,"save_preds":args.save_preds})
 
 if __name__=="__main__":
     main()
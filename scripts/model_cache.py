@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Versioned model artifacts for ml_player_pipeline.
+
+A fitted RandomForest is stored once per
+  target + positions + player_ids + lookbacks + split/training window
+  + hyperparameters + feature columns + sha256(X_train, y_train)
+  + ARTIFACT_VERSION + sklearn version
+under data/models/<key>/ as a joblib dump (model.joblib) plus
+meta.json (spec, MAE, row counts, fit time).
+
+Scoring a different week, or re-running after a page/UI change, loads the
+trained model instead of refitting. (Not memory-mapped: sklearn's
+Tree.__setstate__ copies the node / value arrays into its own buffers, so
+mmap_mode="r" saves neither load time nor memory for a forest.) New weeks
+of the holdout season do not change the training rows, so they do not
+change the key either.
+
+Usage:
+  python3 scripts/model_cache.py            # list artifacts
+  python3 scripts/model_cache.py --prune 5  # keep the 5 newest per target
+"""
+
+import argparse, hashlib, json, os, pathlib, shutil, time
+from typing import Optional, Tuple
+import joblib
+import pandas as pd
+import sklearn
+
+ARTIFACT_VERSION = 1
+MODEL_DIR = pathlib.Path(os.getenv("MODEL_CACHE_DIR", "data/models"))
+MODEL_FILE = "model.joblib"
+META_FILE = "meta.json"
+
+
+# ---------------------------
+# Keys
+# ---------------------------
+def data_digest(X: pd.DataFrame, y: pd.Series) -> str:
+    """Training data fingerprint: feature names + row hashes of X and y (index ignored)."""
+    h = hashlib.sha256(json.dumps([str(c) for c in X.columns]).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(X, index=False).to_numpy().tobytes())
+    h.update(pd.util.hash_pandas_object(y.astype(float), index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+def artifact_key(spec: dict, X_train: pd.DataFrame, y_train: pd.Series) -> str:
+    full = dict(spec, data=data_digest(X_train, y_train), version=ARTIFACT_VERSION, sklearn=sklearn.__version__)
+    return hashlib.sha256(json.dumps(full, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:20]
+
+
+# ---------------------------
+# Save / load
+# ---------------------------
+def save(model, key: str, spec: dict, meta: dict, root=None) -> pathlib.Path:
+    path = pathlib.Path(root or MODEL_DIR) / key
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    joblib.dump(model, tmp / MODEL_FILE)   # uncompressed (fast to load)
+    (tmp / META_FILE).write_text(json.dumps(dict(meta, spec=spec, key=key, version=ARTIFACT_VERSION,
+                                                 sklearn=sklearn.__version__,
+                                                 saved_at=time.strftime("%Y-%m-%dT%H:%M:%S")),
+                                            indent=1, default=str), encoding="utf-8")
+    if path.exists():  # same key => same training data and settings
+        shutil.rmtree(path)
+    os.replace(tmp, path)
+    return path
+
+def load(key: str, root=None) -> Tuple[Optional[object], Optional[dict]]:
+    """(model, meta) for a key, or (None, None) if there is no artifact."""
+    path = pathlib.Path(root or MODEL_DIR) / key
+    if not (path / MODEL_FILE).exists():
+        return None, None
+    meta = json.loads((path / META_FILE).read_text(encoding="utf-8"))
+    model = joblib.load(path / MODEL_FILE)
+    return model, meta
+
+def artifacts(root=None) -> pd.DataFrame:
+    rows = []
+    for mf in pathlib.Path(root or MODEL_DIR).glob(f"*/{META_FILE}"):
+        m = json.loads(mf.read_text(encoding="utf-8"))
+        spec = m.get("spec", {})
+        rows.append({"key": m.get("key", mf.parent.name), "target": spec.get("target"),
+                     "positions": " ".join(spec.get("positions") or []), "train_rows": m.get("train_rows"),
+                     "mae": m.get("mae"), "fit_s": m.get("fit_s"), "saved_at": m.get("saved_at"),
+                     "mb": round((mf.parent / MODEL_FILE).stat().st_size / 1e6, 1)})
+    cols = ["key", "target", "positions", "train_rows", "mae", "fit_s", "saved_at", "mb"]
+    return pd.DataFrame(rows, columns=cols).sort_values(["target", "positions", "saved_at"], ignore_index=True)
+
+
+# ---------------------------
+# CLI
+# ---------------------------
+def main():
+    ap = argparse.ArgumentParser(description="List / prune ml_player_pipeline model artifacts.")
+    ap.add_argument("--model_dir", default=str(MODEL_DIR))
+    ap.add_argument("--prune", type=int, default=None, help="Keep only the N newest artifacts per target+positions")
+    args = ap.parse_args()
+    df = artifacts(args.model_dir)
+    if args.prune is not None and not df.empty:
+        old = df.groupby(["target", "positions"], group_keys=False).apply(lambda g: g.iloc[:-args.prune or None])
+        for key in old["key"]:
+            shutil.rmtree(pathlib.Path(args.model_dir) / key)
+        print(f"[model_cache] pruned {len(old)} artifacts")
+        df = artifacts(args.model_dir)
+    print(df.to_string(index=False) if not df.empty else f"[model_cache] no artifacts in {args.model_dir}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# scripts/nfl_data.py
+"""
+Local-first access to the nflverse datasets the pull scripts already dump.
+
+  weekly(seasons)          weekly player stats   data/weekly_player_stats/
+  schedules(seasons)       schedules + results   data/nfl_supplemental/schedules/
+  rosters(seasons)         seasonal rosters      data/seasonal_rosters/
+  weekly_rosters(seasons)  weekly rosters        data/weekly_rosters/
+  ids()                    unified player IDs    data/player_ids_unified/
+  pbp(seasons, columns)    play-by-play          data/nfl_supplemental/play_by_play/ (pass columns=)
+
+Dumps are the partitioned tables of parquet_table.py; an older single-file
+<name>.parquet dump is still read when the table directory does not exist.
+
+Only seasons missing from the dump are fetched from nflverse (nfl_data_py).
+With through_week=N, so is a season whose latest completed week is below N.
+Fetched seasons are kept under data/nflverse_cache/<dataset>/season=<year>.parquet,
+so the next run is offline. When both a dump and a cached copy have a season, the
+one with more completed weeks wins (ties go to the dump). NFL_DATA_OFFLINE=1
+turns any fetch into an error.
+
+Usage:
+  import nfl_data
+  weekly = nfl_data.weekly([2025], through_week=6)
+  python3 scripts/nfl_data.py                 # freshness of every dataset / season
+  python3 scripts/nfl_data.py --fetch weekly --seasons 2025 --through_week 6
+"""
+
+import argparse, os, pathlib, time
+from typing import Dict, List, Optional
+import pandas as pd
+import pyarrow.parquet as pq
+import parquet_table
+
+DATA_DIR = pathlib.Path(os.getenv("NFL_DATA_DIR", "data"))
+CACHE_DIR = "nflverse_cache"
+
+# name -> (dump table under DATA_DIR, nfl_data_py loader, per-season?, column that marks a completed row)
+SOURCES = {
+    "weekly":         ("weekly_player_stats",        "import_weekly_data",      True,  None),
+    "schedules":      ("nfl_supplemental/schedules", "import_schedules",        True,  "home_score"),
+    "rosters":        ("seasonal_rosters",           "import_seasonal_rosters", True,  None),
+    "weekly_rosters": ("weekly_rosters",             "import_weekly_rosters",   True,  None),
+    "ids":            ("player_ids_unified",         "import_ids",              False, None),
+    "pbp":            ("nfl_supplemental/play_by_play", "import_pbp_data",       True,  None),
+}
+
+
+def _offline() -> bool:
+    return os.getenv("NFL_DATA_OFFLINE", "").strip().lower() in ("1", "true", "yes")
+
+def ensure_team_col(df: pd.DataFrame) -> pd.DataFrame:
+    """Same normalization pull_nfl_player_data.py applies before saving: 'recent_team' -> 'team'."""
+    if "team" not in df.columns and "recent_team" in df.columns:
+        df = df.rename(columns={"recent_team": "team"})
+    return df
+
+def _paths(name: str):
+    """(dump, cache dir): the partitioned table if there is one, else the legacy <name>.parquet."""
+    rel, _, _, _ = SOURCES[name]
+    table = DATA_DIR / rel
+    dump = table if parquet_table.table_schema(table) is not None else parquet_table.legacy_file(table)
+    return dump, DATA_DIR / CACHE_DIR / name
+
+def _names(path: pathlib.Path) -> List[str]:
+    return (parquet_table.table_schema(path) if path.is_dir() else pq.read_schema(path)).names
+
+def _read(path: pathlib.Path, columns=None, seasons=None) -> pd.DataFrame:
+    if path.is_dir():
+        return parquet_table.read(path, columns=columns, seasons=seasons)
+    return pd.read_parquet(path, columns=columns, filters=[("season", "in", seasons)] if seasons else None)
+
+def _mtime(path: pathlib.Path) -> str:
+    f = path / parquet_table.SCHEMA_FILE if path.is_dir() else path
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(f.stat().st_mtime))
+
+
+# ---------- what is on disk ----------
+def _season_summary(path: pathlib.Path, done_col: Optional[str]) -> Dict[int, dict]:
+    """{season: {rows, max_week}} from the key columns only."""
+    if not path.exists():
+        return {}
+    names = _names(path)
+    if "season" not in names:
+        return {}
+    cols = ["season"] + [c for c in ("week", done_col) if c and c in names]
+    df = _read(path, columns=cols)
+    if done_col in df.columns:
+        df["week"] = df["week"].where(df[done_col].notna())
+    out = {}
+    for s, g in df.groupby("season"):
+        wk = g["week"].max() if "week" in g.columns else None
+        out[int(s)] = {"rows": len(g), "max_week": None if wk is None or pd.isna(wk) else int(wk)}
+    return out
+
+def _sources(name: str) -> Dict[int, dict]:
+    """Chosen source per season: {season: {path, where, rows, max_week, mtime}}."""
+    dump, cache = _paths(name)
+    done_col = SOURCES[name][3]
+    found = {}
+    for s, info in _season_summary(dump, done_col).items():
+        found[s] = dict(info, path=dump, where="dump")
+    for f in sorted(cache.glob("season=*.parquet")):
+        s = int(f.stem.split("=")[1])
+        info = _season_summary(f, done_col).get(s, {"rows": 0, "max_week": None})
+        if s not in found or (info["max_week"] or 0) > (found[s]["max_week"] or 0):
+            found[s] = dict(info, path=f, where="cache")
+    for s, info in found.items():
+        info["mtime"] = _mtime(info["path"])
+    return found
+
+def freshness(names: Optional[List[str]] = None) -> pd.DataFrame:
+    """One row per dataset x season: where it would be read from, rows, latest completed week, file time."""
+    rows = []
+    for name in names or SOURCES:
+        dump, cache = _paths(name)
+        if not SOURCES[name][2]:
+            f = dump if dump.exists() else cache / "all.parquet"
+            if f.exists():
+                n = (int(parquet_table.partitions(f)["rows"].sum()) if f.is_dir()
+                     else pq.ParquetFile(f).metadata.num_rows)
+                rows.append({"dataset": name, "season": None, "source": "dump" if f == dump else "cache",
+                             "rows": n, "max_week": None, "path": str(f), "modified": _mtime(f)})
+            continue
+        for s, info in sorted(_sources(name).items()):
+            rows.append({"dataset": name, "season": s, "source": info["where"], "rows": info["rows"],
+                         "max_week": info["max_week"], "path": str(info["path"]), "modified": info["mtime"]})
+    return pd.DataFrame(rows, columns=["dataset", "season", "source", "rows", "max_week", "path", "modified"])
+
+
+# ---------- nflverse fallback ----------
+def _write(df: pd.DataFrame, path: pathlib.Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+
+def fetch(name: str, seasons: Optional[List[int]] = None) -> pd.DataFrame:
+    """Download from nflverse and keep a local copy (per season where the dataset has seasons)."""
+    if _offline():
+        raise RuntimeError(f"[nfl_data] {name} {seasons or ''} not available locally and NFL_DATA_OFFLINE is set")
+    import nfl_data_py as nfl
+    _, loader, per_season, _ = SOURCES[name]
+    _, cache = _paths(name)
+    t0 = time.perf_counter()
+    df = ensure_team_col(getattr(nfl, loader)(list(seasons)) if per_season else getattr(nfl, loader)())
+    if per_season:
+        for s in seasons:
+            _write(df[df["season"] == s], cache / f"season={s}.parquet")
+    else:
+        _write(df, cache / "all.parquet")
+    print(f"[nfl_data] fetched {name} {list(seasons) if per_season else ''} "
+          f"({len(df):,} rows) in {time.perf_counter() - t0:.1f}s")
+    return df
+
+
+# ---------- readers ----------
+def load(name: str, seasons: Optional[List[int]] = None, columns: Optional[List[str]] = None,
+         through_week: Optional[int] = None) -> pd.DataFrame:
+    """
+    Rows of `name` for `seasons` (None = every local season), local files first.
+    through_week: treat a season as missing unless its latest completed week is >= this.
+    """
+    dump, cache = _paths(name)
+    if not SOURCES[name][2]:
+        f = dump if dump.exists() else cache / "all.parquet"
+        df = _read(f, columns=columns) if f.exists() else fetch(name)
+        return ensure_team_col(df[columns] if columns else df)
+
+    found = _sources(name)
+    want = sorted(set(int(s) for s in seasons)) if seasons is not None else sorted(found)
+    missing = [s for s in want if s not in found
+               or (through_week is not None and (found[s]["max_week"] or 0) < through_week)]
+    if missing:
+        fetch(name, missing)
+        found = _sources(name)
+
+    frames = []
+    by_file = {}
+    for s in want:
+        if s in found:
+            by_file.setdefault(found[s]["path"], []).append(s)
+    for path, ss in by_file.items():
+        names = _names(path)
+        cols = [c for c in columns if c in names] if columns else None
+        frames.append(ensure_team_col(_read(path, columns=cols, seasons=ss)))
+    if not frames:
+        return pd.DataFrame(columns=columns or [])
+    return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+def weekly(seasons, columns=None, through_week=None) -> pd.DataFrame:
+    return load("weekly", seasons, columns, through_week)
+
+def schedules(seasons, columns=None, through_week=None) -> pd.DataFrame:
+    return load("schedules", seasons, columns, through_week)
+
+def rosters(seasons, columns=None) -> pd.DataFrame:
+    return load("rosters", seasons, columns)
+
+def weekly_rosters(seasons, columns=None, through_week=None) -> pd.DataFrame:
+    return load("weekly_rosters", seasons, columns, through_week)
+
+def ids(columns=None) -> pd.DataFrame:
+    return load("ids", columns=columns)
+
+def pbp(seasons, columns=None, through_week=None) -> pd.DataFrame:
+    return load("pbp", seasons, columns, through_week)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Local nflverse data: freshness report / explicit fetch.")
+    ap.add_argument("--datasets", nargs="*", default=None, choices=list(SOURCES))
+    ap.add_argument("--fetch", default=None, choices=list(SOURCES), help="Load this dataset (fetching what is missing)")
+    ap.add_argument("--seasons", nargs="*", type=int, default=None)
+    ap.add_argument("--through_week", type=int, default=None)
+    args = ap.parse_args()
+    if args.fetch:
+        df = load(args.fetch, args.seasons, through_week=args.through_week)
+        print(f"[nfl_data] {args.fetch}: {len(df):,} rows")
+    rep = freshness(args.datasets)
+    print(rep.drop(columns=["path"]).to_string(index=False) if not rep.empty
+          else f"[nfl_data] nothing under {DATA_DIR} yet (run pull_nfl_player_data.py / pull_nfl_supplemental_data.py)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# scripts/odds_archive.py
+"""
+Append-only archive of every props / game-odds fetch (line-movement history).
+
+Layout (Hive-partitioned Parquet, one file per fetch):
+  data/archive/<kind>/season=2025/week=1/fetch_date=2025-09-07/snap-<ts>-0.parquet
+
+Each row carries a `fetch_ts` (UTC). Team/book/market/player/side columns are
+stored dictionary-encoded (pandas categoricals). Readers prune on the
+season/week/fetch_date partitions and project only the columns they need,
+so "latest line" and "closing line" lookups never scan the whole history.
+
+Usage:
+  from odds_archive import append_snapshot, latest_snapshot, closing_lines
+  append_snapshot(df, "props", season=2025, week=1)
+  cur = latest_snapshot("props", 2025, 1)
+
+  python3 scripts/odds_archive.py latest  --kind props --season 2025 --week 1 --out latest.csv
+  python3 scripts/odds_archive.py closing --kind game_odds --season 2025 --week 1 --out closing.csv
+"""
+import argparse, os, sys, pathlib
+from datetime import date, datetime, timedelta, timezone
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+ARCHIVE_DIR = pathlib.Path(os.getenv("ODDS_ARCHIVE_DIR", "data/archive"))
+KINDS = ("props", "game_odds")
+
+# one snapshot row = one outcome quoted by one book at fetch time
+SNAPSHOT_KEYS = ["game_id", "bookmaker", "market", "player", "name", "point"]
+CATEGORICAL_COLS = ["home_team", "away_team", "bookmaker", "market", "player", "name"]
+
+_dict = pa.dictionary(pa.int32(), pa.string())
+SNAPSHOT_SCHEMA = pa.schema([
+    ("game_id", pa.string()),
+    ("commence_time", pa.string()),
+    ("home_team", _dict),
+    ("away_team", _dict),
+    ("bookmaker", _dict),
+    ("market", _dict),
+    ("player", _dict),
+    ("name", _dict),
+    ("price", pa.float64()),
+    ("point", pa.float64()),
+    ("fetch_ts", pa.timestamp("us", tz="UTC")),
+])
+PARTITIONING = ds.partitioning(
+    pa.schema([("season", pa.int16()), ("week", pa.int16()), ("fetch_date", pa.string())]),
+    flavor="hive",
+)
+
+
+# ---------- season / week ----------
+def _season_opener(season: int) -> date:
+    """Thursday after Labor Day (first Monday of September)."""
+    d = date(season, 9, 1)
+    labor_day = d + timedelta(days=(0 - d.weekday()) % 7)
+    return labor_day + timedelta(days=3)
+
+def infer_season_week(commence_times) -> tuple:
+    """Best-effort (season, week) from kickoff times when the caller doesn't pass them."""
+    ts = pd.to_datetime(pd.Series(commence_times), utc=True, errors="coerce").dropna()
+    t = (ts.min() if not ts.empty else pd.Timestamp.now(tz="UTC")).date()
+    season = t.year if t.month >= 3 else t.year - 1
+    week = (t - _season_opener(season)).days // 7 + 1
+    return season, max(1, int(week))
+
+
+# ---------- write ----------
+def _utc(x) -> pd.Timestamp:
+    t = pd.Timestamp(x)
+    return t.tz_localize("UTC") if t.tzinfo is None else t.tz_convert("UTC")
+
+def _root(kind: str) -> pathlib.Path:
+    if kind not in KINDS:
+        raise ValueError(f"Unknown archive kind '{kind}' (expected one of {KINDS})")
+    return ARCHIVE_DIR / kind
+
+def append_snapshot(df: pd.DataFrame, kind: str, season: int = None, week: int = None,
+                    fetched_at: datetime = None) -> pathlib.Path:
+    """Append one fetch to the archive as a new file; existing files are never rewritten."""
+    if df.empty:
+        return None
+    fetched_at = _utc(fetched_at or datetime.now(timezone.utc)).to_pydatetime()
+    if season is None or week is None:
+        s, w = infer_season_week(df.get("commence_time", pd.Series(dtype=object)))
+        season = s if season is None else season
+        week = w if week is None else week
+
+    snap = pd.DataFrame(index=df.index)
+    for field in SNAPSHOT_SCHEMA:
+        col = df[field.name] if field.name in df.columns else pd.Series(np.nan, index=df.index)
+        if field.name in ("price", "point"):
+            snap[field.name] = pd.to_numeric(col, errors="coerce").astype("float64")
+        elif field.name in CATEGORICAL_COLS:
+            snap[field.name] = col.astype("string").fillna("").astype("category")
+        elif field.name != "fetch_ts":
+            snap[field.name] = col.astype("string")
+    snap["fetch_ts"] = pd.Timestamp(fetched_at)
+
+    table = pa.Table.from_pandas(snap, schema=SNAPSHOT_SCHEMA, preserve_index=False)
+    part = _root(kind) / f"season={int(season)}" / f"week={int(week)}" / f"fetch_date={fetched_at:%Y-%m-%d}"
+    part.mkdir(parents=True, exist_ok=True)
+    path = part / f"snap-{fetched_at:%Y%m%dT%H%M%S%f}Z-0.parquet"
+    pq.write_table(table, path)
+    # stderr: fetch_odds.py streams its CSV on stdout
+    print(f"[odds_archive] appended {len(snap):,} {kind} rows -> {path}", file=sys.stderr)
+    return path
+
+
+# ---------- read ----------
+def _dataset(kind: str):
+    root = _root(kind)
+    if not root.exists():
+        raise SystemExit(f"No {kind} archive at {root}. Run a fetch first.")
+    return ds.dataset(str(root), format="parquet", partitioning=PARTITIONING)
+
+def _filter(season=None, week=None, since=None, until=None):
+    f = None
+    def _and(a, b): return b if a is None else (a & b)
+    if season is not None: f = _and(f, ds.field("season") == int(season))
+    if week is not None:   f = _and(f, ds.field("week") == int(week))
+    # fetch_date partitions first (prunes files), then the exact timestamp
+    if since is not None:
+        since = _utc(since)
+        f = _and(f, ds.field("fetch_date") >= since.strftime("%Y-%m-%d"))
+        f = _and(f, ds.field("fetch_ts") >= pa.scalar(since.to_pydatetime(), pa.timestamp("us", tz="UTC")))
+    if until is not None:
+        until = _utc(until)
+        f = _and(f, ds.field("fetch_date") <= until.strftime("%Y-%m-%d"))
+        f = _and(f, ds.field("fetch_ts") <= pa.scalar(until.to_pydatetime(), pa.timestamp("us", tz="UTC")))
+    return f
+
+def read_history(kind: str, season: int = None, week: int = None, columns=None,
+                 since=None, until=None) -> pd.DataFrame:
+    """Column-pruned read of the archive restricted to the given partitions/time range."""
+    cols = None if columns is None else list(dict.fromkeys(list(columns) + ["fetch_ts"]))
+    table = _dataset(kind).to_table(columns=cols, filter=_filter(season, week, since, until))
+    return table.to_pandas()
+
+def latest_snapshot(kind: str, season: int, week: int, columns=None, as_of=None) -> pd.DataFrame:
+    """Most recent row per (game_id, bookmaker, market, player, name, point), optionally as of a time."""
+    extra = ["commence_time", "home_team", "away_team", "price"] if columns is None else list(columns)
+    df = read_history(kind, season, week, columns=SNAPSHOT_KEYS + extra, until=as_of)
+    if df.empty:
+        return df
+    return (df.sort_values("fetch_ts", kind="stable")
+              .drop_duplicates(SNAPSHOT_KEYS, keep="last")
+              .reset_index(drop=True))
+
+def closing_lines(kind: str, season: int, week: int) -> pd.DataFrame:
+    """Last pre-kickoff row per key (fetch_ts <= commence_time)."""
+    df = read_history(kind, season, week,
+                      columns=SNAPSHOT_KEYS + ["commence_time", "home_team", "away_team", "price"])
+    if df.empty:
+        return df
+    kick = pd.to_datetime(df["commence_time"], utc=True, errors="coerce")
+    df = df[kick.isna() | (df["fetch_ts"] <= kick)]
+    return (df.sort_values("fetch_ts", kind="stable")
+              .drop_duplicates(SNAPSHOT_KEYS, keep="last")
+              .reset_index(drop=True))
+
+def line_history(kind: str, season: int, week: int, game_id=None, player=None, market=None) -> pd.DataFrame:
+    """Price/point movement over time for one leg (or any subset of keys)."""
+    df = read_history(kind, season, week, columns=SNAPSHOT_KEYS + ["price"])
+    for col, val in (("game_id", game_id), ("player", player), ("market", market)):
+        if val is not None:
+            df = df[df[col] == val]
+    return df.sort_values(SNAPSHOT_KEYS[:-1] + ["fetch_ts"], kind="stable").reset_index(drop=True)
+
+
+# ---------- CLI ----------
+def main():
+    ap = argparse.ArgumentParser(description="Query the odds snapshot archive.")
+    ap.add_argument("cmd", choices=["latest", "closing", "history"])
+    ap.add_argument("--kind", choices=KINDS, default="props")
+    ap.add_argument("--season", type=int, required=True)
+    ap.add_argument("--week", type=int, required=True)
+    ap.add_argument("--as_of", default=None, help="latest: ignore fetches after this UTC time")
+    ap.add_argument("--out", default=None, help="CSV path (default: print head)")
+    args = ap.parse_args()
+
+    if args.cmd == "latest":
+        df = latest_snapshot(args.kind, args.season, args.week, as_of=args.as_of)
+    elif args.cmd == "closing":
+        df = closing_lines(args.kind, args.season, args.week)
+    else:
+        df = read_history(args.kind, args.season, args.week)
+
+    if args.out:
+        pathlib.Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        df.to_csv(args.out, index=False)
+        print(f"[odds_archive] wrote {args.out} with {len(df):,} rows")
+    else:
+        print(df.head(20).to_string())
+        print(f"[odds_archive] {len(df):,} rows")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# scripts/odds_cache.py
+"""
+Shared on-disk HTTP cache for The Odds API.
+
+- Keyed by URL + query params (the API key is never part of the key or stored)
+- Per-endpoint TTL (event list vs. game odds vs. per-event props)
+- ETag / Last-Modified revalidation once an entry is stale
+- Force refresh via `refresh=True` or ODDS_CACHE_REFRESH=1
+- Every call is logged to stderr (and data/cache/odds_api/calls.jsonl) as
+  HIT / MISS / REVALIDATED with the bytes it saved
+
+Usage:
+  from odds_cache import cached_get
+  r = cached_get(url, {"regions": "us", "apiKey": key})
+  r.raise_for_status(); data = r.json()
+
+Each response records where it came from (r.source / r.from_network) and when
+its body was fetched (r.fetched_at), so callers can skip re-archiving data
+that was served entirely from disk (see snapshot_time).
+"""
+import hashlib, json, os, re, sys, threading, time, pathlib
+from urllib.parse import urlparse
+from datetime import datetime, timezone
+import requests as rq
+
+CACHE_DIR = pathlib.Path(os.getenv("ODDS_CACHE_DIR", "data/cache/odds_api"))
+LOG_PATH  = CACHE_DIR / "calls.jsonl"
+
+# query params that must never reach the cache key or disk
+SECRET_PARAMS = {"apikey", "api_key"}
+
+# (path regex, ttl seconds); first match wins
+ENDPOINT_TTLS = [
+    (r"/events/[^/]+/odds/?$", 300),   # per-event player props
+    (r"/sports/[^/]+/odds/?$", 300),   # game odds (h2h/spreads/totals)
+    (r"/sports/[^/]+/events/?$", 3600),  # upcoming event list
+]
+DEFAULT_TTL = 300
+
+# 404 = "no props posted for this event yet"; caching it keeps repeat runs offline
+CACHEABLE_STATUS = (200, 404)
+
+_lock = threading.Lock()
+_stats = {"HIT": 0, "MISS": 0, "REVALIDATED": 0, "bytes_saved": 0, "bytes_fetched": 0}
+
+
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, "").strip().lower() in ("1", "true", "yes", "on")
+
+def ttl_for(url: str) -> int:
+    """TTL (seconds) for an endpoint; ODDS_CACHE_TTL overrides every endpoint."""
+    if os.getenv("ODDS_CACHE_TTL"):
+        return int(os.getenv("ODDS_CACHE_TTL"))
+    path = urlparse(url).path
+    for pattern, ttl in ENDPOINT_TTLS:
+        if re.search(pattern, path):
+            return ttl
+    return DEFAULT_TTL
+
+def public_params(params) -> dict:
+    return {k: v for k, v in (params or {}).items() if str(k).lower() not in SECRET_PARAMS}
+
+def cache_key(url: str, params=None) -> str:
+    pub = sorted((str(k), str(v)) for k, v in public_params(params).items())
+    return hashlib.sha256(json.dumps([url, pub]).encode("utf-8")).hexdigest()
+
+
+class CachedResponse:
+    """Minimal requests.Response stand-in (status_code, text, json, raise_for_status)."""
+    def __init__(self, status_code: int, content: bytes, headers: dict, url: str, source: str,
+                 fetched_at: float = None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+        self.url = url
+        self.source = source  # HIT / MISS / REVALIDATED
+        self.fetched_at = time.time() if fetched_at is None else fetched_at  # when the server last sent/confirmed it
+
+    @property
+    def from_network(self) -> bool:
+        """False for a fresh cache HIT (no request was made)."""
+        return self.source != "HIT"
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="ignore")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise rq.HTTPError(f"{self.status_code} for url: {self.url}", response=self)
+
+
+# ---------- disk entries ----------
+def _paths(key: str):
+    return CACHE_DIR / f"{key}.body", CACHE_DIR / f"{key}.meta.json"
+
+def _read_entry(key: str):
+    body_p, meta_p = _paths(key)
+    if not (body_p.exists() and meta_p.exists()):
+        return None, None
+    try:
+        return json.loads(meta_p.read_text(encoding="utf-8")), body_p.read_bytes()
+    except Exception:
+        return None, None
+
+def _atomic_write(path: pathlib.Path, data: bytes):
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+def _write_entry(key: str, meta: dict, body: bytes = None):
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    body_p, meta_p = _paths(key)
+    if body is not None:
+        _atomic_write(body_p, body)
+    _atomic_write(meta_p, json.dumps(meta, indent=1).encode("utf-8"))
+
+
+# ---------- logging ----------
+def _log(source: str, url: str, params: dict, nbytes: int, saved: int, remaining=None):
+    with _lock:
+        _stats[source] += 1
+        _stats["bytes_saved"] += saved
+        if source == "MISS":
+            _stats["bytes_fetched"] += nbytes
+    q = "&".join(f"{k}={v}" for k, v in sorted(public_params(params).items()))
+    extra = f" | credits remaining {remaining}" if remaining is not None else ""
+    print(f"[odds_cache] {source:<11} {url}{'?' + q if q else ''} | {nbytes:,} B | saved {saved:,} B{extra}",
+          file=sys.stderr)
+    rec = {"ts": datetime.now(timezone.utc).isoformat(), "result": source, "url": url,
+           "params": public_params(params), "bytes": nbytes, "bytes_saved": saved}
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with _lock, open(LOG_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps(rec) + "\n")
+    except OSError:
+        pass
+
+def stats() -> dict:
+    with _lock:
+        return dict(_stats)
+
+def print_summary():
+    s = stats()
+    print(f"[odds_cache] hits={s['HIT']} revalidated={s['REVALIDATED']} misses={s['MISS']} "
+          f"| fetched {s['bytes_fetched']:,} B | saved {s['bytes_saved']:,} B", file=sys.stderr)
+
+
+def is_fresh(url: str, params=None, refresh: bool = None, ttl: int = None) -> bool:
+    """True when cached_get() would answer from disk without touching the network."""
+    refresh = _env_flag("ODDS_CACHE_REFRESH") if refresh is None else refresh
+    if refresh:
+        return False
+    _, meta_p = _paths(cache_key(url, params))
+    try:
+        meta = json.loads(meta_p.read_text(encoding="utf-8"))
+    except Exception:
+        return False
+    ttl = ttl_for(url) if ttl is None else ttl
+    return time.time() - meta.get("fetched_at", 0) < ttl
+
+
+def snapshot_time(responses):
+    """
+    UTC time to stamp an archive snapshot built from `responses`: the latest
+    network fetch among them, or None when every one was a cache HIT (that
+    data was archived by the run that fetched it).
+    """
+    times = [r.fetched_at for r in responses if r is not None and r.from_network]
+    return datetime.fromtimestamp(max(times), timezone.utc) if times else None
+
+
+# ---------- main entry point ----------
+def cached_get(url: str, params=None, *, ttl: int = None, refresh: bool = None,
+               session=None, headers=None, timeout: int = 30) -> CachedResponse:
+    """
+    GET through the cache. Fresh entries (age < ttl) are served without any
+    network call; stale ones are revalidated with If-None-Match /
+    If-Modified-Since when the server sent validators. Only 200/404 are stored.
+    """
+    params = dict(params or {})
+    ttl = ttl_for(url) if ttl is None else ttl
+    refresh = _env_flag("ODDS_CACHE_REFRESH") if refresh is None else refresh
+    session = session or rq
+    key = cache_key(url, params)
+    meta, body = (None, None) if refresh else _read_entry(key)
+
+    if meta is not None and time.time() - meta.get("fetched_at", 0) < ttl:
+        _log("HIT", url, params, len(body), len(body))
+        return CachedResponse(meta["status"], body, meta.get("headers", {}), url, "HIT", meta.get("fetched_at", 0))
+
+    req_headers = dict(headers or {})
+    if meta is not None:
+        if meta.get("etag"):
+            req_headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            req_headers["If-Modified-Since"] = meta["last_modified"]
+
+    r = session.get(url, params=params, headers=req_headers, timeout=timeout)
+    remaining = r.headers.get("x-requests-remaining")
+
+    if r.status_code == 304 and meta is not None:
+        meta["fetched_at"] = time.time()
+        _write_entry(key, meta)
+        _log("REVALIDATED", url, params, len(r.content), len(body), remaining)
+        return CachedResponse(meta["status"], body, meta.get("headers", {}), url, "REVALIDATED", meta["fetched_at"])
+
+    content = r.content
+    fetched_at = time.time()
+    if r.status_code in CACHEABLE_STATUS:
+        keep_headers = {k: v for k, v in r.headers.items()
+                        if k.lower() in ("content-type", "etag", "last-modified")}
+        _write_entry(key, {
+            "url": url,
+            "params": public_params(params),
+            "status": r.status_code,
+            "headers": keep_headers,
+            "etag": r.headers.get("ETag"),
+            "last_modified": r.headers.get("Last-Modified"),
+            "fetched_at": fetched_at,
+            "bytes": len(content),
+        }, content)
+    _log("MISS", url, params, len(content), 0, remaining)
+    return CachedResponse(r.status_code, content, dict(r.headers), url, "MISS", fetched_at)
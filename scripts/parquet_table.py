@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# scripts/parquet_table.py
+"""
+Hive-partitioned Parquet tables for the nflverse pulls.
+
+Layout (one file per partition; partition columns live in the path):
+  data/weekly_player_stats/season=2025/week=6/part-0.parquet
+  data/seasonal_rosters/season=2025/part-0.parquet
+  data/player_ids_unified/part-0.parquet
+  data/<name>/_common_metadata        table schema, column order, dedup keys
+
+A table is partitioned by whichever of season / week its frame has. Rows with
+a missing week go to week=__HIVE_DEFAULT_PARTITION__ and read back as null.
+
+  write(df, root)          replace the seasons present in df (full pulls; other seasons untouched)
+  upsert(df, root, keys)   merge new rows into only the partitions they touch (dedup on keys, keep last)
+  read(root, ...)          the logical table, with partition pruning + column projection
+  compact(root, csv)       one file per partition, one schema, CSV export rebuilt
+  append_csv(...)          keep a CSV export in step with an upsert by appending only the new rows
+
+So a latest-week update costs one week of I/O instead of rewriting the history.
+
+Usage:
+  python3 scripts/parquet_table.py info    data/weekly_player_stats
+  python3 scripts/parquet_table.py compact data/weekly_player_stats --csv data/weekly_player_stats.csv
+  python3 scripts/parquet_table.py migrate data/weekly_player_stats      # <name>.parquet -> <name>/
+"""
+import argparse, json, os, pathlib, shutil
+from typing import List, Optional
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+PARTITION_COLS = ("season", "week")
+NULL_PART = "__HIVE_DEFAULT_PARTITION__"
+SCHEMA_FILE = "_common_metadata"
+PART_FILE = "part-0.parquet"
+META_KEY = b"parquet_table"
+
+
+# ---------- schema ----------
+def _meta(schema: pa.Schema) -> dict:
+    raw = (schema.metadata or {}).get(META_KEY)
+    return json.loads(raw) if raw else {}
+
+def table_schema(root) -> Optional[pa.Schema]:
+    f = pathlib.Path(root) / SCHEMA_FILE
+    return pq.read_schema(f) if f.exists() else None
+
+def _part_type(s: pd.Series) -> pa.DataType:
+    return pa.from_numpy_dtype(s.dtype) if pd.api.types.is_integer_dtype(s.dtype) else pa.int64()
+
+def _build_schema(df: pd.DataFrame, old: Optional[pa.Schema], keys) -> pa.Schema:
+    """File columns (+ partition fields at the end), unified with the stored schema; metadata keeps order/keys."""
+    pcols = [c for c in PARTITION_COLS if c in df.columns]
+    new = pa.Schema.from_pandas(df.drop(columns=pcols), preserve_index=False)
+    meta = _meta(old) if old is not None else {}
+    if old is not None:
+        pcols = meta["partition_cols"]
+        new = _unify([_file_schema(old), new])
+        parts = [old.field(c) for c in pcols]
+    else:
+        parts = [pa.field(c, _part_type(df[c])) for c in pcols]
+    columns = list(meta.get("columns", [])) + [c for c in df.columns if c not in meta.get("columns", [])]
+    keys = list(keys) if keys else meta.get("keys", [])
+    md = {META_KEY: json.dumps({"partition_cols": pcols, "columns": columns, "keys": keys}).encode()}
+    return pa.schema(list(new.remove_metadata()) + parts, metadata=md)
+
+def _unify(schemas) -> pa.Schema:
+    # permissive: an all-null column takes the first real type it sees, int widens to float
+    # (promote_options needs pyarrow >= 14, the floor in requirements.txt)
+    return pa.unify_schemas([s.remove_metadata() for s in schemas], promote_options="permissive")
+
+def _file_schema(schema: pa.Schema) -> pa.Schema:
+    pcols = _meta(schema)["partition_cols"]
+    return pa.schema([f for f in schema if f.name not in pcols], metadata=schema.metadata)
+
+def _save_schema(root: pathlib.Path, schema: pa.Schema):
+    tmp = root / f".{SCHEMA_FILE}.{os.getpid()}.tmp"
+    pq.write_metadata(schema, tmp)
+    os.replace(tmp, root / SCHEMA_FILE)
+
+
+# ---------- files ----------
+def _part_dir(root: pathlib.Path, pcols: List[str], key) -> pathlib.Path:
+    key = key if isinstance(key, tuple) else (key,)
+    d = root
+    for c, v in zip(pcols, key):
+        d = d / f"{c}={NULL_PART if pd.isna(v) else int(v)}"
+    return d
+
+def _write_part(path: pathlib.Path, df: pd.DataFrame, schema: pa.Schema):
+    """Atomically (re)write one partition file, cast to the table's file schema."""
+    fs = _file_schema(schema)
+    df = df.reindex(columns=fs.names)
+    table = pa.Table.from_pandas(df, schema=fs, preserve_index=False)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    pq.write_table(table, tmp)
+    os.replace(tmp, path)
+
+def _groups(df: pd.DataFrame, pcols: List[str]):
+    if not pcols:
+        yield (), df
+        return
+    yield from df.groupby(pcols if len(pcols) > 1 else pcols[0], dropna=False, sort=True)
+
+def legacy_file(root) -> pathlib.Path:
+    root = pathlib.Path(root)
+    return root.with_name(f"{root.name}.parquet")
+
+def migrate(root) -> bool:
+    """One-time conversion of a single-file <name>.parquet dump into the partitioned table."""
+    root, old = pathlib.Path(root), legacy_file(root)
+    if (root / SCHEMA_FILE).exists() or not old.exists():
+        return False
+    write(pd.read_parquet(old), root)
+    old.unlink()
+    print(f"[parquet_table] migrated {old} -> {root}/")
+    return True
+
+
+# ---------- write ----------
+def write(df: pd.DataFrame, root, keys=None) -> int:
+    """Replace every season present in df (or the whole table if it has no season column)."""
+    root = pathlib.Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    schema = _build_schema(df, table_schema(root), keys)
+    pcols = _meta(schema)["partition_cols"]
+    if "season" in pcols:
+        for s in pd.unique(df["season"]):
+            shutil.rmtree(_part_dir(root, ["season"], s), ignore_errors=True)
+    else:
+        for f in root.glob("**/part-*.parquet"):
+            f.unlink()
+    n = 0
+    for key, g in _groups(df, pcols):
+        _write_part(_part_dir(root, pcols, key) / PART_FILE, g.drop(columns=pcols), schema)
+        n += 1
+    _save_schema(root, schema)
+    return n
+
+def upsert(df_new: pd.DataFrame, root, keys=None) -> dict:
+    """
+    Merge df_new into the partitions it touches: each is read, concatenated with
+    its new rows, de-duplicated on `keys` (last wins) and rewritten. Nothing else is read.
+    """
+    root = pathlib.Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    schema = _build_schema(df_new, table_schema(root), keys)
+    meta = _meta(schema)
+    pcols, keys = meta["partition_cols"], [k for k in meta["keys"] if k not in meta["partition_cols"]]
+    added = replaced = parts = 0
+    for key, g in _groups(df_new, pcols):
+        path = _part_dir(root, pcols, key) / PART_FILE
+        new = g.drop(columns=pcols)
+        if path.exists():
+            old = pq.read_table(path).to_pandas()
+            both = pd.concat([old, new], ignore_index=True)
+            merged = both.drop_duplicates(subset=[k for k in keys if k in both.columns] or None, keep="last")
+            replaced += len(both) - len(merged)
+            added += len(merged) - len(old)
+        else:
+            merged = new
+            added += len(new)
+        _write_part(path, merged, schema)
+        parts += 1
+    _save_schema(root, schema)
+    return {"partitions": parts, "added": added, "replaced": replaced}
+
+
+# ---------- read ----------
+def dataset(root) -> ds.Dataset:
+    root = pathlib.Path(root)
+    schema = table_schema(root)
+    if schema is None:
+        raise FileNotFoundError(f"No partitioned table at {root} (missing {SCHEMA_FILE})")
+    pcols = _meta(schema)["partition_cols"]
+    part = ds.partitioning(pa.schema([schema.field(c) for c in pcols]), flavor="hive") if pcols else None
+    # "." / "_" prefixed files (temp files, _common_metadata) are skipped by default
+    return ds.dataset(str(root), schema=schema, format="parquet", partitioning=part)
+
+def read(root, columns=None, seasons=None, weeks=None, filter=None) -> pd.DataFrame:
+    """The logical table in its original column order; seasons / weeks prune partitions."""
+    d = dataset(root)
+    names = d.schema.names
+    f = filter
+    def _and(a, b): return b if a is None else (a & b)
+    if seasons is not None and "season" in names: f = _and(f, ds.field("season").isin([int(s) for s in seasons]))
+    if weeks is not None and "week" in names:     f = _and(f, ds.field("week").isin([int(w) for w in weeks]))
+    order = [c for c in _meta(d.schema)["columns"] if c in names]
+    cols = order if columns is None else [c for c in columns if c in names]
+    return d.to_table(columns=cols, filter=f).to_pandas()
+
+def partitions(root) -> pd.DataFrame:
+    """One row per partition file: partition values, rows, bytes."""
+    root = pathlib.Path(root)
+    rows = []
+    for f in sorted(root.glob("**/part-*.parquet")):
+        vals = dict(p.split("=", 1) for p in f.relative_to(root).parent.parts)
+        rows.append(dict(vals, file=str(f.relative_to(root)), rows=pq.ParquetFile(f).metadata.num_rows,
+                         bytes=f.stat().st_size))
+    return pd.DataFrame(rows)
+
+
+# ---------- maintenance ----------
+def compact(root, csv_path=None) -> dict:
+    """
+    Fold every partition to a single deduplicated file under one unified schema,
+    drop leftover temp files, and (optionally) rebuild the CSV export from the table.
+    """
+    root = pathlib.Path(root)
+    migrate(root)
+    for f in root.glob("**/.*.tmp"):
+        f.unlink()
+    schema = table_schema(root)
+    meta = _meta(schema)
+    pcols, keys = meta["partition_cols"], [k for k in meta["keys"] if k not in meta["partition_cols"]]
+    files = sorted(root.glob("**/part-*.parquet"))
+    # unify first (footers only) so every file is recast to the same types
+    fs = _unify([_file_schema(schema)] + [pq.read_schema(f) for f in files])
+    schema = pa.schema(list(fs) + [schema.field(c) for c in pcols], metadata=schema.metadata)
+    by_dir = {}
+    for f in files:
+        by_dir.setdefault(f.parent, []).append(f)
+    rows = merged_dirs = 0
+    for d, fs in by_dir.items():
+        df = pd.concat([pq.read_table(f).to_pandas() for f in fs], ignore_index=True)
+        if len(fs) > 1 and keys:
+            df = df.drop_duplicates(subset=[k for k in keys if k in df.columns], keep="last")
+        _write_part(d / PART_FILE, df, schema)
+        for f in fs:
+            if f.name != PART_FILE:
+                f.unlink()
+        merged_dirs += len(fs) > 1
+        rows += len(df)
+    _save_schema(root, schema)
+    if csv_path:
+        read(root).to_csv(csv_path, index=False)
+    return {"partitions": len(by_dir), "merged": merged_dirs, "rows": rows}
+
+def append_csv(df_new: pd.DataFrame, csv_path, root, rewrite: bool = False) -> str:
+    """
+    Keep a CSV export in step with an upsert: append just the new rows when that
+    is exact (no rows were replaced, columns fit the header), else rebuild from the table.
+    """
+    csv_path = pathlib.Path(csv_path)
+    if not rewrite and csv_path.exists():
+        header = list(pd.read_csv(csv_path, nrows=0).columns)
+        if set(df_new.columns) <= set(header):
+            df_new.reindex(columns=header).to_csv(csv_path, mode="a", header=False, index=False)
+            return "appended"
+    tmp = csv_path.with_name(f".{csv_path.name}.{os.getpid()}.tmp")
+    read(root).to_csv(tmp, index=False)
+    os.replace(tmp, csv_path)
+    return "rewritten"
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Inspect / compact / migrate partitioned Parquet tables.")
+    ap.add_argument("cmd", choices=["info", "compact", "migrate"])
+    ap.add_argument("roots", nargs="+", help="Table directories, e.g. data/weekly_player_stats")
+    ap.add_argument("--csv", default=None, help="compact: also rebuild this CSV export (single root)")
+    args = ap.parse_args()
+    for root in args.roots:
+        if args.cmd == "migrate":
+            print(f"[parquet_table] {root}: {'migrated' if migrate(root) else 'nothing to migrate'}")
+        elif args.cmd == "compact":
+            print(f"[parquet_table] {root}: {compact(root, args.csv)}")
+        else:
+            p = partitions(root)
+            print(f"[parquet_table] {root}: {len(p)} partitions | {p['rows'].sum() if len(p) else 0:,} rows | "
+                  f"{p['bytes'].sum() / 1e6 if len(p) else 0:.1f} MB | keys {_meta(table_schema(root)).get('keys')}")
+
+if __name__ == "__main__":
+    main()
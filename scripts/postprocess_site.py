@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# scripts/postprocess_site.py
+"""
+Post-process the built site under docs/ before publishing.
+
+1. Inline <style> / <script> blocks (>= --min_bytes) move to content-hashed files in
+   docs/assets/ (<sha256[:12]>.css / .js). Identical blocks on different pages share one
+   file, and a block that did not change keeps its name, so browsers/CDNs can cache it.
+   Scripts with src=, a non-JS type, or a `data-inline` attribute stay in the page.
+2. Every HTML, JSON and asset file gets .gz and .br siblings (gzip with mtime=0, so the
+   bytes only change when the source does).
+3. docs/site-manifest.json records the sha256 of every source file. Files whose hash
+   matches are neither recompressed nor rewritten, so `git add -A docs` only picks up
+   what really changed. Assets no longer referenced by any page are deleted.
+
+Safe to re-run: an already processed page has no inline blocks left to extract.
+
+Usage:
+  python3 scripts/postprocess_site.py --root docs
+"""
+import argparse, gzip, hashlib, json, os, re
+from pathlib import Path
+
+import brotli
+
+MANIFEST = "site-manifest.json"
+ASSET_DIR = "assets"
+COMPRESS_EXT = {".html", ".json", ".css", ".js"}
+SIBLINGS = (".gz", ".br")
+BROTLI_MAX_Q_BYTES = 256 * 1024
+
+STYLE_RE = re.compile(r"<style(\s[^>]*)?>(.*?)</style>", re.S | re.I)
+SCRIPT_RE = re.compile(r"<script(\s[^>]*)?>(.*?)</script>", re.S | re.I)
+JS_TYPES = {"", "text/javascript", "application/javascript", "module"}
+ASSET_REF_RE = re.compile(r"""(?:href|src)=["']([^"']*\b%s/[0-9a-f]{12}\.(?:css|js))["']""" % ASSET_DIR)
+
+
+def sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def write_if_changed(path: Path, data: bytes) -> bool:
+    """Atomically write data unless path already holds exactly these bytes."""
+    if path.exists() and path.stat().st_size == len(data) and path.read_bytes() == data:
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    return True
+
+
+# ---------- 1. extract inline CSS / JS ----------
+def _attr(attrs: str, name: str):
+    m = re.search(rf"\b{name}\s*=\s*([\"']?)([^\"'\s>]*)\1", attrs or "", re.I)
+    return m.group(2) if m else None
+
+def extract_assets(page: Path, root: Path, min_bytes: int, assets: dict) -> str:
+    """Page HTML with large inline blocks replaced by links; new assets go into `assets` (rel path -> bytes)."""
+    html = page.read_text(encoding="utf-8")
+    rel_dir = os.path.relpath(root / ASSET_DIR, page.parent).replace(os.sep, "/")
+
+    def asset(body: str, ext: str) -> str:
+        data = body.strip().encode("utf-8") + b"\n"
+        name = f"{sha256(data)[:12]}{ext}"
+        assets[f"{ASSET_DIR}/{name}"] = data
+        return f"{rel_dir}/{name}"
+
+    def style(m):
+        attrs, body = m.group(1) or "", m.group(2)
+        if len(body.encode("utf-8")) < min_bytes or _attr(attrs, "media"):
+            return m.group(0)
+        return f'<link rel="stylesheet" href="{asset(body, ".css")}">'
+
+    def script(m):
+        attrs, body = m.group(1) or "", m.group(2)
+        kind = (_attr(attrs, "type") or "").lower()
+        if (_attr(attrs, "src") is not None or re.search(r"\bdata-inline\b", attrs) or kind not in JS_TYPES
+                or len(body.encode("utf-8")) < min_bytes):
+            return m.group(0)
+        return f'<script{attrs} src="{asset(body, ".js")}"></script>'
+
+    return SCRIPT_RE.sub(script, STYLE_RE.sub(style, html))
+
+
+# ---------- 2. precompressed siblings ----------
+def compress(path: Path) -> int:
+    """Write path.gz / path.br; returns how many of the two actually changed on disk."""
+    data = path.read_bytes()
+    gz = gzip.compress(data, compresslevel=9, mtime=0)
+    # q11 is ~10x slower than q9 on the big data pages; keep it for the small, long-lived assets
+    br = brotli.compress(data, quality=11 if len(data) < BROTLI_MAX_Q_BYTES else 9)
+    return (write_if_changed(path.with_name(path.name + ".gz"), gz)
+            + write_if_changed(path.with_name(path.name + ".br"), br))
+
+
+# ---------- driver ----------
+def postprocess(root="docs", min_bytes: int = 256) -> dict:
+    root = Path(root)
+    man_path = root / MANIFEST
+    old = json.loads(man_path.read_text()).get("files", {}) if man_path.exists() else {}
+    stats = {"pages": 0, "assets": 0, "written": 0, "unchanged": 0, "pruned": 0}
+
+    # pages first: extraction decides which assets exist
+    assets, referenced = {}, set()
+    pages = sorted(p for p in root.rglob("*.html") if ASSET_DIR not in p.relative_to(root).parts)
+    for page in pages:
+        stats["pages"] += 1
+        html = extract_assets(page, root, min_bytes, assets)
+        stats["written" if write_if_changed(page, html.encode("utf-8")) else "unchanged"] += 1
+        referenced |= {Path(os.path.normpath(page.parent / ref)).relative_to(root).as_posix()
+                       for ref in ASSET_REF_RE.findall(html)}
+    for rel, data in sorted(assets.items()):
+        stats["written" if write_if_changed(root / rel, data) else "unchanged"] += 1
+    stats["assets"] = len(referenced)
+
+    # drop assets nothing references any more (and their siblings)
+    for f in sorted((root / ASSET_DIR).glob("*")) if (root / ASSET_DIR).is_dir() else []:
+        base = f.name[:-3] if f.suffix in SIBLINGS else f.name
+        if f"{ASSET_DIR}/{base}" not in referenced:
+            f.unlink(); stats["pruned"] += 1
+
+    # hash every source file; recompress only those whose hash moved (or lost a sibling)
+    files = {}
+    for f in sorted(root.rglob("*")):
+        if not f.is_file() or f.suffix not in COMPRESS_EXT or f.name == MANIFEST:
+            continue
+        rel = f.relative_to(root).as_posix()
+        files[rel] = sha256(f.read_bytes())
+        fresh = old.get(rel) == files[rel] and all(f.with_name(f.name + s).exists() for s in SIBLINGS)
+        if not fresh:
+            stats["written"] += compress(f)
+
+    # siblings whose source is gone
+    for s in SIBLINGS:
+        for f in root.rglob(f"*{s}"):
+            if f.with_suffix("").relative_to(root).as_posix() not in files and f.with_suffix("").suffix in COMPRESS_EXT:
+                f.unlink(); stats["pruned"] += 1
+
+    manifest = json.dumps({"files": files}, indent=1, sort_keys=True).encode("utf-8") + b"\n"
+    write_if_changed(man_path, manifest)
+    stats["raw_bytes"] = sum((root / r).stat().st_size for r in files)
+    stats["gz_bytes"] = sum((root / (r + ".gz")).stat().st_size for r in files)
+    stats["br_bytes"] = sum((root / (r + ".br")).stat().st_size for r in files)
+    return stats
+
+def main():
+    ap = argparse.ArgumentParser(description="Extract hashed assets, precompress and manifest the built site.")
+    ap.add_argument("--root", default="docs")
+    ap.add_argument("--min_bytes", type=int, default=256, help="Smaller inline blocks stay in the page")
+    args = ap.parse_args()
+
+    st = postprocess(args.root, args.min_bytes)
+    print(f"[site] {st['pages']} pages, {st['assets']} shared assets; {st['written']} files written, "
+          f"{st['unchanged']} unchanged, {st['pruned']} pruned")
+    print(f"[site] {st['raw_bytes']:,} B raw -> {st['gz_bytes']:,} B gzip / {st['br_bytes']:,} B brotli")
+
+if __name__ == "__main__":
+    main()
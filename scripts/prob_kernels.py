@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# scripts/prob_kernels.py
+"""
+Vectorized probability / odds kernels shared by the edge and merge scripts.
+
+Every function takes scalars or array-likes (numpy, pandas) and returns a
+float ndarray; invalid inputs come back NaN instead of raising. The numbers
+match the old per-row helpers (math.erf, factorial / recursive Poisson sums,
+scalar odds conversions) to within a few ulp.
+
+  erf, norm_cdf, norm_sf        : Normal distribution (Cephes rational erf/erfc)
+  poisson_cdf, poisson_sf       : P(X <= floor(k)), P(X > floor(line)) for arrays of lam and line
+  bernoulli                     : P(side) for yes/no legs
+  american_to_decimal / _prob, decimal_to_american, prob_to_american
+  expected_value                : EV per $1 stake, p*(d-1) - (1-p)
+
+Usage:
+  from prob_kernels import norm_sf, poisson_sf, american_to_decimal, expected_value
+  p_over = norm_sf(df["point"], df["mu"], df["sigma"])
+"""
+import numpy as np
+
+# ---------- erf / erfc (Cephes ndtr.c coefficients, ~1e-16 relative error) ----------
+_T = [9.60497373987051638749E0, 9.00260197203842689217E1, 2.23200534594684319226E3,
+      7.00332514112805075473E3, 5.55923013010394962768E4]
+_U = [3.35617141647503099647E1, 5.21357949780152679795E2, 4.59432382970980127987E3,
+      2.26290000613890934246E4, 4.92673942608635921086E4]
+_P = [2.46196981473530512524E-10, 5.64189564831068821977E-1, 7.46321056442269912687E0,
+      4.86371970985681366614E1, 1.96520832956077098242E2, 5.26445194995477358631E2,
+      9.34528527171957607540E2, 1.02755188689515710272E3, 5.57535335369399327526E2]
+_Q = [1.32281951154744992508E1, 8.67072140885989742329E1, 3.54937778887819891062E2,
+      9.75708501743205489753E2, 1.82390916687909736289E3, 2.24633760818710981792E3,
+      1.65666309194161350182E3, 5.57535340817727675546E2]
+_R = [5.64189583547755073984E-1, 1.27536670759978104416E0, 5.01905042251180477414E0,
+      6.16021097993053585195E0, 7.40974269950448939160E0, 2.97886665372100240670E0]
+_S = [2.26052863220117276590E0, 9.39603524938001434673E0, 1.20489539808096656605E1,
+      1.70814450747565897222E1, 9.60896809063285878198E0, 3.36907645100081516050E0]
+
+def _polevl(x, coef):
+    y = np.full_like(x, coef[0])
+    for c in coef[1:]:
+        y = y * x + c
+    return y
+
+def _p1evl(x, coef):
+    y = x + coef[0]
+    for c in coef[1:]:
+        y = y * x + c
+    return y
+
+def erf(x):
+    """Elementwise erf; each branch is evaluated only on the elements it covers."""
+    x = np.asarray(x, dtype=float)
+    out = np.empty_like(x)
+    ax = np.abs(x)
+    with np.errstate(over="ignore", under="ignore", invalid="ignore"):
+        small = ax <= 1.0
+        z = x[small] * x[small]
+        out[small] = x[small] * _polevl(z, _T) / _p1evl(z, _U)
+
+        # |x| > 1: erf = 1 - erfc(|x|), with erfc from the two tail fits
+        for sel, num, den in ((~small & (ax < 8.0), _P, _Q), (~small & ~(ax < 8.0), _R, _S)):
+            t = ax[sel]
+            erfc = np.exp(-t * t) * _polevl(t, num) / _p1evl(t, den)
+            out[sel] = np.sign(x[sel]) * (1.0 - np.where(t < 27.0, erfc, 0.0))
+    return out
+
+
+# ---------- Normal ----------
+def norm_cdf(x, mu=0.0, sigma=1.0):
+    """P(X <= x) for X ~ N(mu, sigma); NaN where sigma <= 0 or any input is missing."""
+    x, mu, sigma = (np.asarray(v, dtype=float) for v in (x, mu, sigma))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = (x - mu) / (sigma * np.sqrt(2.0))
+        out = 0.5 * (1.0 + erf(z))
+    return np.where(sigma > 0, out, np.nan)
+
+def norm_sf(x, mu=0.0, sigma=1.0):
+    """P(X > x) = 1 - norm_cdf (same rounding as the old `1.0 - norm_cdf(...)`)."""
+    return 1.0 - norm_cdf(x, mu, sigma)
+
+
+# ---------- Poisson ----------
+def poisson_cdf(k, lam):
+    """
+    P(X <= floor(k)) for X ~ Poisson(lam), elementwise over arrays of k and lam.
+    Built from the running pmf e^-lam * lam^i / i! (one pass per i up to max k),
+    so it needs no factorials and no per-row Python. k < 0 -> 0; lam < 0 or NaN -> NaN.
+    """
+    k, lam = np.broadcast_arrays(np.floor(np.asarray(k, dtype=float)), np.asarray(lam, dtype=float))
+    valid = np.isfinite(k) & np.isfinite(lam) & (lam >= 0)
+    lam_v = np.where(valid, lam, 0.0)
+    k_v = np.where(valid, k, -1.0)
+
+    term = np.exp(-lam_v)
+    cdf = term * (k_v >= 0)
+    kmax = int(k_v.max()) if k_v.size else -1
+    with np.errstate(under="ignore"):
+        for i in range(1, kmax + 1):
+            term *= lam_v / i
+            cdf += term * (k_v >= i)  # adding an exact 0.0 past each row's k
+    return np.where(valid, cdf, np.nan)
+
+def poisson_sf(line, lam):
+    """P(X > line) for X ~ Poisson(lam), line possibly fractional (uses floor); clipped at 0."""
+    return np.maximum(0.0, 1.0 - poisson_cdf(line, lam))
+
+
+# ---------- Bernoulli ----------
+def bernoulli(p_yes, yes_side):
+    """P(outcome) for yes/no (or over/under) legs priced from a single probability."""
+    p = np.asarray(p_yes, dtype=float)
+    return np.where(np.asarray(yes_side, dtype=bool), p, 1.0 - p)
+
+
+# ---------- odds conversions ----------
+def american_to_decimal(a):
+    a = np.asarray(a, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = np.where(a > 0, 1.0 + a / 100.0, 1.0 + 100.0 / np.abs(a))
+    return np.where(a != 0, out, np.nan)
+
+def american_to_prob(a):
+    """Implied probability (with vig): 100/(a+100) for dogs, |a|/(|a|+100) for favorites."""
+    a = np.asarray(a, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(a > 0, 100.0 / (a + 100.0), np.abs(a) / (np.abs(a) + 100.0))
+
+def prob_to_american(p, rounded: bool = False):
+    """Fair American price for p in (0, 1); NaN outside. rounded=True rounds half-to-even like round()."""
+    p = np.asarray(p, dtype=float)
+    ok = (p > 0) & (p < 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = np.where(p >= 0.5, -100.0 * p / (1.0 - p), 100.0 * (1.0 - p) / p)
+    if rounded:
+        out = np.round(out)
+    return np.where(ok, out, np.nan)
+
+def decimal_to_american(d):
+    d = np.asarray(d, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = np.where(d >= 2.0, (d - 1.0) * 100.0, -100.0 / (d - 1.0))
+    return np.where(d > 1, out, np.nan)
+
+
+# ---------- EV ----------
+def expected_value(p, dec):
+    """EV per $1 stake (not de-vigged): p*(d-1) - (1-p); NaN unless 0 < p < 1 and d > 1."""
+    p = np.asarray(p, dtype=float)
+    d = np.asarray(dec, dtype=float)
+    ok = (p > 0) & (p < 1) & (d > 1)
+    return np.where(ok, p * (d - 1) - (1 - p), np.nan)
@@ -13,22 +13,34 @@ Datasets:
 - Combine results, draft picks & values
 - Optional: Next Gen Stats (passing/rushing/receiving)
 
-Outputs: Parquet by default, optional CSV via --csv.
+Outputs: season/week-partitioned Parquet tables (data/<name>/season=/week=/,
+see parquet_table.py) by default, optional CSV via --csv.
+
+Full history runs the dataset downloads in a thread pool (--workers, default 4;
+1 = one after another), retries each failed download with exponential backoff
+(--retries / --backoff), saves every dataset as soon as it arrives and ends with
+a per-dataset timing + size report.
 
 Weekly mode:
   --latest-week  → append only the latest completed week of current season
-                   (robust to 'team' vs 'recent_team' column names)
+                   (robust to 'team' vs 'recent_team' column names); only that
+                   week's partition is rewritten
 """
 
 import argparse
 import datetime as dt
 import os
-from typing import List
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List, Tuple
 
 import pandas as pd
 import nfl_data_py as nfl
 from tqdm.auto import tqdm
 
+import parquet_table
+
 
 # -----------------------------
 # Utilities
@@ -65,52 +77,104 @@ def safe_keys(keys: List[str], df: pd.DataFrame) -> List[str]:
     return [k for k in keys if k in df.columns]
 
 def save(df: pd.DataFrame, out_dir: str, name: str, as_csv: bool):
+    """Write out_dir/<name>/ as a season/week-partitioned table (seasons not in df are kept)."""
     ensure_dir(out_dir)
-    df.to_parquet(os.path.join(out_dir, f"{name}.parquet"), index=False)
+    df = ensure_team_col(df)
+    root = os.path.join(out_dir, name)
+    parquet_table.migrate(root)
+    parquet_table.write(df, root)
     if as_csv:
         df.to_csv(os.path.join(out_dir, f"{name}.csv"), index=False)
     print(f"Saved {name}: {len(df):,} rows")
 
 def append_dedup(df_new: pd.DataFrame, out_dir: str, name: str, keys: List[str], as_csv: bool):
     """
-    Append df_new to existing file (if any), then drop duplicates using
-    the intersection of requested keys and the actual columns.
-    Also writes CSV if requested.
+    Merge df_new into the partitions it touches (normally one season/week),
+    dropping duplicates on the requested keys that exist in df_new.
+    The CSV export gets just the new rows appended unless rows were replaced.
     """
     ensure_dir(out_dir)
     df_new = ensure_team_col(df_new)
-    keys_new = safe_keys(keys, df_new)
-
-    ppath = os.path.join(out_dir, f"{name}.parquet")
-    if os.path.exists(ppath):
-        df_old = pd.read_parquet(ppath)
-        df_old = ensure_team_col(df_old)
-        keys_old = safe_keys(keys, df_old)
-        keys_use = [k for k in keys_new if k in keys_old]
-        df = pd.concat([df_old, df_new], ignore_index=True)
-        if keys_use:
-            df = df.drop_duplicates(subset=keys_use, keep="last")
-    else:
-        df = df_new
-        keys_use = keys_new
+    keys_use = safe_keys(keys, df_new)
 
-    df.to_parquet(ppath, index=False)
+    root = os.path.join(out_dir, name)
+    parquet_table.migrate(root)   # one-time: <name>.parquet -> <name>/season=/week=
+    res = parquet_table.upsert(df_new, root, keys=keys_use)
 
     if as_csv:
-        cpath = os.path.join(out_dir, f"{name}.csv")
-        if os.path.exists(cpath):
-            df_old = pd.read_csv(cpath)
-            df_old = ensure_team_col(df_old)
-            keys_old = safe_keys(keys, df_old)
-            keys_use_csv = [k for k in keys_new if k in keys_old]
-            dfc = pd.concat([df_old, df_new], ignore_index=True)
-            if keys_use_csv:
-                dfc = dfc.drop_duplicates(subset=keys_use_csv, keep="last")
-        else:
-            dfc = df_new
-        dfc.to_csv(cpath, index=False)
-
-    print(f"Appended {name}: now {len(df):,} rows (deduped on {keys_use})")
+        parquet_table.append_csv(df_new, os.path.join(out_dir, f"{name}.csv"), root,
+                                 rewrite=res["replaced"] > 0)
+
+    print(f"Appended {name}: {res['added']:,} new / {res['replaced']:,} replaced rows "
+          f"in {res['partitions']} partition(s) (deduped on {keys_use})")
+
+
+# -----------------------------
+# Full-history downloads
+# -----------------------------
+def disk_mb(out_dir: str, name: str) -> float:
+    """Size of a saved dataset: its table directory plus the CSV export, if any."""
+    root, total = os.path.join(out_dir, name), 0
+    for dirpath, _, files in os.walk(root):
+        total += sum(os.path.getsize(os.path.join(dirpath, f)) for f in files)
+    if os.path.exists(root + ".csv"):
+        total += os.path.getsize(root + ".csv")
+    return total / 1e6
+
+def run_task(name: str, fn: Callable[[], pd.DataFrame], out_dir: str, as_csv: bool,
+             retries: int = 3, backoff: float = 2.0) -> dict:
+    """Download one dataset (retrying with exponential backoff + jitter), save it, return its report row."""
+    row = {"dataset": name, "status": "ok", "attempts": 0, "fetch_s": 0.0, "save_s": 0.0,
+           "rows": 0, "mb": 0.0, "error": ""}
+    t0 = time.perf_counter()
+    for attempt in range(1, retries + 2):
+        row["attempts"] = attempt
+        try:
+            df = fn()
+            break
+        except Exception as e:
+            if attempt > retries:
+                row.update(status="failed", fetch_s=time.perf_counter() - t0, error=f"{type(e).__name__}: {e}"[:120])
+                print(f"[WARN] Skipping {name}: {e}")
+                return row
+            delay = backoff * 2 ** (attempt - 1) * (1 + 0.25 * random.random())
+            print(f"[WARN] {name} attempt {attempt} failed ({e}); retrying in {delay:.1f}s")
+            time.sleep(delay)
+    row["fetch_s"] = time.perf_counter() - t0
+    t1 = time.perf_counter()
+    try:
+        df = ensure_team_col(df)
+        save(df, out_dir, name, as_csv=as_csv)
+    except Exception as e:
+        row.update(status="failed", error=f"save: {type(e).__name__}: {e}"[:120])
+        print(f"[WARN] Skipping {name}: {e}")
+    row.update(save_s=time.perf_counter() - t1, rows=len(df), mb=disk_mb(out_dir, name))
+    return row
+
+def run_tasks(tasks: List[Tuple[str, Callable[[], pd.DataFrame]]], out_dir: str, as_csv: bool,
+              workers: int = 4, retries: int = 3, backoff: float = 2.0) -> pd.DataFrame:
+    """
+    Run (name, loader) tasks in a thread pool (the loaders mostly wait on the
+    network and decompression), each saved as soon as it is ready.
+    """
+    t0 = time.perf_counter()
+    rows = []
+    if workers <= 1:
+        for name, fn in tqdm(tasks, desc="Player datasets", unit="set"):
+            rows.append(run_task(name, fn, out_dir, as_csv, retries, backoff))
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            futs = [ex.submit(run_task, name, fn, out_dir, as_csv, retries, backoff) for name, fn in tasks]
+            for fut in tqdm(as_completed(futs), total=len(futs), desc=f"Player datasets ({workers} workers)", unit="set"):
+                rows.append(fut.result())
+    wall = time.perf_counter() - t0
+    rep = pd.DataFrame(rows).sort_values("fetch_s", ascending=False, ignore_index=True)
+    print(rep.drop(columns=["error"] if not rep["error"].any() else []).to_string(
+        index=False, float_format=lambda x: f"{x:,.1f}"))
+    busy = float((rep["fetch_s"] + rep["save_s"]).sum())
+    print(f"[pull] {int((rep['status'] == 'ok').sum())}/{len(rep)} datasets | {rep['rows'].sum():,} rows | "
+          f"{rep['mb'].sum():,.1f} MB | wall {wall:,.1f}s vs {busy:,.1f}s of task time")
+    return rep
 
 
 # -----------------------------
@@ -125,6 +189,9 @@ def main():
     ap.add_argument("--no-ngs", action="store_true", help="Skip Next Gen Stats")
     ap.add_argument("--csv", action="store_true", help="Also write CSVs next to Parquet")
     ap.add_argument("--latest-week", action="store_true", help="Append only latest completed week of current season")
+    ap.add_argument("--workers", type=int, default=4, help="Parallel downloads in full-history mode (1 = sequential)")
+    ap.add_argument("--retries", type=int, default=3, help="Retries per dataset after a failed download")
+    ap.add_argument("--backoff", type=float, default=2.0, help="First retry delay in seconds (doubles each retry)")
     args = ap.parse_args()
 
     out = args.out
@@ -213,13 +280,7 @@ def main():
         for stype in ["passing", "rushing", "receiving"]:
             tasks.append((f"ngs_{stype}", lambda s=stype: nfl.import_ngs_data(stat_type=s, years=years)))
 
-    for name, fn in tqdm(tasks, desc="Player datasets", unit="set"):
-        try:
-            df = fn()
-            df = ensure_team_col(df)
-            save(df, out, name, as_csv=as_csv)
-        except Exception as e:
-            print(f"[WARN] Skipping {name}: {e}")
+    run_tasks(tasks, out, as_csv, workers=args.workers, retries=args.retries, backoff=args.backoff)
 
     print("Full player data pull complete.")
 
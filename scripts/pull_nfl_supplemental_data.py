@@ -1,9 +1,22 @@
 #!/usr/bin/env python3
+"""
+Pull supplemental nflverse data: schedules, team descriptions, play-by-play.
+
+Play-by-play is ingested one season at a time: only the PBP_COLUMNS allow-list is
+read (--pbp-columns to change it, "all" for every ~370 columns), teams / play types
+become categoricals and numerics are downcast (int8 / int16 / int32 / float32). Each season
+is written straight into the week-partitioned data/nfl_supplemental/play_by_play/
+table and dropped, so peak memory is one projected season. --latest-week reads the
+current season with the same projection and upserts just the latest week.
+"""
 import argparse, datetime as dt, os
+import numpy as np
 import pandas as pd
 import nfl_data_py as nfl
 from tqdm.auto import tqdm
 
+import parquet_table
+
 def season_years(start=1999, end=None):
     this_year = dt.date.today().year if end is None else end
     return list(range(start, this_year + 1))
@@ -20,30 +33,79 @@ def latest_completed_week(season: int) -> int:
 
 def ensure_dir(p): os.makedirs(p, exist_ok=True)
 
-def save(df: pd.DataFrame, out_dir: str, name: str, as_csv: bool):
+def save(df: pd.DataFrame, out_dir: str, name: str, as_csv: bool, csv_name=None):
     ensure_dir(out_dir)
-    df.to_parquet(os.path.join(out_dir, f"{name}.parquet"), index=False)
-    if as_csv: df.to_csv(os.path.join(out_dir, f"{name}.csv"), index=False)
+    root = os.path.join(out_dir, name)
+    parquet_table.migrate(root)
+    parquet_table.write(df, root)   # replaces only the seasons in df
+    if as_csv: df.to_csv(os.path.join(out_dir, f"{csv_name or name}.csv"), index=False)
     print(f"Saved {name}: {len(df):,} rows")
 
 def append_dedup(df_new: pd.DataFrame, out_dir: str, name: str, keys, as_csv: bool):
     ensure_dir(out_dir)
-    path = os.path.join(out_dir, f"{name}.parquet")
-    if os.path.exists(path):
-        df_old = pd.read_parquet(path)
-        df = pd.concat([df_old, df_new], ignore_index=True).drop_duplicates(subset=keys, keep="last")
-    else:
-        df = df_new
-    df.to_parquet(path, index=False)
+    root = os.path.join(out_dir, name)
+    parquet_table.migrate(root)
+    res = parquet_table.upsert(df_new, root, keys=keys)   # rewrites only the touched week
     if as_csv:
-        cpath = os.path.join(out_dir, f"{name}.csv")
-        if os.path.exists(cpath):
-            df_old = pd.read_csv(cpath)
-            dfc = pd.concat([df_old, df_new], ignore_index=True).drop_duplicates(subset=keys, keep="last")
-        else:
-            dfc = df_new
-        dfc.to_csv(cpath, index=False)
-    print(f"Appended {name}: now {len(df):,} rows")
+        parquet_table.append_csv(df_new, os.path.join(out_dir, f"{name}.csv"), root, rewrite=res["replaced"] > 0)
+    print(f"Appended {name}: {res['added']:,} new / {res['replaced']:,} replaced rows in {res['partitions']} partition(s)")
+
+# ---------- play-by-play ----------
+# What the feature code reads; keys (game_id, play_id, season, week) are always added.
+PBP_COLUMNS = [
+    "season_type", "game_date", "home_team", "away_team", "posteam", "defteam", "posteam_type",
+    "qtr", "down", "ydstogo", "yardline_100", "game_seconds_remaining", "score_differential",
+    "posteam_score", "defteam_score", "total_home_score", "total_away_score", "drive", "fixed_drive",
+    "fixed_drive_result", "play_type", "shotgun", "no_huddle", "qb_dropback", "qb_scramble",
+    "pass", "rush", "special_teams_play", "yards_gained", "air_yards", "yards_after_catch",
+    "complete_pass", "incomplete_pass", "interception", "sack", "fumble_lost", "touchdown",
+    "pass_touchdown", "rush_touchdown", "first_down", "penalty", "penalty_yards",
+    "two_point_attempt", "field_goal_result", "kick_distance", "extra_point_result",
+    "epa", "wpa", "wp", "vegas_wp", "success", "cpoe", "xpass", "pass_oe",
+    "passer_player_id", "rusher_player_id", "receiver_player_id",
+    "spread_line", "total_line", "roof", "surface",
+]
+PBP_KEYS = ["game_id", "play_id", "season", "week"]
+PBP_CATEGORIES = {"season_type", "home_team", "away_team", "posteam", "defteam", "posteam_type",
+                  "fixed_drive_result", "play_type", "field_goal_result", "extra_point_result",
+                  "roof", "surface", "side_of_field", "timeout_team", "penalty_team", "game_half"}
+
+def downcast_pbp(df: pd.DataFrame) -> pd.DataFrame:
+    """Team / play-type strings -> category; whole-number columns without NaN -> int8/int16/int32; other floats -> float32."""
+    out = {}
+    for c in df.columns:
+        s = df[c]
+        if c in PBP_CATEGORIES and s.dtype == object:
+            s = s.astype("category")
+        elif pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s):
+            v = s.to_numpy()
+            if len(v) and not np.isnan(v).any() and (v == np.round(v)).all():
+                lo, hi = v.min(), v.max()
+                if -2**7 <= lo and hi < 2**7:      # flags, down, qtr, yard lines
+                    s = s.astype("int8")
+                elif -2**15 <= lo and hi < 2**15:
+                    s = s.astype("int16")
+                elif -2**31 <= lo and hi < 2**31:
+                    s = s.astype("int32")
+            elif pd.api.types.is_float_dtype(s):
+                s = s.astype("float32")
+        out[c] = s
+    return pd.DataFrame(out)
+
+def load_pbp_season(season: int, columns=PBP_COLUMNS, week=None) -> pd.DataFrame:
+    """One season of projected, downcast PBP (optionally just one week). columns=None reads every column."""
+    cols = None if columns is None else list(dict.fromkeys(PBP_KEYS + list(columns)))
+    df = nfl.import_pbp_data([season], columns=cols, include_participation=False, downcast=False)
+    if week is not None:
+        df = df[df["week"] == week]
+    if cols is not None:
+        df = df[[c for c in cols if c in df.columns]]
+    return downcast_pbp(df.reset_index(drop=True))
+
+def pbp_columns_arg(values):
+    if values is None:
+        return PBP_COLUMNS
+    return None if values == ["all"] else values
 
 def main():
     ap = argparse.ArgumentParser(description="Supplemental nflverse pull with progress + latest-week mode.")
@@ -52,11 +114,14 @@ def main():
     ap.add_argument("--end", type=int, default=None)
     ap.add_argument("--no-pbp", action="store_true", help="Skip play-by-play (large)")
     ap.add_argument("--csv", action="store_true")
+    ap.add_argument("--pbp-columns", nargs="+", default=None,
+                    help="PBP column allow-list (default PBP_COLUMNS; 'all' = every column)")
     # NEW: only append latest completed week of current season (schedules + PBP for that week)
     ap.add_argument("--latest-week", action="store_true", help="Fetch only latest completed week (current season) and append.")
     args = ap.parse_args()
 
     out, as_csv = args.out, args.csv
+    pbp_cols = pbp_columns_arg(args.pbp_columns)
 
     if args.latest_week:
         season = current_season_today()
@@ -70,12 +135,7 @@ def main():
 
         # Play-by-play for that week only (if allowed)
         if not args.no_pbp:
-            pbp = nfl.import_pbp_data([season])
-            if "week" in pbp.columns:
-                pbp_w = pbp[pbp["week"] == week]
-            else:
-                # conservative fallback if schema changes
-                pbp_w = pbp.merge(sched_w[["game_id"]], on="game_id", how="inner")
+            pbp_w = load_pbp_season(season, pbp_cols, week=week)
             append_dedup(pbp_w, out, "play_by_play", keys=["game_id","play_id"], as_csv=as_csv)
 
         # Team metadata is static; skip in latest mode to keep it quick
@@ -99,12 +159,15 @@ def main():
     except Exception as e:
         print(f"[WARN] Team descriptions failed: {e}")
 
-    # Play-by-play (per year) with progress
+    # Play-by-play (one projected season in memory at a time) with progress
     if not args.no_pbp:
         for y in tqdm(years, desc="Play-by-play by season", unit="season"):
             try:
-                pbp_y = nfl.import_pbp_data([y])
-                save(pbp_y, out, f"play_by_play_{y}", as_csv)
+                pbp_y = load_pbp_season(y, pbp_cols)
+                print(f"PBP {y}: {len(pbp_y):,} plays x {pbp_y.shape[1]} cols, "
+                      f"{pbp_y.memory_usage(deep=True).sum() / 1e6:,.1f} MB in memory")
+                save(pbp_y, out, "play_by_play", as_csv, csv_name=f"play_by_play_{y}")
+                del pbp_y
             except Exception as e:
                 print(f"[WARN] PBP {y} failed: {e}")
 
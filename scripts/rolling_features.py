@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lagged rolling / season-to-date means for every stat column in one sorted pass.
+
+Equivalent (bit for bit) to the per-column groupby lambdas it replaces:
+  <prefix><col>_last<k>     = groupby(group)[col].shift().rolling(k, min_periods=1).mean()
+  <prefix><col>_season_avg  = groupby([group, season])[col].shift().expanding().mean()
+
+Instead of shifting and rolling group by group, each row's window is written
+down directly as [start, end) bounds over the sorted frame (previous k rows of
+the same group / earlier rows of the same group-season, current row excluded)
+and pandas' own rolling-mean kernel runs once per column over the whole frame.
+Same kernel and same add/remove order, so the floats match exactly.
+
+RollingState (the feature store's incremental checkpoint) re-implements that
+kernel's private accumulators, so it is only as exact as its copy of the
+installed pandas. mirrors_pandas() checks it against lagged_means() on a small
+probe frame once per process, and every checkpoint records the pandas version
+it was written with; feature_store.py falls back to lagged_means() / a full
+rebuild when either check fails.
+"""
+
+from functools import lru_cache
+from typing import List
+import numpy as np
+import pandas as pd
+from pandas.api.indexers import BaseIndexer
+
+
+class BlockWindow(BaseIndexer):
+    """Precomputed per-row [start, end) window bounds."""
+    def __init__(self, start: np.ndarray, end: np.ndarray):
+        super().__init__()
+        self.start = start.astype(np.int64)
+        self.end = end.astype(np.int64)
+
+    def get_window_bounds(self, num_values=0, min_periods=None, center=None, closed=None, step=None):
+        return self.start, self.end
+
+
+def block_starts(*keys) -> np.ndarray:
+    """Row index where each row's contiguous run of equal keys begins (frame must be sorted by keys)."""
+    n = len(keys[0])
+    new = np.zeros(n, dtype=bool)
+    if n:
+        new[0] = True
+    for k in keys:
+        codes, _ = pd.factorize(k)  # NaN -> -1, its own run
+        new[1:] |= codes[1:] != codes[:-1]
+    return np.maximum.accumulate(np.where(new, np.arange(n), 0))
+
+
+def feature_names(cols: List[str], lookbacks: List[int], prefix: str) -> List[str]:
+    """Output column order (matches the old col-major loop)."""
+    names = []
+    for col in cols:
+        names += [f"{prefix}{col}_last{k}" for k in lookbacks]
+        names.append(f"{prefix}{col}_season_avg")
+    return names
+
+
+def lagged_means(df: pd.DataFrame, group_col: str, cols: List[str], lookbacks: List[int],
+                 prefix: str, season_col: str = "season") -> pd.DataFrame:
+    """
+    All `<prefix><col>_last<k>` and `<prefix><col>_season_avg` columns for a
+    frame already sorted by [group_col, season_col, week]. Rows whose group
+    key is missing get NaN (groupby drops them).
+    """
+    n = len(df)
+    idx = np.arange(n)
+    g = df[group_col]
+    g_start = block_starts(g)
+    gs_start = block_starts(g, df[season_col])
+    no_group = g.isna().to_numpy()
+
+    vals = df[cols].astype(float)
+    out = {}
+    windows = {k: BlockWindow(np.maximum(g_start, idx - k), idx) for k in lookbacks}
+    windows["season_avg"] = BlockWindow(gs_start, idx)
+    rolled = {key: vals.rolling(w, min_periods=1).mean() for key, w in windows.items()}
+
+    for col in cols:
+        for k in lookbacks:
+            out[f"{prefix}{col}_last{k}"] = rolled[k][col].to_numpy()
+        out[f"{prefix}{col}_season_avg"] = rolled["season_avg"][col].to_numpy()
+
+    feats = pd.DataFrame(out, index=df.index)
+    if no_group.any():
+        feats.loc[no_group, :] = np.nan
+    return feats
+
+
+# ---------------------------
+# Incremental state
+# ---------------------------
+# Per-window accumulators of pandas' roll_mean (aggregations.pyx): Kahan sum and
+# its add/remove compensations, observation / negative / same-value counts and
+# the last value added. Float fields first, then integer fields.
+_FSTATE = ("sum", "cadd", "crem", "prev")
+_ISTATE = ("nobs", "neg", "same")
+
+
+class RollingState:
+    """
+    Checkpoint of lagged_means() at each group's last row, so rows appended after
+    a group's history get the same features (bit for bit) without replaying it.
+
+    Per group it keeps a ring buffer of the last max(lookbacks)+1 values (roll_mean
+    drops the value leaving the window before adding the newest one), the season
+    and row counts, and roll_mean's running sums/counts for every last-k window
+    and for the season-to-date window. update() steps those accumulators through
+    the new rows exactly as roll_mean would have over the full sorted frame.
+    """
+
+    def __init__(self, cols: List[str], lookbacks: List[int]):
+        self.cols, self.lookbacks = list(cols), [int(k) for k in lookbacks]
+        self.pandas_version = pd.__version__        # roll_mean the accumulators were stepped as
+        self.ring_size = max(self.lookbacks) + 1
+        self.keys = np.array([], dtype=object)
+        self._index = {}
+        g, c, w = 0, len(self.cols), len(self.lookbacks) + 1  # windows: last-k..., season
+        self.n = np.zeros(g, dtype=np.int64)          # rows seen per group
+        self.season = np.zeros(g, dtype=np.int64)     # season / week of the group's last row
+        self.week = np.zeros(g, dtype=np.int64)
+        self.q = np.zeros(g, dtype=np.int64)          # rows seen in that season
+        self.ring = np.zeros((g, self.ring_size, c))
+        self.f = np.zeros((len(_FSTATE), w, g, c))
+        self.i = np.zeros((len(_ISTATE), w, g, c), dtype=np.int64)
+
+    # ----- groups -----
+    def _grow(self, new_keys):
+        add = len(new_keys)
+        self.keys = np.concatenate([self.keys, np.asarray(new_keys, dtype=object)])
+        self._index.update({k: j for j, k in enumerate(self.keys)})
+        pad = lambda a, axis: np.concatenate([a, np.zeros(a.shape[:axis] + (add,) + a.shape[axis + 1:], a.dtype)], axis)
+        self.n, self.season, self.week, self.q = (pad(a, 0) for a in (self.n, self.season, self.week, self.q))
+        self.ring = pad(self.ring, 0)
+        self.f, self.i = pad(self.f, 2), pad(self.i, 2)
+
+    def group_codes(self, keys, create: bool = False) -> np.ndarray:
+        """State row for each key (-1 if unseen, or new rows when create=True)."""
+        keys = pd.Series(keys, dtype=object)
+        keys = keys.where(keys.isna(), keys.astype(str))   # checkpoints store keys as str
+        if create:
+            new = [k for k in pd.unique(keys.dropna()) if k not in self._index]
+            if new:
+                self._grow(new)
+        return keys.map(self._index).fillna(-1).to_numpy(dtype=np.int64)
+
+    def can_append(self, df: pd.DataFrame, group_col: str) -> bool:
+        """True if no row sorts before its group's checkpointed last (season, week)."""
+        g = self.group_codes(df[group_col])
+        seen = g >= 0
+        if not seen.any():
+            return True
+        s, w = df["season"].to_numpy()[seen], df["week"].to_numpy()[seen]
+        ls, lw = self.season[g[seen]], self.week[g[seen]]
+        return bool(np.all((s > ls) | ((s == ls) & (w >= lw))))
+
+    # ----- roll_mean accumulators -----
+    @staticmethod
+    def _add(f, i, val, on):
+        on = on & (val == val)
+        s, cadd, prev = f[0], f[1], f[3]
+        y = val - cadd
+        t = s + y
+        f[1] = np.where(on, (t - s) - y, cadd)
+        f[0] = np.where(on, t, s)
+        i[0] += on
+        i[1] += on & np.signbit(val)
+        i[2] = np.where(on, np.where(val == prev, i[2] + 1, 1), i[2])
+        f[3] = np.where(on, val, prev)
+
+    @staticmethod
+    def _remove(f, i, val, on):
+        on = on & (val == val)
+        s, crem = f[0], f[2]
+        y = -val - crem
+        t = s + y
+        f[2] = np.where(on, (t - s) - y, crem)
+        f[0] = np.where(on, t, s)
+        i[0] -= on
+        i[1] -= on & np.signbit(val)
+
+    @staticmethod
+    def _mean(f, i):
+        s, prev = f[0], f[3]
+        nobs, neg, same = i
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out = s / nobs
+        out = np.where(same >= nobs, prev,
+              np.where((neg == 0) & (out < 0), 0.0,
+              np.where((neg == nobs) & (out > 0), 0.0, out)))
+        return np.where(nobs > 0, out, np.nan)
+
+    def _step(self, g, vals, season, week):
+        """One row for each of the (distinct) groups g; returns [window, row, col] means."""
+        m = self.n[g]
+        new_season = (m == 0) | (self.season[g] != season)
+        q = np.where(new_season, 0, self.q[g])
+        last = self.ring[g, (m - 1) % self.ring_size]          # previous row of the group (m >= 1)
+        out = np.empty((len(self.lookbacks) + 1, len(g), len(self.cols)))
+
+        for w, k in enumerate(self.lookbacks + [None]):
+            f, i = self.f[:, w, g], self.i[:, w, g]
+            # roll_mean restarts when the window start reaches the previous end:
+            # a group's first two rows, every row for k=1, a season's first two rows
+            pos = m if k is not None else q
+            reset = ((pos <= 1) | (k == 1))[:, None]
+            empty = (pos == 0)[:, None]
+            f = np.where(reset, 0.0, f)
+            i = np.where(reset, 0, i)
+            f[3] = np.where(reset, np.where(empty, vals, last), f[3])  # prev_value = values[start]
+            if k is not None:
+                drop = ((m >= k + 1) & (k > 1))[:, None] & ~reset
+                self._remove(f, i, self.ring[g, (m - 1 - k) % self.ring_size], drop)
+            self._add(f, i, last, ~empty)
+            out[w] = self._mean(f, i)
+            self.f[:, w, g], self.i[:, w, g] = f, i
+
+        self.ring[g, m % self.ring_size] = vals
+        self.n[g] = m + 1
+        self.season[g], self.week[g], self.q[g] = season, week, q + 1
+        return out
+
+    def update(self, df: pd.DataFrame, group_col: str, prefix: str, season_col: str = "season") -> pd.DataFrame:
+        """
+        lagged_means() for rows that come after everything already in the state,
+        advancing the state past them. df must be sorted by [group_col, season, week].
+        """
+        g = self.group_codes(df[group_col], create=True)
+        vals = df[self.cols].astype(float).to_numpy()
+        vals = np.where(np.isinf(vals), np.nan, vals)   # rolling() treats inf as missing
+        seasons = df[season_col].to_numpy(dtype=np.int64)
+        weeks = df["week"].to_numpy(dtype=np.int64)
+
+        res = np.full((len(self.lookbacks) + 1, len(df), len(self.cols)), np.nan)
+        ok = np.flatnonzero(g >= 0)
+        rank = pd.Series(g[ok]).groupby(g[ok]).cumcount().to_numpy()
+        order = ok[np.argsort(rank, kind="stable")]
+        bounds = np.searchsorted(np.sort(rank), np.arange(rank.max() + 2 if len(rank) else 1))
+        for r in range(len(bounds) - 1):   # round r = every group's r-th new row
+            rows = order[bounds[r]:bounds[r + 1]]
+            res[:, rows] = self._step(g[rows], vals[rows], seasons[rows], weeks[rows])
+
+        out = {}
+        for c, col in enumerate(self.cols):
+            for w, k in enumerate(self.lookbacks):
+                out[f"{prefix}{col}_last{k}"] = res[w, :, c]
+            out[f"{prefix}{col}_season_avg"] = res[-1, :, c]
+        return pd.DataFrame(out, index=df.index)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, group_col: str, cols: List[str], lookbacks: List[int],
+                   prefix: str = "", season_col: str = "season"):
+        """State after every row of a frame sorted by [group_col, season, week]; also returns its features."""
+        state = cls(cols, lookbacks)
+        return state, state.update(df, group_col, prefix, season_col)
+
+    # ----- persistence -----
+    def save(self, path):
+        np.savez(path, cols=np.array(self.cols), lookbacks=np.array(self.lookbacks),
+                 pandas_version=np.array(self.pandas_version), keys=self.keys.astype(str), n=self.n, season=self.season, week=self.week, q=self.q,
+                 ring=self.ring, f=self.f, i=self.i)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as z:
+            state = cls(z["cols"].tolist(), z["lookbacks"].tolist())
+            state.pandas_version = str(z["pandas_version"]) if "pandas_version" in z.files else None
+            state.keys = z["keys"].astype(object)
+            state._index = {k: j for j, k in enumerate(state.keys)}
+            for name in ("n", "season", "week", "q", "ring", "f", "i"):
+                setattr(state, name, z[name])
+        return state
+
+
+@lru_cache(maxsize=None)
+def mirrors_pandas() -> bool:
+    """
+    True if RollingState reproduces lagged_means() exactly under the installed
+    pandas. Probe: NaN / inf gaps, runs of equal values, sign changes and
+    magnitudes far apart (Kahan compensation), over group, season and window edges.
+    """
+    rng = np.random.default_rng(0)
+    n = 600
+    df = pd.DataFrame({"g": np.repeat(np.arange(20), n // 20), "season": np.tile(np.repeat([1, 2, 3], 10), 20),
+                       "week": np.tile(np.arange(10), 60)})
+    a = rng.normal(0, 1, n) * 10.0 ** rng.integers(-3, 12, n)
+    a[rng.random(n) < 0.1] = np.nan
+    a[rng.random(n) < 0.02] = np.inf
+    b = np.round(rng.normal(0, 2, n))       # repeats, negatives, zeros
+    b[rng.random(n) < 0.3] = 4.0
+    df["a"], df["b"], df["c"] = a, b, np.abs(b)
+    cols, lookbacks = ["a", "b", "c"], [1, 2, 3, 5]
+    want = lagged_means(df, "g", cols, lookbacks, "")
+    got = RollingState.from_frame(df, "g", cols, lookbacks)[1]
+    return bool(np.array_equal(got.to_numpy(), want[got.columns].to_numpy(), equal_nan=True))
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# scripts/season_sim.py
+"""
+Monte Carlo regular season + playoffs from Elo ratings (elo.py) and the schedule.
+
+Scored regular-season games before --week count as played; every game from
+--week on (scored or not, so a past week re-simulates the rest of the season
+from the ratings entering it) is drawn with the Elo home win probability (no
+home field at neutral sites). --week defaults to the first unplayed week. All sims of
+a chunk are simulated at once as (sims x games) arrays, so memory is bounded by
+--chunk, not --sims.
+
+  --update   ratings move inside each sim: a week's winners get the elo.py update
+             with a margin drawn around the Elo spread (elo_diff / 25, sd 13.5).
+             Hot teams stay hot, which widens the win distributions.
+
+Standings: division winners take seeds 1-4 by record, the three best other teams
+5-7. Ties in record are broken at random (no head-to-head / division / strength
+of victory tiebreakers). Playoffs: 2v7, 3v6, 4v5 with the 1 seed on a bye, the
+top seed left hosts the lowest, Super Bowl neutral; ratings are the end of
+regular-season ratings of each sim.
+
+Outputs (data/sim/):
+  season_<season>_wk<week>_teams.csv   per team: record so far, mean wins, division /
+                                       playoff / seed 1-7 / conference / Super Bowl
+                                       probabilities, fair American prices
+  season_<season>_wk<week>_wins.csv    team, wins, prob (win-total distribution)
+
+Usage:
+  python3 scripts/season_sim.py --season 2025 --week 7 --sims 100000
+  python3 scripts/season_sim.py --season 2025 --week 1 --update --seed 7
+"""
+
+import argparse, os, pathlib, time
+from typing import Optional
+import numpy as np
+import pandas as pd
+
+import elo
+from prob_kernels import prob_to_american
+
+SIM_DIR = pathlib.Path(os.getenv("SIM_DIR", "data/sim"))
+DIVISIONS = {
+    "AFC East": ["BUF", "MIA", "NE", "NYJ"], "AFC North": ["BAL", "CIN", "CLE", "PIT"],
+    "AFC South": ["HOU", "IND", "JAX", "TEN"], "AFC West": ["DEN", "KC", "LAC", "LV"],
+    "NFC East": ["DAL", "NYG", "PHI", "WAS"], "NFC North": ["CHI", "DET", "GB", "MIN"],
+    "NFC South": ["ATL", "CAR", "NO", "TB"], "NFC West": ["ARI", "LA", "SEA", "SF"],
+}
+TEAMS = sorted(t for teams in DIVISIONS.values() for t in teams)
+MARGIN_SD = 13.5
+MAX_WINS = 17
+
+
+# ---------- inputs ----------
+def league():
+    """Team index lookups: idx, division members (8, 4), conference members (2, 16; AFC first)."""
+    idx = {t: i for i, t in enumerate(TEAMS)}
+    div_teams = np.array([[idx[t] for t in teams] for teams in DIVISIONS.values()])
+    conf_teams = np.array([div_teams[:4].ravel(), div_teams[4:].ravel()])
+    return idx, div_teams, conf_teams
+
+def season_games(sched: pd.DataFrame, season: int, week: Optional[int] = None):
+    """
+    (played, remaining) regular-season games of `season`, franchise-mapped, in play order.
+    With `week`, games of that week and later are remaining even if they have a score.
+    """
+    g = sched[(sched["season"] == season) & (sched["game_type"] == "REG")].copy()
+    g["home_team"] = g["home_team"].astype(str).replace(elo.FRANCHISE)
+    g["away_team"] = g["away_team"].astype(str).replace(elo.FRANCHISE)
+    g = g.sort_values([c for c in ["week", "gameday", "gametime", "game_id"] if c in g.columns], kind="stable")
+    done = g["home_score"].notna() & g["away_score"].notna()
+    if week is not None:
+        done &= g["week"] < week
+    return g[done].reset_index(drop=True), g[~done].reset_index(drop=True)
+
+def record(played: pd.DataFrame, idx: dict) -> np.ndarray:
+    """Wins so far in half-wins (a tie is 1), per team index."""
+    w2 = np.zeros(len(idx), dtype=np.int64)
+    margin = (played["home_score"] - played["away_score"]).to_numpy(dtype=float)
+    h = played["home_team"].map(idx).to_numpy()
+    a = played["away_team"].map(idx).to_numpy()
+    np.add.at(w2, h, np.where(margin > 0, 2, np.where(margin == 0, 1, 0)))
+    np.add.at(w2, a, np.where(margin < 0, 2, np.where(margin == 0, 1, 0)))
+    return w2
+
+
+# ---------- simulation ----------
+def _week_batches(h: np.ndarray, a: np.ndarray, week: np.ndarray):
+    """Game index arrays whose ratings can be updated together (elo._batches on index arrays)."""
+    for w in np.unique(week):
+        b = np.flatnonzero(week == w)
+        teams = np.concatenate([h[b], a[b]])
+        if len(np.unique(teams)) == len(teams):
+            yield b
+        else:
+            for i in b:
+                yield np.array([i])
+
+def _regular_season(rng, n, ratings, h, a, hfa, week, update, k):
+    """(home win bool (n, G), ratings after the season (n, T)) for one chunk."""
+    if not update:
+        p = elo.expected_home_win_prob(ratings[h], ratings[a], hfa)
+        return rng.random((n, len(h))) < p, np.broadcast_to(ratings, (n, len(ratings)))
+    r = np.tile(ratings, (n, 1))
+    home_win = np.empty((n, len(h)), dtype=bool)
+    for b in _week_batches(h, a, week):
+        rh, ra = r[:, h[b]], r[:, a[b]]
+        diff = rh + hfa[b] - ra
+        p = elo.expected_home_win_prob(rh, ra, hfa[b])
+        win = rng.random(p.shape) < p
+        margin = np.abs(rng.normal(diff / 25.0, MARGIN_SD))
+        delta = k * elo.mov_multiplier(margin, diff) * (win - p)
+        r[:, h[b]] = rh + delta
+        r[:, a[b]] = ra - delta
+        home_win[:, b] = win
+    return home_win, r
+
+def _game(rng, r, rows, home, away, hfa):
+    p = elo.expected_home_win_prob(r[rows, home], r[rows, away], hfa)
+    return np.where(rng.random(len(rows)) < p, home, away)
+
+def _playoffs(rng, r, seeds, hfa):
+    """Conference champions (n, 2) and Super Bowl winner (n,) from seeds (n, 2, 7) of team indices."""
+    n = len(seeds)
+    rows = np.arange(n)
+    champs = np.empty((n, 2), dtype=np.int64)
+    for c in range(2):
+        s = seeds[:, c]
+        wc = np.stack([_game(rng, r, rows, s[:, hi], s[:, lo], hfa) for hi, lo in ((1, 6), (2, 5), (3, 4))], axis=1)
+        # seed number of each wild-card winner, then reseed: 1 hosts the lowest remaining seed
+        wc_seed = np.argmax(s[:, None, :] == wc[:, :, None], axis=2)
+        order = np.argsort(wc_seed, axis=1)
+        wc = np.take_along_axis(wc, order, axis=1)
+        d1 = _game(rng, r, rows, s[:, 0], wc[:, 2], hfa)
+        d2 = _game(rng, r, rows, wc[:, 0], wc[:, 1], hfa)
+        d1_seed = np.argmax(s == d1[:, None], axis=1)
+        d2_seed = np.argmax(s == d2[:, None], axis=1)
+        home = np.where(d1_seed < d2_seed, d1, d2)
+        away = np.where(d1_seed < d2_seed, d2, d1)
+        champs[:, c] = _game(rng, r, rows, home, away, hfa)
+    return champs, _game(rng, r, rows, champs[:, 0], champs[:, 1], 0.0)
+
+def simulate(ratings: np.ndarray, remaining: pd.DataFrame, base_w2: np.ndarray, sims: int = 100_000,
+             chunk: int = 20_000, seed: Optional[int] = None, update: bool = False,
+             params: Optional[dict] = None) -> dict:
+    """
+    Run `sims` seasons in chunks. ratings / base_w2 are per team index (TEAMS order).
+    Returns counts: wins (T, 35 half-wins), division (T,), seed (T, 7), conference (T,), superbowl (T,), sims.
+    """
+    p = params or elo.PARAMS
+    idx, div_teams, conf_teams = league()
+    T = len(TEAMS)
+    unknown = (set(remaining["home_team"]) | set(remaining["away_team"])) - set(TEAMS)
+    if unknown:
+        raise ValueError(f"Teams not in DIVISIONS: {sorted(unknown)}")
+    h = remaining["home_team"].map(idx).to_numpy(dtype=np.int64)
+    a = remaining["away_team"].map(idx).to_numpy(dtype=np.int64)
+    neutral = remaining["location"].eq("Neutral").to_numpy() if "location" in remaining else np.zeros(len(h), bool)
+    hfa = np.where(neutral, 0.0, p["hfa"])
+    week = remaining["week"].to_numpy()
+    # one-hot (games x teams) so a chunk's win totals are two matrix products
+    H = np.zeros((len(h), T), dtype=np.float32); H[np.arange(len(h)), h] = 1
+    A = np.zeros((len(a), T), dtype=np.float32); A[np.arange(len(a)), a] = 1
+
+    rng = np.random.default_rng(seed)
+    out = {"wins": np.zeros((T, 2 * MAX_WINS + 1), dtype=np.int64), "division": np.zeros(T, dtype=np.int64),
+           "seed": np.zeros((T, 7), dtype=np.int64), "conference": np.zeros(T, dtype=np.int64),
+           "superbowl": np.zeros(T, dtype=np.int64), "sims": 0}
+    done = 0
+    while done < sims:
+        n = min(chunk, sims - done)
+        home_win, r = _regular_season(rng, n, ratings, h, a, hfa, week, update, p["k"])
+        hw = home_win.astype(np.float32)
+        w2 = base_w2 + (2 * (hw @ H + (1 - hw) @ A)).astype(np.int64)
+        out["wins"] += np.bincount((np.arange(T) * out["wins"].shape[1] + w2).ravel(),
+                                   minlength=out["wins"].size).reshape(out["wins"].shape)
+
+        # random jitter < one half-win breaks ties without reordering records
+        score = w2 + rng.random((n, T))
+        div_win = np.zeros((n, T), dtype=bool)
+        winners = np.take_along_axis(np.broadcast_to(div_teams, (n,) + div_teams.shape),
+                                     np.argmax(score[:, div_teams], axis=2)[..., None], axis=2)[..., 0]
+        np.put_along_axis(div_win, winners, True, axis=1)
+        key = score + 100.0 * div_win
+        order = np.argsort(-key[:, conf_teams], axis=2)[:, :, :7]
+        seeds = np.take_along_axis(np.broadcast_to(conf_teams, (n,) + conf_teams.shape), order, axis=2)
+
+        out["division"] += div_win.sum(axis=0)
+        out["seed"] += np.bincount((seeds * 7 + np.arange(7)).ravel(), minlength=T * 7).reshape(T, 7)
+        champs, sb = _playoffs(rng, r, seeds, p["hfa"])
+        out["conference"] += np.bincount(champs.ravel(), minlength=T)
+        out["superbowl"] += np.bincount(sb, minlength=T)
+        done += n
+    out["sims"] = done
+    return out
+
+
+# ---------- outputs ----------
+def summarize(counts: dict, ratings: np.ndarray, base_w2: np.ndarray) -> tuple:
+    """(per-team table, long win distribution)."""
+    n = counts["sims"]
+    half = np.arange(counts["wins"].shape[1]) / 2.0
+    dist = counts["wins"] / n
+    div_name = {t: d for d, teams in DIVISIONS.items() for t in teams}
+    teams = pd.DataFrame({
+        "team": TEAMS, "conference": [div_name[t][:3] for t in TEAMS], "division": [div_name[t] for t in TEAMS],
+        "elo": ratings, "wins_so_far": base_w2 / 2.0, "mean_wins": dist @ half,
+        "p_division": counts["division"] / n, "p_playoffs": counts["seed"].sum(axis=1) / n,
+    })
+    for s in range(7):
+        teams[f"p_seed{s + 1}"] = counts["seed"][:, s] / n
+    teams["p_conference"] = counts["conference"] / n
+    teams["p_superbowl"] = counts["superbowl"] / n
+    for c in ["p_division", "p_playoffs", "p_conference", "p_superbowl"]:
+        teams[f"{c[2:]}_american"] = prob_to_american(teams[c], rounded=True)
+    teams = teams.sort_values(["conference", "division", "mean_wins"], ascending=[True, True, False],
+                              ignore_index=True)
+    t_i, w_i = np.nonzero(counts["wins"])
+    wins = pd.DataFrame({"team": np.array(TEAMS)[t_i], "wins": half[w_i], "prob": dist[t_i, w_i]})
+    return teams, wins
+
+def run(season: int, week: Optional[int] = None, sims: int = 100_000, chunk: int = 20_000,
+        seed: Optional[int] = None, update: bool = False, sched: Optional[pd.DataFrame] = None,
+        elo_root=None) -> tuple:
+    """
+    Simulate `season` from `week` on (default: first week with an unplayed game): games
+    before it keep their results, the rest are drawn from the ratings entering `week`.
+    """
+    if sched is None:
+        import nfl_data
+        sched = nfl_data.schedules([season])
+    played, remaining = season_games(sched, season)
+    if week is None:
+        week = int(remaining["week"].min()) if len(remaining) else int(played["week"].max()) + 1
+    else:
+        played, remaining = season_games(sched, season, week)
+    idx = league()[0]
+    r = elo.ratings(season, week, root=elo_root).set_index("team")["elo"]
+    missing = [t for t in TEAMS if t not in r.index]
+    if missing:
+        raise SystemExit(f"No Elo rating for {missing}; run scripts/elo.py first")
+    ratings = r.reindex(TEAMS).to_numpy(dtype=float)
+    base_w2 = record(played, idx)
+    t0 = time.perf_counter()
+    counts = simulate(ratings, remaining, base_w2, sims, chunk, seed, update)
+    print(f"[season_sim] {season} from week {week}: {len(played)} played / {len(remaining)} remaining games, "
+          f"{counts['sims']:,} sims{' (Elo updating)' if update else ''} in {time.perf_counter() - t0:.1f}s")
+    return summarize(counts, ratings, base_w2) + (week,)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Monte Carlo season / playoff odds from Elo ratings.")
+    ap.add_argument("--season", type=int, required=True)
+    ap.add_argument("--week", type=int, default=None, help="Simulate from this week on, with the ratings entering it (default: next unplayed week)")
+    ap.add_argument("--sims", type=int, default=100_000)
+    ap.add_argument("--chunk", type=int, default=20_000, help="Sims per vectorized batch (bounds memory)")
+    ap.add_argument("--seed", type=int, default=None)
+    ap.add_argument("--update", action="store_true", help="Update Elo within each simulated season")
+    ap.add_argument("--out_dir", default=str(SIM_DIR))
+    args = ap.parse_args()
+
+    teams, wins, week = run(args.season, args.week, args.sims, args.chunk, args.seed, args.update)
+    out = pathlib.Path(args.out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    base = out / f"season_{args.season}_wk{week}"
+    teams.to_csv(f"{base}_teams.csv", index=False)
+    wins.to_csv(f"{base}_wins.csv", index=False)
+    print(f"Wrote {base}_teams.csv and {base}_wins.csv")
+    show = teams.sort_values("p_superbowl", ascending=False).head(10)
+    print(show[["team", "elo", "mean_wins", "p_division", "p_playoffs", "p_seed1", "p_superbowl"]]
+          .to_string(index=False, float_format=lambda x: f"{x:,.3f}"))
+
+if __name__ == "__main__":
+    main()
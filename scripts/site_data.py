@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# scripts/site_data.py
+"""
+Column-wise normalization of merged props CSVs for the page builders.
+
+read_df(path) loads a merged CSV and adds, for every row:
+  line_disp     bet side + number ("Over 49.5", "Yes", "No Scorer"); an existing
+                line_disp wins, else the first non-blank LINE_CANDIDATES column
+  game_disp     first non-blank GAME_CANDIDATES column, else "<away> vs <home>"
+  kick_et       kick_et, falling back to commence_time
+  kick_disp / market_disp   kickoff_et(kick_et) / pretty_market(market)
+  _mkt_norm / _game_norm / _book_norm   lowercased, space-collapsed filter keys
+
+Everything is built with whole-column fillna / where / str operations; per-value
+formatting (pretty_market, "%g") runs once per distinct value, not once per row.
+parse_numberish / prob01 / american_to_prob turn messy edge / probability / odds
+columns ("7,410 bps", "74.1%", " +150 ") into floats the same way.
+
+records(df, cols) hands the renderers plain row dicts.
+
+Usage:
+  from site_data import read_df, parse_numberish, prob01
+  df = read_df("data/props/props_with_model_week7.csv", numeric=["price", "point"])
+"""
+import re
+import numpy as np
+import pandas as pd
+
+from site_common import pretty_market, kickoff_et
+
+# columns scanned (in order) for the numeric line if line_disp is missing
+LINE_CANDIDATES = [
+    "line_disp","point","line","market_line","prop_line","number","threshold","total","line_number",
+    "handicap","spread","yards","receptions","receiving_yards","rushing_yards","passing_yards","prop_total"
+]
+GAME_CANDIDATES = ["game","Game","matchup","matchup_name","matchup_display"]
+NUMERIC_TOTAL_MARKETS = {"receptions","rush attempts","pass attempts","completions","passing touchdowns",
+                         "rushing attempts"}
+NO_SCORER = {"no scorer","no td scorer","no touchdown scorer"}
+NUM_RE = r"([-+]?\d*\.?\d+(?:[eE][-+]?\d+)?)"
+
+
+# ---------- scalar helpers (applied per distinct value) ----------
+def norm(s) -> str:
+    """normalize for filtering: lowercase, collapse spaces, trim"""
+    return re.sub(r"\s+", " ", str(s or "")).strip().lower()
+
+def is_numeric_total_market(mkt) -> bool:
+    """Markets where 'Over/Under <number>' is expected (not Yes/No)."""
+    m = pretty_market(mkt or "").lower()
+    if not m: return False
+    return "yards" in m or m in NUMERIC_TOTAL_MARKETS
+
+def per_unique(s: pd.Series, fn) -> pd.Series:
+    """fn over the distinct values of s (NaN included), broadcast back to every row."""
+    codes, uniq = pd.factorize(s)
+    vals = np.array([fn(u) for u in uniq] + [fn(np.nan) if (codes < 0).any() else None], dtype=object)
+    return pd.Series(vals[codes], index=s.index)
+
+
+# ---------- numerics ----------
+def num(s):
+    with np.errstate(all="ignore"):
+        return pd.to_numeric(s, errors="coerce")
+
+def parse_numberish(s: pd.Series) -> pd.Series:
+    """First number in each value ('7,410 bps' -> 7410, '74.1%' -> 0.741, ' +150 ' -> 150); NaN if none."""
+    if pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s):
+        v = s.astype(float)
+        return v.where(np.isfinite(v))
+    # regex over the distinct strings only
+    codes, uniq = pd.factorize(s)
+    txt = pd.Series(uniq, dtype=object).astype(str).str.replace(",", " ", regex=False)
+    v = txt.str.extract(NUM_RE, expand=False).astype(float)
+    # treat percentages like 74.1% -> 0.741
+    v = v.where(~(txt.str.contains("%", regex=False) & (v > 1)), v / 100.0)
+    return pd.Series(np.append(v.to_numpy(), np.nan)[codes], index=s.index)
+
+def prob01(s: pd.Series) -> pd.Series:
+    """Probabilities in [0, 1] from decimals or percents; NaN outside [0, 100]."""
+    v = parse_numberish(s)
+    return v.where((v >= 0) & (v <= 1), (v / 100.0).where((v > 1) & (v <= 100)))
+
+def american_to_prob(s: pd.Series) -> pd.Series:
+    """Implied probability from (messy) American odds, no vig removal."""
+    v = parse_numberish(s)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return pd.Series(np.where(v > 0, 100.0 / (v + 100.0), (-v) / ((-v) + 100.0)), index=s.index)
+
+
+# ---------- display columns ----------
+def _text(s: pd.Series) -> pd.Series:
+    """str(v).strip() with NaN -> ''."""
+    return per_unique(s, lambda v: "" if pd.isna(v) else str(v).strip())
+
+def _first_nonblank(df: pd.DataFrame, cols, fmt=None) -> pd.Series:
+    """Per row, the first of `cols` that is non-null and non-blank (optionally formatted), else ''."""
+    out = pd.Series("", index=df.index, dtype=object)
+    for c in reversed([c for c in cols if c in df.columns]):
+        txt = fmt(df[c]) if fmt else _text(df[c])
+        out = txt.where(txt != "", out)
+    return out
+
+def _line_txt(s: pd.Series) -> pd.Series:
+    """'%g' for anything float() accepts (49.5, '49.50' -> '49.5'), the stripped text otherwise."""
+    def fmt(v):
+        if pd.isna(v) or not str(v).strip():
+            return ""
+        try:
+            return f"{float(v):g}"
+        except (TypeError, ValueError):
+            return str(v).strip()
+    return per_unique(s, fmt)
+
+def line_disp(df: pd.DataFrame) -> pd.Series:
+    """Bet side + number; Yes/No become Over/Under on numeric-total markets."""
+    line = _first_nonblank(df, [c for c in LINE_CANDIDATES if c != "line_disp"], _line_txt)
+    name = _text(df["name"]) if "name" in df.columns else pd.Series("", index=df.index)
+    side = name.where(name != "", _text(df["side"]) if "side" in df.columns else "")
+    low = per_unique(side, str.lower)
+    totals = (line != "") & per_unique(df["market"], is_numeric_total_market).astype(bool)
+    side = side.mask(totals & (low == "yes"), "Over").mask(totals & (low == "no"), "Under")
+
+    out = (side + " " + line).where((side != "") & (line != ""), side.where(side != "", line))
+    # Anytime TD "No Scorer" rows
+    td = per_unique(df["market"], lambda m: any(k in pretty_market(m).lower() for k in ("anytime td", "anytime touchdown")))
+    no_scorer = per_unique(df["player"], lambda v: ("" if pd.isna(v) else str(v).strip().lower()) in NO_SCORER)
+    out = out.mask(td.astype(bool) & no_scorer.astype(bool), "No Scorer")
+    if "line_disp" in df.columns:
+        keep = _text(df["line_disp"])
+        out = keep.where(keep != "", out)
+    return out
+
+def game_disp(df: pd.DataFrame) -> pd.Series:
+    """First non-blank GAME_CANDIDATES value, else '<away> vs <home>' (or whichever is known)."""
+    away, home = _text(df["away_team"]), _text(df["home_team"])
+    teams = (away + " vs " + home).where((away != "") & (home != ""), away.where(away != "", home))
+    game = _first_nonblank(df, GAME_CANDIDATES)
+    return game.where(game != "", teams)
+
+def filter_keys(df: pd.DataFrame) -> pd.DataFrame:
+    """market_disp, kick_disp and _mkt_norm / _game_norm / _book_norm for the client-side filters."""
+    df["market_disp"] = per_unique(df["market"], pretty_market)
+    df["kick_disp"] = per_unique(df["kick_et"], lambda v: kickoff_et(None if pd.isna(v) else v))
+    df["_mkt_norm"] = per_unique(df["market"], lambda m: norm(pretty_market(m)))
+    df["_game_norm"] = per_unique(df["game_disp"], norm)
+    df["_book_norm"] = per_unique(df["book"], norm)
+    return df
+
+def records(df: pd.DataFrame, cols=None) -> list:
+    """Row dicts of native Python values for the renderers (to_dict("records") without per-cell boxing)."""
+    cols = [c for c in dict.fromkeys(cols or df.columns) if c is not None and c in df.columns]
+    return [dict(zip(cols, vals)) for vals in zip(*(df[c].tolist() for c in cols))]
+
+
+# ---------- loader ----------
+def read_df(path, numeric=("price",)) -> pd.DataFrame:
+    """Merged CSV -> frame with book, kick_et, line_disp, game_disp and the filter keys; `numeric` cols coerced."""
+    df = pd.read_csv(path)
+    if "book" not in df.columns and "bookmaker" in df.columns:
+        df["book"] = df["bookmaker"]
+    for c in numeric:
+        if c in df.columns:
+            df[c] = num(df[c])
+
+    # kickoff fallback
+    if "kick_et" not in df.columns:
+        df["kick_et"] = df["commence_time"] if "commence_time" in df.columns else None
+    elif "commence_time" in df.columns:
+        df["kick_et"] = df["kick_et"].fillna(df["commence_time"])
+
+    # ensure presence
+    for col in ["player", "market", "book", "home_team", "away_team", "name"]:
+        if col not in df.columns:
+            df[col] = np.nan
+    df["name"] = df["name"].fillna("")
+
+    df["line_disp"] = line_disp(df)
+    df["game_disp"] = game_disp(df)
+    return filter_keys(df)
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# scripts/site_templates.py
+"""
+Jinja2 templates for the site pages (scripts/templates/*.html.j2), streamed to disk.
+
+The environment is built once per process; get_template() compiles each template to
+Python on first use and caches it, so every later page (and every row inside a page)
+runs compiled code. write_page() feeds Template.generate() chunks straight into the
+output file, so a page with thousands of rows is never held in memory as one string (the old
+builders joined rows, spliced them into the page f-string and then ran
+.replace("__NAV__", ...) over the result: three whole-page copies).
+
+Autoescaping is on for .html.j2; pass trusted markup through `|safe` (nav, JSON).
+
+Usage:
+  import site_templates
+  site_templates.write_page("docs/props/consensus.html", "consensus.html.j2", title=..., nav=nav_html("Consensus"),
+                            rows=(row_ctx(r) for r in records))
+"""
+from pathlib import Path
+
+from jinja2 import Environment, FileSystemLoader, StrictUndefined, select_autoescape
+
+TEMPLATE_DIR = Path(__file__).resolve().parent / "templates"
+
+ENV = Environment(
+    loader=FileSystemLoader(str(TEMPLATE_DIR)),
+    autoescape=select_autoescape(enabled_extensions=("html", "j2"), default_for_string=True),
+    undefined=StrictUndefined,
+    keep_trailing_newline=True,
+    auto_reload=False,
+)
+
+def sources(name: str) -> list:
+    """Files a page rendered from `name` depends on: the template plus the shared page helpers (build stamps)."""
+    here = Path(__file__).resolve().parent
+    return [TEMPLATE_DIR / name, here / "site_templates.py", here / "site_common.py", here / "site_data.py"]
+
+def get(name: str):
+    """Compiled template (compiled on first call, cached by the environment)."""
+    return ENV.get_template(name)
+
+def render(name: str, **ctx) -> str:
+    """Whole page as one string (small pages / tests); prefer write_page for real output."""
+    return get(name).render(**ctx)
+
+def write_page(out, name: str, **ctx) -> Path:
+    """Stream `name` rendered with ctx into `out`, chunk by chunk; rows may be generators."""
+    out = Path(out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        f.writelines(get(name).generate(**ctx))
+    return out
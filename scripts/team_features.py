@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# scripts/team_features.py
+"""
+Team offense / defense tables aggregated once from play-by-play.
+
+One row per (team, season, week) in
+  data/team_features/offense.parquet   what the team's offense did
+  data/team_features/defense.parquet   what opposing offenses did against the team
+with the same metric columns:
+  plays, epa_per_play, pass_epa, rush_epa, success_rate, pass_rate, proe
+  (pass rate over expected: mean(pass - xpass)), sec_per_play (pace between
+  snaps within a drive), explosive_rate (20+ yd pass / 10+ yd rush),
+  rz_plays, rz_drives, rz_td_rate,
+  pass_plays, rush_plays, timed_plays (the counts pass_epa / rush_epa /
+  sec_per_play average over, so they can be pooled across weeks).
+
+Scrimmage plays only (pass or rush with a posteam). Built from a column-projected
+read of the play_by_play table (nfl_data.pbp) with groupby aggregations; a
+rebuild for some seasons replaces just those seasons.
+
+Consumers join the lagged versions (last-k / season-to-date means over earlier
+weeks only, see rolling_features.lagged_means) by key:
+  join(df, lookbacks)        player rows: team_off_* on team, opp_def_* on opponent_team
+  as_of(side, season, week)  season-to-date per team before `week` (params builder)
+
+Usage:
+  python3 scripts/team_features.py --seasons 2020 2021 2022 2023 2024 2025
+  python3 scripts/team_features.py              # every season in the local PBP table
+"""
+
+import argparse, os, pathlib, time
+from typing import List, Optional
+import numpy as np
+import pandas as pd
+from rolling_features import lagged_means
+
+TEAM_FEATURES_DIR = pathlib.Path(os.getenv("TEAM_FEATURES_DIR", "data/team_features"))
+SIDES = {"offense": "posteam", "defense": "defteam"}
+PREFIX = {"offense": "team_off_", "defense": "opp_def_"}
+KEYS = ["team", "season", "week"]
+METRICS = ["plays", "epa_per_play", "pass_epa", "rush_epa", "success_rate", "pass_rate", "proe",
+           "sec_per_play", "explosive_rate", "rz_plays", "rz_drives", "rz_td_rate",
+           "pass_plays", "rush_plays", "timed_plays"]
+# rate -> the count it is a mean over (anything else: plays); as_of pools weeks with these
+WEIGHTS = {"pass_epa": "pass_plays", "rush_epa": "rush_plays", "sec_per_play": "timed_plays",
+           "rz_td_rate": "rz_drives"}
+COUNTS = ["plays", "rz_plays", "rz_drives", "pass_plays", "rush_plays", "timed_plays"]
+PBP_COLUMNS = ["game_id", "play_id", "season", "week", "posteam", "defteam", "pass", "rush", "epa", "success",
+               "xpass", "yards_gained", "yardline_100", "game_seconds_remaining", "fixed_drive",
+               "fixed_drive_result"]
+
+
+# ---------- aggregation ----------
+def _plays(pbp: pd.DataFrame) -> pd.DataFrame:
+    """Scrimmage plays with the per-play columns the metrics average."""
+    pbp = pbp.sort_values(["game_id", "play_id"], kind="stable")
+    team = pbp["posteam"].astype(object)
+    gsr = pbp["game_seconds_remaining"].astype(float)
+    same_drive = (pbp["game_id"].eq(pbp["game_id"].shift()) & team.eq(team.shift())).to_numpy()
+    gap = (gsr.shift() - gsr).where(same_drive)
+
+    is_pass = pbp["pass"].astype(float).eq(1)
+    is_rush = pbp["rush"].astype(float).eq(1)
+    keep = (team.notna() & (is_pass | is_rush)).to_numpy()
+    epa = pbp["epa"].astype(float)
+    yds = pbp["yards_gained"].astype(float)
+    rz = pbp["yardline_100"].astype(float).le(20)
+    p = pd.DataFrame({
+        "game_id": pbp["game_id"], "drive": pbp["fixed_drive"], "season": pbp["season"], "week": pbp["week"],
+        "posteam": team, "defteam": pbp["defteam"].astype(object),
+        "epa": epa, "pass_epa": epa.where(is_pass), "rush_epa": epa.where(is_rush),
+        "success": pbp["success"].astype(float), "pass": is_pass.astype(float),
+        "proe": is_pass.astype(float) - pbp["xpass"].astype(float),
+        "gap": gap.clip(0, 60),
+        "explosive": ((is_pass & yds.ge(20)) | (is_rush & yds.ge(10))).astype(float),
+        "rz": rz.astype(float),
+        "drive_td": pbp["fixed_drive_result"].astype(object).eq("Touchdown").astype(float),
+    })
+    return p[keep]
+
+def _aggregate(p: pd.DataFrame, side: str) -> pd.DataFrame:
+    col = SIDES[side]
+    g = p.groupby([col, "season", "week"], sort=True)
+    out = g.agg(plays=("epa", "size"), epa_per_play=("epa", "mean"), pass_epa=("pass_epa", "mean"),
+                rush_epa=("rush_epa", "mean"), success_rate=("success", "mean"), pass_rate=("pass", "mean"),
+                proe=("proe", "mean"), sec_per_play=("gap", "mean"), explosive_rate=("explosive", "mean"),
+                rz_plays=("rz", "sum"), pass_plays=("pass_epa", "count"),
+                rush_plays=("rush_epa", "count"), timed_plays=("gap", "count"))
+    drives = p[p["rz"] == 1].drop_duplicates(["game_id", "drive"])
+    rzd = drives.groupby([col, "season", "week"], sort=True).agg(rz_drives=("drive_td", "size"),
+                                                                  rz_td_rate=("drive_td", "mean"))
+    out = out.join(rzd, how="left")
+    out["rz_drives"] = out["rz_drives"].fillna(0)
+    out = out.reset_index().rename(columns={col: "team"})
+    out["team"] = out["team"].astype(str)
+    out[["season", "week"]] = out[["season", "week"]].astype("int64")
+    return out[KEYS + METRICS]
+
+def aggregate(pbp: pd.DataFrame) -> dict:
+    """{'offense': df, 'defense': df} per (team, season, week) from raw PBP rows."""
+    p = _plays(pbp)
+    return {side: _aggregate(p, side) for side in SIDES}
+
+
+# ---------- storage ----------
+def path(side: str, root=None) -> pathlib.Path:
+    return pathlib.Path(root or TEAM_FEATURES_DIR) / f"{side}.parquet"
+
+def load(side: str, root=None, seasons=None) -> pd.DataFrame:
+    f = path(side, root)
+    if not f.exists():
+        raise FileNotFoundError(f"{f} not found; run scripts/team_features.py first")
+    return pd.read_parquet(f, filters=[("season", "in", [int(s) for s in seasons])] if seasons else None)
+
+def build(seasons: Optional[List[int]] = None, root=None) -> dict:
+    """Aggregate PBP one season at a time and replace those seasons in the stored tables."""
+    import nfl_data
+    root = pathlib.Path(root or TEAM_FEATURES_DIR)
+    if seasons is None:
+        seasons = sorted(nfl_data.freshness(["pbp"])["season"].dropna().astype(int))
+    new = {side: [] for side in SIDES}
+    for s in seasons:
+        t0 = time.perf_counter()
+        pbp = nfl_data.pbp([s], columns=PBP_COLUMNS)
+        for side, df in aggregate(pbp).items():
+            new[side].append(df)
+        print(f"[team_features] {s}: {len(pbp):,} plays in {time.perf_counter() - t0:.1f}s")
+        del pbp
+    root.mkdir(parents=True, exist_ok=True)
+    out = {}
+    for side, frames in new.items():
+        f = path(side, root)
+        old = pd.read_parquet(f) if f.exists() else pd.DataFrame(columns=KEYS + METRICS)
+        old = old[~old["season"].isin(seasons)]
+        df = pd.concat([old] + frames, ignore_index=True).sort_values(KEYS, ignore_index=True)
+        tmp = f.with_name(f"{f.name}.{os.getpid()}.tmp")
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, f)
+        out[side] = df
+        print(f"[team_features] wrote {f} ({len(df):,} team-weeks)")
+    return out
+
+
+# ---------- consumers ----------
+def lagged(side: str, lookbacks: List[int], root=None, metrics=None) -> pd.DataFrame:
+    """Keys + <prefix><metric>_last<k> / _season_avg over earlier weeks only."""
+    df = load(side, root).sort_values(KEYS, ignore_index=True)
+    metrics = metrics or METRICS
+    return pd.concat([df[KEYS], lagged_means(df, "team", metrics, lookbacks, PREFIX[side])], axis=1)
+
+def feature_names(lookbacks: List[int], metrics=None) -> List[str]:
+    return [f"{PREFIX[side]}{m}_{w}" for side in SIDES for m in (metrics or METRICS)
+            for w in [f"last{k}" for k in lookbacks] + ["season_avg"]]
+
+def join(df: pd.DataFrame, lookbacks: List[int], root=None, team_col="team",
+         opp_col="opponent_team") -> pd.DataFrame:
+    """Left-join team_off_* on (team, season, week) and opp_def_* on (opponent, season, week)."""
+    off = lagged("offense", lookbacks, root).rename(columns={"team": team_col})
+    dfn = lagged("defense", lookbacks, root).rename(columns={"team": opp_col})
+    out = df.merge(off, on=[team_col, "season", "week"], how="left")
+    out = out.merge(dfn, on=[opp_col, "season", "week"], how="left")
+    out.index = df.index
+    return out
+
+def as_of(side: str, season: int, week: int, root=None, metrics=None) -> pd.DataFrame:
+    """
+    Per team: averages over weeks < `week` of `season` (week 1: the previous season).
+    Each rate is weighted by the count it averages over (WEIGHTS: pass / rush plays
+    for pass_epa / rush_epa, timed snaps for sec_per_play, red-zone drives for
+    rz_td_rate, plays otherwise), so it matches the rate pooled over those weeks.
+    """
+    df = load(side, root)
+    df = df[(df["season"] == season) & (df["week"] < week)] if week > 1 else df[df["season"] == season - 1]
+    metrics = [m for m in (metrics or METRICS) if m not in COUNTS]
+    w = pd.DataFrame({m: df[WEIGHTS.get(m, "plays")].astype(float) for m in metrics})
+    vals = df[metrics].astype(float)
+    num = (vals * w).groupby(df["team"]).sum(min_count=1)
+    den = w.where(vals.notna()).groupby(df["team"]).sum()
+    return (num / den.replace(0, np.nan)).add_prefix(PREFIX[side]).reset_index()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Aggregate play-by-play into team offense/defense tables.")
+    ap.add_argument("--seasons", nargs="*", type=int, default=None, help="Default: every local PBP season")
+    ap.add_argument("--out", default=str(TEAM_FEATURES_DIR))
+    args = ap.parse_args()
+    t0 = time.perf_counter()
+    build(args.seasons, args.out)
+    print(f"[team_features] done in {time.perf_counter() - t0:.1f}s")
+
+if __name__ == "__main__":
+    main()
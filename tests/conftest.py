@@ -0,0 +1,6 @@
+# tests/conftest.py
+"""The pipeline modules are flat scripts in scripts/; import them the way they import each other."""
+import pathlib, sys
+
+SCRIPTS = pathlib.Path(__file__).resolve().parents[1] / "scripts"
+sys.path.insert(0, str(SCRIPTS))
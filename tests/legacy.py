@@ -0,0 +1,430 @@
+# tests/legacy.py
+"""
+The row-wise / per-group code the vectorized pipeline replaced, kept as reference
+implementations: the tests check the new code against these, and
+scripts/benchmarks.py times the two side by side.
+"""
+import json, math, os, re
+
+import numpy as np
+import pandas as pd
+
+
+# ---------- devig: the groupby().apply de-vig ----------
+def fair_from_two_way(dec_over, dec_under):
+    try:
+        do = float(dec_over); du = float(dec_under)
+    except Exception:
+        return (np.nan, np.nan)
+    if do <= 1 or du <= 1: return (np.nan, np.nan)
+    q_over, q_under = 1.0/do, 1.0/du
+    s = q_over + q_under
+    if s <= 0: return (np.nan, np.nan)
+    return (q_over/s, q_under/s)
+
+
+def book_fair(g: pd.DataFrame) -> pd.DataFrame:
+    over_row  = g[g["_is_over"]==True].head(1)
+    under_row = g[g["_is_over"]==False].head(1)
+    if over_row.empty or under_row.empty:
+        g["fair_prob_book"] = np.nan
+        return g
+    dec_o = over_row["dec_offered"].iloc[0]
+    dec_u = under_row["dec_offered"].iloc[0]
+    p_o, p_u = fair_from_two_way(dec_o, dec_u)
+    g.loc[over_row.index,  "fair_prob_book"] = p_o
+    g.loc[under_row.index, "fair_prob_book"] = p_u
+    return g
+
+
+def cons_fair(g: pd.DataFrame) -> pd.DataFrame:
+    over_rows  = g[g["_is_over"]==True]
+    under_rows = g[g["_is_over"]==False]
+    if over_rows.empty or under_rows.empty:
+        g["fair_prob_cons"] = np.nan
+        return g
+    q_over  = (1.0 / over_rows["dec_offered"]).sum()
+    q_under = (1.0 / under_rows["dec_offered"]).sum()
+    s = q_over + q_under
+    if s <= 0:
+        g["fair_prob_cons"] = np.nan
+        return g
+    p_over, p_under = q_over/s, q_under/s
+    g.loc[over_rows.index,  "fair_prob_cons"] = p_over
+    g.loc[under_rows.index, "fair_prob_cons"] = p_under
+    return g
+
+
+KEYS_BOOK = ["game_id", "player_key", "market_std", "point", "bookmaker"]
+KEYS_CONS = ["game_id", "player_key", "market_std", "point"]
+
+
+def devig(df):
+    df = df.groupby(KEYS_BOOK, group_keys=False).apply(book_fair)
+    df = df.groupby(KEYS_CONS, group_keys=False).apply(cons_fair)
+    return df.sort_index()
+
+
+# ---------- prob_kernels: the per-row odds / probability helpers ----------
+def american_to_decimal(a):
+    try:
+        a = float(a)
+    except Exception:
+        return np.nan
+    return 1.0 + (a/100.0 if a > 0 else 100.0/abs(a))
+
+
+def american_to_prob(odds):
+    if pd.isna(odds): return np.nan
+    o = float(odds)
+    return 100.0/(o+100.0) if o>0 else abs(o)/(abs(o)+100.0)
+
+
+def prob_to_american(p):
+    if p is None or (isinstance(p, float) and (np.isnan(p) or p <= 0 or p >= 1)):
+        return np.nan
+    return int(round(-100*p/(1-p))) if p >= 0.5 else int(round(100*(1-p)/p))
+
+
+def norm_cdf(x, mu=0.0, sigma=1.0):
+    try:
+        x = float(x); mu = float(mu); sigma = float(sigma)
+    except Exception:
+        return np.nan
+    if sigma <= 0: return np.nan
+    z = (x - mu) / (sigma * math.sqrt(2.0))
+    return 0.5 * (1.0 + math.erf(z))
+
+
+def expected_value(p_model, dec_offered):
+    try:
+        p = float(p_model); d = float(dec_offered)
+    except Exception:
+        return np.nan
+    if not (0 < p < 1) or d <= 1: return np.nan
+    return p*(d-1) - (1-p)
+
+
+def poisson_cdf(k, lam):
+    # merge_td_model.py: sum of exp(-lam) lam^i / i!
+    def pmf(i, lam):
+        if lam is None or lam<0 or np.isnan(lam) or i<0: return 0.0
+        return math.exp(-lam) * (lam**i) / math.factorial(i)
+    k = int(math.floor(k))
+    return sum(pmf(i, lam) for i in range(0, k+1))
+
+
+def poisson_sf(lam, L):
+    # join_all_player_props_with_preds.py: running-term recursion
+    if lam <= 0: return 0.0
+    k = int(math.floor(L))
+    term = math.exp(-lam); cdf = term
+    for i in range(1, k+1):
+        term *= lam / i
+        cdf += term
+    return max(0.0, 1.0 - cdf)
+
+
+# ---------- rolling features: per-column groupby lambdas ----------
+def add_player_rolling_and_season(df, cols, lookbacks, group_col="player_id", prefix="p_"):
+    df = df.sort_values([group_col,"season","week"]).copy()
+    for col in cols:
+        for k in lookbacks:
+            df[f"{prefix}{col}_last{k}"] = (
+                df.groupby(group_col)[col].transform(lambda s: s.shift().rolling(k,min_periods=1).mean())
+            )
+        df[f"{prefix}{col}_season_avg"] = (
+            df.groupby([group_col,"season"])[col].transform(lambda s: s.shift().expanding().mean())
+        )
+    return df
+
+
+def build_defense_allowed(df_players, agg_cols, lookbacks):
+    defense = (df_players.groupby(["season","week","opponent_team"], dropna=False)[agg_cols]
+               .sum(min_count=1)
+               .reset_index()
+               .rename(columns={"opponent_team":"def_team"}))
+    defense = defense.sort_values(["def_team","season","week"]).copy()
+    for col in agg_cols:
+        for k in lookbacks:
+            defense[f"def_allowed_{col}_last{k}"] = (
+                defense.groupby("def_team")[col].transform(lambda s: s.shift().rolling(k,min_periods=1).mean())
+            )
+        defense[f"def_allowed_{col}_season_avg"] = (
+            defense.groupby(["def_team","season"])[col].transform(lambda s: s.shift().expanding().mean())
+        )
+    return defense
+
+
+# ---------- make_player_prop_params: iterrows / groupby-loop versions ----------
+def fair_american(p: float) -> float:
+    if p is None or p <= 0 or p >= 1:
+        return float('nan')
+    return -(p/(1-p))*100.0 if p >= 0.5 else ((1-p)/p)*100.0
+
+
+def build_anytime_td_rows(params_df):
+    from make_player_prop_params import _FALLBACK, _std_market
+    out_rows = []
+    have_team = 'team' in params_df.columns
+    group_cols = ['player'] + (['team'] if have_team else [])
+    for _, g in params_df.groupby(group_cols, dropna=False):
+        gg = g.copy()
+        gg['market_std'] = gg['market'].map(_std_market)
+        lam = 0.0
+        for m in ('player_rush_tds','rush_tds','player_reception_tds','rec_tds'):
+            v = gg.loc[gg['market_std']==_std_market(m),'mu']
+            if not v.empty and pd.notna(v.iloc[0]):
+                lam += float(v.iloc[0])
+        if lam <= 0.0:
+            ra = gg.loc[gg['market_std'].isin(['player_rush_attempts','rush_att']),'mu']
+            if not ra.empty and pd.notna(ra.iloc[0]):
+                lam += float(ra.iloc[0]) * _FALLBACK['rush_att_td_rate']
+            rc = gg.loc[gg['market_std'].isin(['player_receptions','rec']),'mu']
+            if not rc.empty and pd.notna(rc.iloc[0]):
+                lam += float(rc.iloc[0]) * _FALLBACK['rec_td_per_rec']
+        lam = max(0.0, lam)
+        p_any = 1 - math.exp(-lam) if lam>0 else 0.0
+        fair = fair_american(p_any)
+        out = {'player': g['player'].iloc[0], 'market': 'player_anytime_td', 'mu': lam, 'sigma': float('nan'),
+               'model_prob': p_any, 'model_price': fair, 'model_line': fair}
+        if have_team: out['team'] = g['team'].iloc[0]
+        out_rows.append(out)
+    return out_rows
+
+
+def build_params(weekly, want_players):
+    from make_player_prop_params import CANDIDATES, DEFAULTS_NORMAL, MARKET_MODEL, first_col
+    for key, aliases in CANDIDATES.items():
+        col = first_col(weekly, aliases)
+        if col: weekly[key] = weekly[col]
+    if "rushing_tds" in weekly.columns or "receiving_tds" in weekly.columns:
+        rtd = weekly.get("rushing_tds", 0).fillna(0)
+        retd = weekly.get("receiving_tds", 0).fillna(0)
+        weekly["anytime_td_flag"] = ((rtd + retd) > 0).astype(int)
+    use_stats = set(v for kind,v in MARKET_MODEL.values() if kind!="bernoulli")
+    agg = {"games": ("player","size")}
+    for stat in use_stats:
+        if stat in weekly.columns:
+            agg[f"{stat}_mean"] = (stat, "mean")
+            if any((k=="normal" and v==stat) for k,v in MARKET_MODEL.values()):
+                agg[f"{stat}_std"] = (stat, "std")
+    stats = weekly.groupby("player").agg(**agg).reset_index()
+    if "anytime_td_flag" in weekly.columns:
+        td_rate = weekly.groupby("player")["anytime_td_flag"].mean().rename("anytime_td_rate").reset_index()
+        stats = stats.merge(td_rate, on="player", how="left")
+    else:
+        stats["anytime_td_rate"] = np.nan
+    params = pd.DataFrame({"player": want_players}).merge(stats, on="player", how="left")
+    params["games"] = params["games"].fillna(0)
+    for stat,(mu0,sd0) in DEFAULTS_NORMAL.items():
+        if f"{stat}_mean" in params.columns:
+            params[f"{stat}_mean"] = params[f"{stat}_mean"].fillna(mu0)
+        if f"{stat}_std" in params.columns:
+            params[f"{stat}_std"] = params[f"{stat}_std"].fillna(sd0)
+    for stat in ["passing_tds","interceptions","rushing_tds","receiving_tds","field_goals_made","sacks","solo_tackles","tackles_with_assists"]:
+        col = f"{stat}_mean"
+        if col in params.columns:
+            params[col] = params[col].fillna(0.1)
+    params["anytime_td_rate"] = params["anytime_td_rate"].fillna(0.08)
+    rows = []
+    for _, r in params.iterrows():
+        for mkt,(kind, stat) in MARKET_MODEL.items():
+            if kind == "normal":
+                mu = float(r.get(f"{stat}_mean", np.nan))
+                sd = float(r.get(f"{stat}_std",  np.nan))
+                if not (sd==sd) or sd <= 0: sd = DEFAULTS_NORMAL.get(stat,(0,10))[1]
+                rows.append({"player": r["player"], "market": mkt, "model": "normal", "mu": mu, "sigma": max(1e-6, sd), "games": int(r["games"])})
+            elif kind == "poisson":
+                lam = float(r.get(f"{stat}_mean", np.nan))
+                if not (lam==lam) or lam <= 0: lam = 0.1
+                rows.append({"player": r["player"], "market": mkt, "model": "poisson", "lam": max(1e-9, lam), "games": int(r["games"])})
+            else:
+                p = float(r.get("anytime_td_rate", np.nan))
+                if not (p==p) or p <= 0: p = 0.05
+                rows.append({"player": r["player"], "market": mkt, "model": "bernoulli", "p": min(max(p,0.001),0.95), "games": int(r["games"])})
+    return pd.DataFrame(rows)
+
+
+# ---------- pull scripts: read-everything append + dedupe ----------
+def append_dedup(df_new, out_dir, name, keys):
+    ppath = os.path.join(out_dir, f"{name}.parquet")
+    if os.path.exists(ppath):
+        df = pd.concat([pd.read_parquet(ppath), df_new], ignore_index=True).drop_duplicates(subset=keys, keep="last")
+    else:
+        df = df_new
+    df.to_parquet(ppath, index=False)
+    cpath = os.path.join(out_dir, f"{name}.csv")
+    if os.path.exists(cpath):
+        dfc = pd.concat([pd.read_csv(cpath), df_new], ignore_index=True).drop_duplicates(subset=keys, keep="last")
+    else:
+        dfc = df_new
+    dfc.to_csv(cpath, index=False)
+    return df
+
+
+# ---------- team_features: per-game loop ----------
+def team_week(pbp, side_col):
+    """Reference: walk each game in snap order, then compute each team's metrics directly."""
+    rows = []
+    for _, game in pbp.sort_values(["game_id", "play_id"]).groupby("game_id", sort=False):
+        gaps, prev_team, prev_t = [], None, None
+        for t, sec in zip(game["posteam"], game["game_seconds_remaining"]):
+            same = prev_team is not None and isinstance(t, str) and t == prev_team
+            gaps.append(min(max(prev_t - sec, 0.0), 60.0) if same else np.nan)
+            prev_team, prev_t = t, sec
+        game = game.assign(gap=gaps)
+        scr = game[game["posteam"].notna() & ((game["pass"] == 1) | (game["rush"] == 1))]
+        for team, g in scr.groupby(side_col):
+            is_pass, is_rush = g["pass"] == 1, g["rush"] == 1
+            rz = g[g["yardline_100"] <= 20].drop_duplicates(["game_id", "fixed_drive"])
+            rows.append({"team": team, "season": int(g["season"].iloc[0]), "week": int(g["week"].iloc[0]),
+                         "plays": len(g), "epa_per_play": g["epa"].mean(), "pass_epa": g.loc[is_pass, "epa"].mean(),
+                         "rush_epa": g.loc[is_rush, "epa"].mean(), "success_rate": g["success"].mean(),
+                         "pass_rate": is_pass.mean(), "proe": (g["pass"] - g["xpass"]).mean(),
+                         "sec_per_play": g["gap"].mean(),
+                         "explosive_rate": ((is_pass & (g["yards_gained"] >= 20)) | (is_rush & (g["yards_gained"] >= 10))).mean(),
+                         "rz_plays": float((g["yardline_100"] <= 20).sum()), "rz_drives": float(len(rz)),
+                         "rz_td_rate": (rz["fixed_drive_result"] == "Touchdown").mean() if len(rz) else np.nan,
+                         "pass_plays": g.loc[is_pass, "epa"].count(), "rush_plays": g.loc[is_rush, "epa"].count(),
+                         "timed_plays": g["gap"].count()})
+    return pd.DataFrame(rows).sort_values(["team", "season", "week"], ignore_index=True)
+
+
+# ---------- elo: per-game iterrows loop ----------
+def elo_season(sched, season):
+    games = sched[(sched["season"] == season) & (sched["game_type"] == "REG")
+                  & sched["home_score"].notna() & sched["away_score"].notna()].sort_values("gameday")
+    elo = {t: 1500.0 for t in sorted(set(games["home_team"]) | set(games["away_team"]))}
+    for _, g in games.iterrows():
+        home, away = str(g["home_team"]), str(g["away_team"])
+        hs, as_ = float(g["home_score"]), float(g["away_score"])
+        eh = 1.0 / (1.0 + 10 ** (-((elo[home] + 55.0) - elo[away]) / 400.0))
+        sh = 1.0 if hs > as_ else (0.5 if hs == as_ else 0.0)
+        mult = math.log(max(abs(hs - as_), 1.0) + 1.0) * (2.2 / ((((elo[home] + 55.0) - elo[away]) * 0.001) + 2.2))
+        delta = 20.0 * mult * (sh - eh)
+        elo[home] += delta
+        elo[away] -= delta
+    return pd.Series(elo).sort_index()
+
+
+# ---------- season_sim: one season at a time ----------
+def division_odds(ratings, sched, sims, seed=0):
+    """One season at a time: per-game coin flips, division winner = most wins (random tiebreak)."""
+    import random, season_sim
+    rnd = random.Random(seed)
+    elo = dict(zip(season_sim.TEAMS, ratings))
+    games = list(zip(sched["home_team"], sched["away_team"]))
+    won = dict.fromkeys(season_sim.TEAMS, 0)
+    for _ in range(sims):
+        wins = dict.fromkeys(season_sim.TEAMS, 0)
+        for home, away in games:
+            p = 1.0 / (1.0 + 10 ** (-((elo[home] + 55.0) - elo[away]) / 400.0))
+            wins[home if rnd.random() < p else away] += 1
+        for teams in season_sim.DIVISIONS.values():
+            won[max(teams, key=lambda t: (wins[t], rnd.random()))] += 1
+    return pd.Series(won).reindex(season_sim.TEAMS).to_numpy() / sims
+
+
+# ---------- make_predictions_from_elo: apply predictions + bracket-scanning odds loader ----------
+def predictions(games):
+    games = games.copy()
+    wp = lambda h, a: 1.0 / (1.0 + 10 ** (-(((h + 55.0) - a) / 400.0)))
+    games["home_win_prob"] = games.apply(lambda r: wp(r["home_elo"], r["away_elo"]), axis=1)
+    games["away_win_prob"] = 1.0 - games["home_win_prob"]
+    games["pred_margin"] = ((games["home_elo"] + 55.0) - games["away_elo"]) / 25.0
+    home_rows = games.copy(); home_rows["team"] = home_rows["home_team"]; home_rows["team_win_prob"] = home_rows["home_win_prob"]
+    away_rows = games.copy(); away_rows["team"] = away_rows["away_team"]; away_rows["team_win_prob"] = away_rows["away_win_prob"]
+    cols = ["game_id", "commence_time", "home_team", "away_team", "team", "team_win_prob", "pred_margin"]
+    return pd.concat([home_rows[cols], away_rows[cols]], ignore_index=True)
+
+
+def json_array(txt):
+    i = txt.find("[")
+    depth, in_str, esc = 0, False, False
+    for j, ch in enumerate(txt[i:], start=i):
+        if in_str:
+            if esc: esc = False
+            elif ch == "\\": esc = True
+            elif ch == '"': in_str = False
+            continue
+        if ch == '"': in_str = True
+        elif ch == "[": depth += 1
+        elif ch == "]":
+            depth -= 1
+            if depth == 0:
+                return txt[i:j + 1]
+
+
+def load_odds(path):
+    txt = "\n".join(ln for ln in open(path, encoding="utf-8").read().splitlines()
+                     if not ln.lstrip().startswith("[info]")).strip()
+    try:
+        pd.read_csv(pd.compat.StringIO(txt))   # AttributeError on pandas >= 1.0, as before
+    except Exception:
+        pass
+    arr = json.loads(json_array(txt))
+    return pd.DataFrame([{"game_id": g.get("id") or g.get("event_id"), "commence_time": g.get("commence_time"),
+                          "home_team": g.get("home_team"), "away_team": g.get("away_team")} for g in arr])
+
+
+# ---------- site pages: per-row read_df applies ----------
+def parse_numberish(x):
+    if x is None or (isinstance(x, float) and math.isnan(x)): return np.nan
+    s = str(x).replace(",", " ").strip()
+    m = re.search(r"[-+]?\d*\.?\d+(?:[eE][-+]?\d+)?", s)
+    if not m: return np.nan
+    v = float(m.group(0))
+    return v / 100.0 if "%" in s and v > 1 else v
+
+
+def page_df(path, consensus):
+    """The old build_top_picks / build_consensus_page read_df display + key columns, one apply per row."""
+    from site_common import pretty_market, american_to_prob
+    from site_data import LINE_CANDIDATES, GAME_CANDIDATES, is_numeric_total_market, norm
+    df = pd.read_csv(path)
+    if "book" not in df.columns and "bookmaker" in df.columns:
+        df["book"] = df["bookmaker"]
+    if not consensus:
+        df["edge_bps"] = df["edge"].apply(parse_numberish)
+    for c in (["price"] if consensus else ["price", "model_line", "point", "line"]):
+        if c in df.columns:
+            df[c] = pd.to_numeric(df[c], errors="coerce")
+    df["name"] = df["name"].fillna("")
+
+    def first_nonnull(r, cols):
+        for c in cols:
+            if c in r and pd.notna(r[c]) and str(r[c]).strip() != "":
+                return r[c]
+        return np.nan
+    def mk_line_disp(r):
+        raw = first_nonnull(r, LINE_CANDIDATES)
+        line = ""
+        if pd.notna(raw):
+            try: line = f"{float(raw):g}"
+            except Exception: line = str(raw).strip()
+        side = side_raw = str(r.get("name") or r.get("side") or "").strip()
+        if line and is_numeric_total_market(r.get("market")):
+            if side_raw.lower() == "yes": side = "Over"
+            elif side_raw.lower() == "no": side = "Under"
+        mkt = pretty_market(r.get("market", "")).lower()
+        if consensus and ("anytime td" in mkt or "anytime touchdown" in mkt) and \
+                str(r.get("player", "")).strip().lower() in {"no scorer", "no td scorer", "no touchdown scorer"}:
+            return "No Scorer"
+        if side and line: return f"{side} {line}"
+        return side or line or ""
+    def mk_game(row):
+        for c in GAME_CANDIDATES:
+            if c in df.columns:
+                v = row.get(c)
+                if pd.notna(v) and str(v).strip(): return str(v).strip()
+        away, home = str(row.get("away_team") or "").strip(), str(row.get("home_team") or "").strip()
+        return f"{away} vs {home}" if away and home else (away or home or "")
+    df["line_disp"] = df.apply(mk_line_disp, axis=1)
+    df["game_disp"] = df.apply(mk_game, axis=1)
+    if consensus:
+        df["imp_prob"] = df["price"].apply(american_to_prob)
+    df["_mkt_norm"] = df["market"].apply(lambda m: norm(pretty_market(m)))
+    df["_game_norm"] = df["game_disp"].apply(norm)
+    df["_book_norm"] = df["book"].apply(norm)
+    return df
@@ -0,0 +1,215 @@
+# tests/synth.py
+"""
+Synthetic inputs shaped like the pipeline's real data (props slates, weekly stats,
+play-by-play, schedules, merged props CSVs). Seeded, so every call with the same
+arguments returns the same frame. Used by the tests and by scripts/benchmarks.py.
+"""
+import json
+
+import numpy as np
+import pandas as pd
+
+
+def props(n_rows: int, seed: int = 7) -> pd.DataFrame:
+    """~n_rows Over/Under quotes: games × players × markets × points × books, with gaps."""
+    rng = np.random.default_rng(seed)
+    n_legs = max(1, -(-n_rows // 12))  # 6 books × 2 sides per leg
+    books = np.array(["DraftKings", "FanDuel", "BetMGM", "Caesars", "BetRivers", "ESPN BET"])
+    leg = np.repeat(np.arange(n_legs), 12)[:n_rows]
+    book = books[np.tile(np.repeat(np.arange(6), 2), n_legs)[:n_rows]]
+    side = np.tile(["Over", "Under"], n_legs * 6)[:n_rows]
+    df = pd.DataFrame({
+        "game_id": (leg % 16).astype(str),
+        "player_key": np.char.add("p", (leg // 4).astype(str)),
+        "market_std": np.array(["passing_yds", "rushing_yds", "receiving_yds", "receptions"])[leg % 4],
+        "point": 0.5 + (leg % 7) * 10.0,
+        "bookmaker": book,
+        "name": side,
+    })
+    price = rng.choice([-140, -125, -120, -115, -110, -105, 100, 105, 110, 120], size=n_rows).astype(float)
+    price[rng.random(n_rows) < 0.01] = np.nan          # missing prices
+    df["price"] = price
+    df = df[rng.random(n_rows) > 0.03].reset_index(drop=True)  # one-sided legs/books
+    dec = np.where(df["price"] > 0, 1.0 + df["price"] / 100.0, 1.0 + 100.0 / df["price"].abs())
+    df["dec_offered"] = dec
+    df["_is_over"] = df["name"].str.lower().isin(["over", "o"])
+    return df
+
+
+def kernel_inputs(n: int, seed: int = 11) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "price": rng.choice([-400, -250, -140, -115, -110, 100, 105, 120, 180, 350], size=n).astype(float),
+        "mu": rng.normal(60, 25, n),
+        "sigma": rng.gamma(4.0, 6.0, n),
+        "point": np.round(rng.normal(60, 25, n) * 2) / 2,
+        "lam": rng.gamma(2.0, 0.6, n),
+        "line": rng.choice([0.5, 1.5, 2.5, 3.5, 4.5, 6.5, 8.5], size=n),
+        "p": rng.uniform(0.01, 0.99, n),
+    })
+    df.loc[rng.random(n) < 0.01, ["price", "sigma", "p"]] = np.nan
+    df.loc[rng.random(n) < 0.005, "sigma"] = 0.0
+    return df
+
+
+ROLL_COLS = ["passing_yards","rushing_yards","receiving_yards","attempts","completions","carries","targets",
+             "fantasy_points_ppr","rush_tds","rec_tds","pass_tds","receptions","sacks","interceptions","fumbles"]
+
+
+def weekly(seasons=range(1999, 2026), seed: int = 3) -> pd.DataFrame:
+    """weekly_player_stats-shaped frame: ~260 players per team-season over 18 weeks, with gaps and NaNs."""
+    rng = np.random.default_rng(seed)
+    teams = np.array([f"T{i:02d}" for i in range(32)])
+    frames = []
+    for season in seasons:
+        n_players = 32 * 14
+        pid = (season - 1999) * 150 + np.arange(n_players)   # careers overlap seasons
+        team = teams[np.arange(n_players) % 32]
+        weeks = np.repeat(np.arange(1, 19), n_players)
+        f = pd.DataFrame({"player_id": np.tile(pid, 18).astype(str), "team": np.tile(team, 18),
+                          "season": season, "week": weeks})
+        f = f[rng.random(len(f)) > 0.25]                      # bye weeks / inactive
+        f["opponent_team"] = teams[(np.searchsorted(teams, f["team"]) + f["week"]) % 32]
+        f["position"] = np.array(["QB", "RB", "WR", "WR", "TE"])[f["player_id"].astype(int) % 5]
+        for c in ROLL_COLS:
+            f[c] = rng.poisson(20 if "yards" in c else 2, len(f)).astype(float)
+        f["fantasy_points_ppr"] = np.round(rng.gamma(2.0, 5.0, len(f)), 2)  # fractional sums
+        f.loc[rng.random(len(f)) < 0.02, ["sacks", "fumbles"]] = np.nan
+        frames.append(f)
+    df = pd.concat(frames, ignore_index=True)
+    df.loc[df.sample(frac=0.001, random_state=seed).index, "opponent_team"] = np.nan
+    df["player_name"] = df["player_id"]
+    return df
+
+
+def prop_weekly(n_players: int, weeks: int = 8, seed: int = 11):
+    """nflverse-style weekly rows for n_players over `weeks` weeks, plus a props player list (with unknowns)."""
+    rng = np.random.default_rng(seed)
+    names = np.array([f"Player {i:05d}" for i in range(n_players)])
+    n = n_players * weeks
+    played = rng.random(n) > 0.2
+    f = pd.DataFrame({"player_display_name": np.repeat(names, weeks), "season": 2025,
+                      "week": np.tile(np.arange(1, weeks + 1), n_players)})[played].reset_index(drop=True)
+    m = len(f)
+    for c, lam in [("passing_yards", 60), ("attempts", 8), ("completions", 5), ("passing_tds", 0.6),
+                   ("interceptions", 0.3), ("rushing_yards", 18), ("rush_attempts", 4), ("rushing_tds", 0.15),
+                   ("receptions", 2), ("receiving_yards", 20), ("receiving_tds", 0.12), ("sacks", 0.2)]:
+        f[c] = rng.poisson(lam, m).astype(float)
+    f.loc[rng.random(m) < 0.05, ["rushing_tds", "receiving_tds"]] = np.nan
+    f.loc[f["player_display_name"].str.endswith("7"), "receptions"] = 3.0   # zero std
+    props_players = sorted(set(rng.choice(names, int(n_players * 0.9), replace=False))
+                           | {f"Rookie {i}" for i in range(max(1, n_players // 50))})
+    return f, props_players
+
+
+def pbp(seasons, seed: int = 5) -> pd.DataFrame:
+    """PBP-shaped frame: 16 games x 130 plays per week, alternating 6-play drives, some non-scrimmage plays."""
+    rng = np.random.default_rng(seed)
+    teams = np.array([f"T{i:02d}" for i in range(32)])
+    frames = []
+    for season in seasons:
+        for week in range(1, 19):
+            perm = rng.permutation(32)
+            home, away = teams[perm[:16]], teams[perm[16:]]
+            game = np.repeat(np.arange(16), 130)
+            k = np.tile(np.arange(130), 16)
+            drive = k // 6 + 1
+            n = len(k)
+            off_home = drive % 2 == 1
+            kind = rng.choice(["pass", "run", "other"], n, p=[0.55, 0.4, 0.05])
+            f = pd.DataFrame({
+                "game_id": [f"{season}_{week:02d}_{g:02d}" for g in game], "play_id": k * 20 + 1.0,
+                "season": season, "week": week,
+                "posteam": np.where(off_home, home[game], away[game]), "defteam": np.where(off_home, away[game], home[game]),
+                "pass": (kind == "pass").astype(float), "rush": (kind == "run").astype(float),
+                "epa": rng.normal(0, 1.3, n), "xpass": rng.uniform(0.3, 0.8, n),
+                "yards_gained": rng.integers(-5, 40, n).astype(float),
+                "yardline_100": np.clip(rng.integers(30, 80, n) - 12 * (k % 6), 1, 99).astype(float),
+                "game_seconds_remaining": 3600.0 - k * 27 - rng.integers(0, 10, n),
+                "fixed_drive": drive.astype(float),
+            })
+            f["success"] = (f["epa"] > 0).astype(float)
+            f.loc[rng.random(n) < 0.03, "xpass"] = np.nan
+            f.loc[kind == "other", "posteam"] = None
+            res = rng.choice(["Touchdown", "Punt", "Field goal", "Turnover"], 16 * 22)
+            f["fixed_drive_result"] = res[game * 22 + drive - 1]
+            frames.append(f)
+    return pd.concat(frames, ignore_index=True)
+
+
+def schedules(seasons=range(1999, 2026), seed: int = 9) -> pd.DataFrame:
+    """nflverse schedules-shaped frame: 18 REG weeks of 16 games per season, random scores."""
+    rng = np.random.default_rng(seed)
+    teams = np.array([f"T{i:02d}" for i in range(32)])
+    frames = []
+    for season in seasons:
+        for week in range(1, 19):
+            perm = rng.permutation(32)
+            frames.append(pd.DataFrame({
+                "game_id": [f"{season}_{week:02d}_{i:02d}" for i in range(16)], "season": season, "week": week,
+                "game_type": "REG", "gameday": f"{season}-09-{week:02d}", "home_team": teams[perm[:16]],
+                "away_team": teams[perm[16:]], "home_score": rng.integers(0, 45, 16).astype(float),
+                "away_score": rng.integers(0, 45, 16).astype(float)}))
+    return pd.concat(frames, ignore_index=True)
+
+
+def season(seed: int = 13):
+    """Elo ratings (TEAMS order) + a 17-week, 16-games-a-week schedule over season_sim's real team codes."""
+    import season_sim
+    rng = np.random.default_rng(seed)
+    teams = np.array(season_sim.TEAMS)
+    frames = []
+    for week in range(1, 18):
+        perm = rng.permutation(32)
+        frames.append(pd.DataFrame({"game_id": [f"2030_{week:02d}_{i:02d}" for i in range(16)], "season": 2030,
+                                    "week": week, "game_type": "REG", "location": "Home",
+                                    "home_team": teams[perm[:16]], "away_team": teams[perm[16:]],
+                                    "home_score": rng.integers(0, 45, 16).astype(float),
+                                    "away_score": rng.integers(0, 45, 16).astype(float)}))
+    return rng.normal(1500, 80, 32), pd.concat(frames, ignore_index=True)
+
+
+def odds_games(n: int, seed: int = 17) -> pd.DataFrame:
+    import make_predictions_from_elo as mp
+    rng = np.random.default_rng(seed)
+    names = np.array(sorted(mp.TEAM_MAP))
+    pick = rng.integers(0, len(names), (n, 2))
+    pick[:, 1] = np.where(pick[:, 0] == pick[:, 1], (pick[:, 1] + 1) % len(names), pick[:, 1])
+    return pd.DataFrame({"game_id": [f"evt{i:08d}" for i in range(n)], "commence_time": "2025-10-19T17:00:00Z",
+                         "home_team": names[pick[:, 0]], "away_team": names[pick[:, 1]],
+                         "home_elo": rng.normal(1500, 80, n), "away_elo": rng.normal(1500, 80, n)})
+
+
+def odds_payload(n: int) -> str:
+    """Odds API /odds response for n events, wrapped in the [info] lines some plans prepend/append."""
+    games = odds_games(n).rename(columns={"game_id": "id"})
+    events = [dict(g, sport_key="americanfootball_nfl", bookmakers=[{"key": "dk", "markets": [
+        {"key": "h2h", "outcomes": [{"name": g["home_team"], "price": -150}, {"name": g["away_team"], "price": 130}]}]}])
+        for g in games.drop(columns=["home_elo", "away_elo"]).to_dict("records")]
+    return "[info] GET /v4/sports/americanfootball_nfl/odds\n" + json.dumps(events) + "\n[info] done\n"
+
+
+def merged_props(n: int, seed: int = 21) -> pd.DataFrame:
+    """Merged props CSV shape: player/market/book/name/point/price, string edges, some blank names."""
+    import make_predictions_from_elo as mp
+    rng = np.random.default_rng(seed)
+    teams = np.array(sorted(mp.TEAM_MAP))
+    g = rng.integers(0, 16, n)
+    markets = np.array(["player_rush_yds", "player_rec_yds", "player_receptions", "player_anytime_td",
+                        "player_pass_tds", "player_pass_yds"])
+    mk = markets[rng.integers(0, len(markets), n)]
+    td = mk == "player_anytime_td"
+    players = np.array([f"Player {i}" for i in range(400)] + ["No Scorer"])
+    side = np.where(td, np.where(rng.random(n) < 0.8, "Yes", "No"), np.where(rng.random(n) < 0.5, "Over", "Under"))
+    side = np.where(rng.random(n) < 0.05, "", side)
+    price = rng.choice([-250, -180, -130, -115, -110, 100, 105, 120, 150, 240, 400], n).astype(float)
+    model = rng.uniform(0.05, 0.95, n)
+    return pd.DataFrame({
+        "player": players[rng.integers(0, len(players), n)], "market": mk,
+        "bookmaker": rng.choice(["DraftKings", "FanDuel", "BetMGM", "Caesars", "  bet365 "], n),
+        "name": side, "point": np.where(td, np.nan, np.round(rng.uniform(0.5, 300, n) * 2) / 2),
+        "price": price, "home_team": teams[2 * g], "away_team": teams[2 * g + 1],
+        "commence_time": "2025-10-19T17:00:00Z",
+        "model_prob": np.where(rng.random(n) < 0.3, pd.Series(model * 100).round(1).astype(str) + "%", model.astype(str)),
+        "edge": pd.Series(rng.normal(0, 900, n)).round().map(lambda v: f"{v:,.0f} bps"),
+    })
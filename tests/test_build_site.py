@@ -0,0 +1,47 @@
+# tests/test_build_site.py
+"""build_site skips pages whose build stamp (inputs + args + sources) matches the last build."""
+import os
+
+import numpy as np
+import pytest
+
+import build_site
+import build_stamp
+
+import synth
+
+
+@pytest.fixture
+def site(tmp_path, monkeypatch):
+    monkeypatch.setattr(build_stamp, "STAMP_DIR", tmp_path / "stamps")
+    f = tmp_path / "merged.csv"
+    m = synth.merged_props(2_000)
+    m.assign(market_std=m["market"], model_prob=np.random.default_rng(0).uniform(0.05, 0.95, len(m)),
+             model_price=np.nan).to_csv(f, index=False)
+    docs = tmp_path / "docs"
+    return str(f), str(docs), lambda **kw: build_site.build(str(f), str(docs), workers=1, **kw)
+
+
+def _pages(docs):
+    return {n: (docs + "/" + page) for n, (_, page, _) in build_site.PAGES.items()}
+
+
+def test_rebuild_with_same_inputs_is_a_noop(site):
+    _, docs, build = site
+    assert sorted(build(week=7)) == sorted(build_site.PAGES)
+    before = {n: open(p, "rb").read() for n, p in _pages(docs).items()}
+    assert build(week=7) == []
+    assert {n: open(p, "rb").read() for n, p in _pages(docs).items()} == before
+    assert sorted(build(week=7, force=True)) == sorted(build_site.PAGES)
+
+
+def test_only_affected_pages_rebuild(site):
+    csv, docs, build = site
+    build(week=7)
+    # top picks has no week in its title, so only the titled pages see the new args
+    assert sorted(build(week=8)) == ["consensus", "props"]
+    os.remove(_pages(docs)["top"])
+    assert build(week=8) == ["top"]
+    with open(csv, "a", encoding="utf-8") as fh:
+        fh.write(open(csv, encoding="utf-8").read().splitlines()[1] + "\n")
+    assert sorted(build(week=8)) == sorted(build_site.PAGES)
@@ -0,0 +1,52 @@
+# tests/test_build_top_picks.py
+"""top.json: rows in edge-desc order, and the `by` index lists are exactly what filtering the columns gives."""
+import json
+import os
+
+import numpy as np
+import pytest
+
+import build_stamp
+import build_top_picks
+
+import synth
+
+
+@pytest.fixture(scope="module")
+def built(tmp_path_factory):
+    tmp = tmp_path_factory.mktemp("top")
+    f = tmp / "merged.csv"
+    synth.merged_props(2_000).to_csv(f, index=False)
+    out = tmp / "props" / "top.html"
+    mp = pytest.MonkeyPatch()
+    mp.setattr(build_stamp, "STAMP_DIR", tmp / "stamps")
+    try:
+        assert build_top_picks.main(["--merged_csv", str(f), "--out", str(out), "--limit", "500"])
+    finally:
+        mp.undo()
+    return out, json.loads(out.with_suffix(".json").read_text(encoding="utf-8"))
+
+
+def test_page_points_at_payload(built):
+    out, _ = built
+    assert os.path.basename(out.with_suffix(".json")) in out.read_text(encoding="utf-8")
+
+
+def test_rows_capped_and_edge_desc(built):
+    _, data = built
+    cols = data["cols"]
+    assert data["n"] == 500
+    assert all(len(v) == data["n"] for v in cols.values())
+    edge = np.array([np.nan if e is None else e for e in cols["edge"]], dtype=float)
+    edge = edge[~np.isnan(edge)]
+    assert (np.diff(edge) <= 0).all()
+
+
+@pytest.mark.parametrize("dim,labels", [("market", "markets"), ("game", "games"), ("book", "books")])
+def test_index_lists_match_codes(built, dim, labels):
+    _, data = built
+    codes = np.array(data["cols"][dim])
+    by = data["by"][dim]
+    assert len(by) == len(data[labels])
+    for i, rows in enumerate(by):
+        assert rows == np.flatnonzero(codes == i).tolist()
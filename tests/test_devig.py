@@ -0,0 +1,32 @@
+# tests/test_devig.py
+import numpy as np
+import pytest
+
+import legacy, synth
+from devig import METHODS, book_fair_probs, cons_fair_probs
+from legacy import KEYS_BOOK, KEYS_CONS
+
+
+def _new_devig(df, method="proportional"):
+    df = df.copy()
+    df["fair_prob_book"] = book_fair_probs(df, KEYS_BOOK, method=method)
+    df["fair_prob_cons"] = cons_fair_probs(df, KEYS_CONS, method=method)
+    return df
+
+
+@pytest.mark.parametrize("rows", [1_000, 5_000])
+def test_proportional_matches_groupby_apply(rows):
+    df = synth.props(rows)
+    new, old = _new_devig(df), legacy.devig(df)
+    np.testing.assert_allclose(new["fair_prob_book"], old["fair_prob_book"], rtol=0, atol=1e-12)
+    np.testing.assert_allclose(new["fair_prob_cons"], old["fair_prob_cons"], rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_two_way_probs_sum_to_one(method):
+    d = _new_devig(synth.props(20_000), method)
+    over = d[d["_is_over"]].groupby(KEYS_BOOK)["fair_prob_book"].first()
+    under = d[~d["_is_over"]].groupby(KEYS_BOOK)["fair_prob_book"].first()
+    tot = (over + under).dropna()
+    assert len(tot) > 0
+    np.testing.assert_allclose(tot, 1.0, rtol=0, atol=1e-9)
@@ -0,0 +1,35 @@
+# tests/test_elo.py
+"""Weekly-batched Elo engine vs the old per-game iterrows loop, and incremental vs full builds."""
+import numpy as np
+import pandas as pd
+import pytest
+
+import elo
+
+import legacy, synth
+
+
+@pytest.fixture(scope="module")
+def sched():
+    return synth.schedules(seasons=range(2021, 2026))
+
+
+def test_season_from_1500_matches_iterrows(sched):
+    last = int(sched["season"].max())
+    state = elo._empty_state(dict(elo.PARAMS, game_types=["REG"]))
+    hist = elo.apply_games(elo.completed_games(sched[sched["season"] == last], ["REG"]), state)
+    new = elo.season_final(last, hist).set_index("team")["elo"].sort_index()
+    old = legacy.elo_season(sched, last)
+    np.testing.assert_allclose(new.to_numpy(), old.reindex(new.index).to_numpy(), rtol=0, atol=1e-9)
+
+
+def test_incremental_update_matches_full_build(sched, tmp_path):
+    pytest.importorskip("pyarrow")  # history is stored as Parquet
+    last = int(sched["season"].max())
+    full = elo.update(sched, tmp_path / "full")
+    cut = sched.copy()
+    cut.loc[(cut["season"] == last) & (cut["week"] >= cut["week"].max()), ["home_score", "away_score"]] = np.nan
+    elo.update(cut, tmp_path / "inc", full=True)
+    inc = elo.update(sched, tmp_path / "inc")
+    pd.testing.assert_frame_equal(inc, full, check_exact=True)
+    assert len(elo.ratings(last, int(sched["week"].max()), None, tmp_path / "full")) == 32
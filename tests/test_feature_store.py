@@ -0,0 +1,95 @@
+# tests/test_feature_store.py
+"""Weekly incremental feature-store appends vs a full rebuild."""
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+pytest.importorskip("sklearn")
+import feature_store as fs
+from ml_player_pipeline import STAT_COLS, build_dataset, load_player_weekly
+
+import synth
+
+LOOKBACKS = [1, 3]
+
+
+@pytest.fixture(scope="module")
+def stores(tmp_path_factory):
+    """History materialized once, then two weeks appended incrementally and rebuilt in full."""
+    tmp = tmp_path_factory.mktemp("feature_store")
+    df = synth.weekly(seasons=range(2023, 2025))
+    wk = df["season"] * 100 + df["week"]
+    last = np.sort(wk.unique())[-2:]
+    csv, inc, full = str(tmp / "weekly.csv"), str(tmp / "inc"), str(tmp / "full")
+    cur = df[~wk.isin(last)]
+    cur.to_csv(csv, index=False)
+    fs.materialize(csv, LOOKBACKS, STAT_COLS, load_player_weekly, inc)
+    for w in last:
+        cur = pd.concat([cur, df[wk == w]])
+        cur.to_csv(csv, index=False)
+        p_inc = fs.materialize(csv, LOOKBACKS, STAT_COLS, load_player_weekly, inc)
+        p_full = fs.materialize(csv, LOOKBACKS, STAT_COLS, load_player_weekly, full, incremental=False)
+        assert fs.manifest(p_inc).get("appended") == int((wk == w).sum()), f"week {w} was not appended"
+    return csv, inc, p_inc, p_full
+
+
+def test_incremental_rows_match_full_rebuild(stores):
+    _, _, p_inc, p_full = stores
+    cols = fs.manifest(p_full)["columns"]
+    pd.testing.assert_frame_equal(fs.load_rows(p_inc, cols), fs.load_rows(p_full, cols), check_exact=True)
+
+
+def test_player_features_match_full_rebuild(stores):
+    _, _, p_inc, p_full = stores
+    pd.testing.assert_frame_equal(fs.player_features(p_inc, positions=["WR", "TE"]),
+                                  fs.player_features(p_full, positions=["WR", "TE"]), check_exact=True)
+
+
+def test_build_dataset_from_store_matches_csv(stores):
+    csv, inc, _, _ = stores
+    X_s, y_s, _ = build_dataset(csv, "receiving_yards", ["WR", "TE"], None, LOOKBACKS, inc)
+    X_c, y_c, _ = build_dataset(csv, "receiving_yards", ["WR", "TE"], None, LOOKBACKS)
+    pd.testing.assert_frame_equal(X_s, X_c, check_exact=True)
+    pd.testing.assert_series_equal(y_s, y_c, check_exact=True)
+
+
+@pytest.fixture
+def history(tmp_path):
+    """History CSV with a checkpointed entry, plus the same CSV with its last week appended."""
+    df = synth.weekly(seasons=[2024])
+    last = df["week"] == df["week"].max()
+    base_csv, csv = tmp_path / "base.csv", tmp_path / "weekly.csv"
+    df[~last].to_csv(base_csv, index=False)
+    df.to_csv(csv, index=False)
+    return str(base_csv), str(csv), tmp_path / "store"
+
+
+def _materialize(csv, root, **kw):
+    return fs.materialize(csv, LOOKBACKS, STAT_COLS, load_player_weekly, root, **kw)
+
+
+def test_checkpoint_from_other_pandas_forces_full_build(history):
+    base_csv, csv, root = history
+    base = _materialize(base_csv, root)
+    state = fs.RollingState.load(base / fs.STATE_FILE)
+    assert state.pandas_version == pd.__version__
+    state.pandas_version = "0.0.0"
+    state.save(base / fs.STATE_FILE)
+    path = _materialize(csv, root)
+    assert "appended" not in fs.manifest(path)
+    full = _materialize(csv, root.parent / "full", incremental=False)
+    cols = fs.manifest(full)["columns"]
+    pd.testing.assert_frame_equal(fs.load_rows(path, cols), fs.load_rows(full, cols), check_exact=True)
+
+
+def test_no_checkpoint_when_rolling_state_drifts(history, monkeypatch):
+    base_csv, csv, root = history
+    ref = _materialize(csv, root.parent / "ref", incremental=False)
+    monkeypatch.setattr(fs, "mirrors_pandas", lambda: False)
+    base = _materialize(base_csv, root)
+    assert not (base / fs.STATE_FILE).exists()
+    path = _materialize(csv, root)   # no checkpoint to append to: full build from lagged_means()
+    assert "appended" not in fs.manifest(path) and not (path / fs.STATE_FILE).exists()
+    cols = fs.manifest(ref)["columns"]
+    pd.testing.assert_frame_equal(fs.load_rows(path, cols), fs.load_rows(ref, cols), check_exact=True)
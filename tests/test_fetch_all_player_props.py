@@ -0,0 +1,110 @@
+# tests/test_fetch_all_player_props.py
+"""fetch_events against a local stub of the Odds API with injected latency."""
+import asyncio, json, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import fetch_all_player_props as fap
+import odds_cache
+
+LATENCY = 0.25
+N_EVENTS = 8
+MISSING = "ev3"  # answers 404 (no props posted yet)
+PARAMS = {"regions": "us", "oddsFormat": "american", "markets": "player_pass_yds,player_anytime_td"}
+
+
+def _payload(event_id: str) -> dict:
+    n = int(event_id[2:])
+    return {"id": event_id, "bookmakers": [
+        {"key": book, "title": book.title(), "markets": [
+            {"key": "player_pass_yds", "outcomes": [
+                {"name": side, "description": f"QB {n}", "price": -110 - 5 * k, "point": 220.5 + n}
+                for k, side in enumerate(("Over", "Under"))]},
+            {"key": "player_anytime_td", "outcomes": [
+                {"name": "Yes", "description": f"RB {n}", "price": 120 + 10 * n + k}]},
+        ]} for k, book in enumerate(("draftkings", "fanduel"))]}
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    """Stub server: every request sleeps LATENCY; yields (base url, request start times)."""
+    monkeypatch.setattr(odds_cache, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(odds_cache, "LOG_PATH", tmp_path / "cache" / "calls.jsonl")
+    starts, lock = [], threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            with lock:
+                starts.append(time.monotonic())
+            time.sleep(LATENCY)
+            event_id = self.path.split("/events/")[1].split("/")[0]
+            body = b'{"message": "not found"}' if event_id == MISSING else json.dumps(_payload(event_id)).encode()
+            self.send_response(404 if event_id == MISSING else 200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{srv.server_address[1]}", starts
+    srv.shutdown()
+    srv.server_close()
+
+
+def _run(base, **kw):
+    ids = [f"ev{i}" for i in range(N_EVENTS)]
+    t0 = time.perf_counter()
+    payloads, fetched_at = asyncio.run(fap.fetch_events(ids, PARAMS, base=base, **kw))
+    elapsed = time.perf_counter() - t0
+    rows = []
+    for event_id, data in zip(ids, payloads):
+        g = {"game_id": event_id, "commence_time": "2025-09-07T17:00:00Z", "home_team": "H", "away_team": "A"}
+        rows.extend(fap.flatten_event(g, data))
+    return rows, payloads, fetched_at, elapsed
+
+
+def test_concurrent_fetch_overlaps_latency_and_matches_sequential(api):
+    base, starts = api
+    seq_rows, seq_payloads, _, seq_s = _run(base, concurrency=1, rps=0, refresh=True)
+    rows, payloads, fetched_at, elapsed = _run(base, concurrency=N_EVENTS, rps=0, refresh=True)
+
+    assert seq_s >= N_EVENTS * LATENCY
+    assert elapsed < 3 * LATENCY
+    assert rows == seq_rows
+    assert payloads == seq_payloads
+    assert payloads[int(MISSING[2:])] is None
+    assert fetched_at is not None
+    assert len(starts) == 2 * N_EVENTS
+
+
+def test_repeat_run_is_served_from_cache(api):
+    base, starts = api
+    rows, _, _, _ = _run(base, concurrency=4, rps=0)
+    n_requests = len(starts)
+    again, _, fetched_at, elapsed = _run(base, concurrency=4, rps=0)
+
+    assert again == rows
+    assert len(starts) == n_requests == N_EVENTS
+    assert fetched_at is None  # nothing new to archive
+    assert elapsed < LATENCY
+
+
+def test_token_bucket_caps_request_rate(api):
+    base, starts = api
+    rps = 4.0
+    _, _, _, elapsed = _run(base, concurrency=N_EVENTS, rps=rps, refresh=True)
+
+    burst = fap.TokenBucket(rps).capacity
+    starts = sorted(starts)
+    assert len(starts) == N_EVENTS
+    # any k consecutive request starts need (k - burst) / rps seconds of refill
+    slack = 0.02
+    for i in range(len(starts)):
+        for j in range(i + 1, len(starts)):
+            assert starts[j] - starts[i] >= (j - i + 1 - burst) / rps - slack
+    assert elapsed >= (N_EVENTS - burst) / rps - slack
@@ -0,0 +1,28 @@
+# tests/test_make_player_prop_params.py
+"""Vectorized build_params / _build_anytime_td_rows vs the iterrows / groupby-loop versions."""
+import pandas as pd
+import pytest
+
+from make_player_prop_params import _build_anytime_td_rows, build_params
+
+import legacy, synth
+
+
+def _params_csv(params, anytime):
+    """main()'s tail: append anytime TD rows, reorder columns, render the CSV."""
+    if len(anytime):
+        params = pd.concat([params, pd.DataFrame(anytime)], ignore_index=True)
+    cols = ['player', 'team', 'market', 'mu', 'sigma', 'model_line', 'model_prob', 'model_price']
+    cols = [c for c in cols if c in params.columns] + [c for c in params.columns if c not in cols]
+    return params[cols].to_csv(index=False)
+
+
+@pytest.mark.parametrize("players", [50, 400])
+def test_params_csv_byte_identical(players):
+    weekly, want = synth.prop_weekly(players)
+    weekly["player"] = weekly["player_display_name"]
+    new = build_params(weekly.copy(), want)
+    old = legacy.build_params(weekly.copy(), want)
+    new_csv = _params_csv(new, _build_anytime_td_rows(new))
+    assert new_csv == _params_csv(old, legacy.build_anytime_td_rows(old))
+    assert new_csv.count("\n") > players
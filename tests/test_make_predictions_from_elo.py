@@ -0,0 +1,45 @@
+# tests/test_make_predictions_from_elo.py
+"""Array Elo predictions and one-pass odds parsing vs the apply / bracket-scanner versions."""
+import numpy as np
+import pandas as pd
+import pytest
+
+import make_predictions_from_elo as mp
+
+import legacy, synth
+
+
+def test_team_rows_match_apply():
+    games = synth.odds_games(5_000)
+    g = games.copy()
+    for c, v in mp.predict(g["home_elo"], g["away_elo"]).items():
+        g[c] = v
+    new, old = mp.team_rows(g), legacy.predictions(games)
+    num = ["team_win_prob", "pred_margin"]
+    pd.testing.assert_frame_equal(new.drop(columns=num), old.drop(columns=num), check_exact=True)
+    np.testing.assert_allclose(new[num], old[num], rtol=0, atol=1e-12)
+
+
+def test_matchup_matrix_matches_scalar_wp():
+    elo_map = dict(zip([f"T{i:02d}" for i in range(32)], np.random.default_rng(1).normal(1500, 80, 32)))
+    m = mp.matchup_matrix(elo_map)
+    ref = [mp.elo_wp(elo_map[h], elo_map[a]) for h, a in zip(m["home"], m["away"])]
+    np.testing.assert_allclose(m["home_win_prob"], ref, rtol=0, atol=1e-12)
+
+
+@pytest.fixture
+def odds_json(tmp_path):
+    f = tmp_path / "odds.json"
+    f.write_text(synth.odds_payload(500), encoding="utf-8")
+    return f
+
+
+def test_load_odds_json_matches_bracket_scanner(odds_json):
+    pd.testing.assert_frame_equal(mp.load_odds(str(odds_json)), legacy.load_odds(str(odds_json)), check_exact=True)
+
+
+def test_load_odds_csv(odds_json, tmp_path):
+    old = legacy.load_odds(str(odds_json))
+    c = tmp_path / "odds.csv"
+    old.to_csv(c, index=False)
+    pd.testing.assert_frame_equal(mp.load_odds(str(c)), old, check_exact=True)
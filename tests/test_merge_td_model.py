@@ -0,0 +1,37 @@
+# tests/test_merge_td_model.py
+"""compute_model_prob: one vectorized pass per model; the Poisson CDF only sees count-market rows."""
+import numpy as np
+import pandas as pd
+
+import merge_td_model as mtm
+import prob_kernels as pk
+
+
+def _rows():
+    return pd.DataFrame({
+        "market_std": ["rushing_yds", "passing_yds", "passing_tds", "interceptions", "anytime_td", "longest_rush"],
+        "name":       ["Over",        "Under",       "Over",        "Under",         "Yes",        "Over"],
+        "mu":         [62.0,          251.0,         1.6,           0.7,             0.4,          15.0],
+        "sigma":      [20.0,          45.0,          np.nan,        np.nan,          np.nan,       5.0],
+        "point":      [58.5,          299.5,         1.5,           0.5,             np.nan,       14.5],
+    })
+
+
+def test_model_prob_per_market():
+    p = mtm.compute_model_prob(_rows())
+    np.testing.assert_allclose(p[:2], [1 - pk.norm_cdf(58.5, 62.0, 20.0), pk.norm_cdf(299.5, 251.0, 45.0)],
+                               rtol=0, atol=1e-15)
+    np.testing.assert_allclose(p[2:4], [1 - pk.poisson_cdf(1.5, 1.6), pk.poisson_cdf(0.5, 0.7)], rtol=0, atol=1e-15)
+    assert p[4] == 1 - np.exp(-0.4)
+    assert np.isnan(p[5])
+
+
+def test_poisson_cdf_skips_yardage_lines(monkeypatch):
+    seen = []
+
+    def recording(k, lam):
+        seen.append(np.asarray(k))
+        return pk.poisson_cdf(k, lam)
+    monkeypatch.setattr(mtm, "poisson_cdf", recording)
+    mtm.compute_model_prob(_rows())
+    assert len(seen) == 1 and seen[0].tolist() == [1.5, 0.5]
@@ -0,0 +1,102 @@
+# tests/test_ml_player_pipeline.py
+"""Walk-forward backtest (pool vs serial folds, no look-ahead, shared memory released) and --jobs vs separate runs."""
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("sklearn")
+import ml_player_pipeline as mp
+
+import synth
+
+JOB = {"name": "te_rec", "target": "receiving_yards", "positions": ["TE"]}
+
+
+@pytest.fixture(scope="module")
+def weekly_csv(tmp_path_factory):
+    f = tmp_path_factory.mktemp("pipeline") / "weekly.csv"
+    synth.weekly(seasons=range(2023, 2025)).to_csv(f, index=False)
+    return str(f)
+
+
+def _opts(weekly_csv, **kw):
+    return dict({"player_csv": weekly_csv, "no_feature_store": True, "feature_store": None, "refresh_features": False,
+                 "team_features": None, "player_ids": None, "lookbacks": [1, 3], "n_estimators": 5, "seed": 42},
+                **kw)
+
+
+def _backtest(weekly_csv, workers, refit_every=1):
+    return mp.run_backtest(_opts(weekly_csv), JOB, (2024, 2), (2024, 5), refit_every, workers)
+
+
+@pytest.mark.parametrize("refit_every", [1, 3])
+def test_pool_matches_serial(weekly_csv, refit_every):
+    serial = _backtest(weekly_csv, 1, refit_every).drop(columns="fit_s")
+    pooled = _backtest(weekly_csv, 2, refit_every).drop(columns="fit_s")
+    assert len(serial) == 5  # four weeks + ALL
+    pd.testing.assert_frame_equal(pooled, serial, check_exact=True)
+
+
+def test_folds_train_only_on_earlier_weeks(weekly_csv, monkeypatch):
+    fits = []
+
+    class Recording(mp.RandomForestRegressor):
+        def fit(self, X, y, *a, **kw):
+            fits.append(X.copy())
+            return super().fit(X, y, *a, **kw)
+
+    monkeypatch.setattr(mp, "RandomForestRegressor", Recording)
+    table = _backtest(weekly_csv, 1, refit_every=3)
+    X, _, df = mp.build_dataset(weekly_csv, JOB["target"], JOB["positions"], None, [1, 3])
+    wk = (df["season"] * 100 + df["week"]).to_numpy()
+    # folds run biggest-first: week 5 alone, then weeks 2-4 on one model
+    assert len(fits) == 2
+    for fitted, first in zip(fits, (202405, 202402)):
+        np.testing.assert_array_equal(fitted, X.to_numpy(np.float32)[wk < first])
+    weeks = table[table["season"] != "ALL"]
+    assert weeks["train_rows"].tolist() == [int((wk < 202402).sum())] * 3 + [int((wk < 202405).sum())]
+    assert (weeks["season"] == 2024).all()
+
+
+def test_shared_memory_unlinked(weekly_csv, monkeypatch):
+    names = []
+    share = mp._share_arrays
+
+    def recording(arrays):
+        blocks, spec = share(arrays)
+        names.extend(shm.name for shm in blocks)
+        return blocks, spec
+
+    monkeypatch.setattr(mp, "_share_arrays", recording)
+    _backtest(weekly_csv, 2)
+    assert len(names) == 3  # X, y, wk
+    for name in names:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+
+def _main(monkeypatch, *argv):
+    monkeypatch.setattr("sys.argv", ["ml_player_pipeline.py", *argv])
+    mp.main()
+
+
+def test_jobs_match_separate_runs(weekly_csv, tmp_path, monkeypatch):
+    """One --jobs invocation (shared feature store, process pool) == one single-target run per job."""
+    pytest.importorskip("pyarrow")
+    common = ["--player_csv", weekly_csv, "--lookbacks", "1", "3", "--holdout_season", "2024",
+              "--predict_season", "2024", "--predict_week", "5", "--n_estimators", "5", "--no_model_cache"]
+    jobs = {"te_rec": ("receiving_yards", ["TE"]), "qb_pass": ("passing_yards", ["QB"]),
+            "fppr": ("fantasy_points_ppr", ["QB", "RB", "WR", "TE"])}
+    _main(monkeypatch, *common, "--feature_store", str(tmp_path / "store"), "--save_dir", str(tmp_path / "jobs"),
+          "--workers", "2", "--jobs", *[f"{n}={t}:{','.join(p)}" for n, (t, p) in jobs.items()])
+    summary = pd.read_csv(tmp_path / "jobs" / "2024_wk5_summary.csv")
+    assert summary["name"].tolist() == list(jobs)
+    for name, (target, positions) in jobs.items():
+        out = tmp_path / f"{name}.csv"
+        _main(monkeypatch, *common, "--no_feature_store", "--target", target, "--positions", *positions,
+              "--save_preds", str(out))
+        pooled = pd.read_csv(tmp_path / "jobs" / f"2024_wk5_{name}.csv")
+        assert len(pooled) > 0
+        pd.testing.assert_frame_equal(pooled, pd.read_csv(out), check_exact=True)
@@ -0,0 +1,84 @@
+# tests/test_model_cache.py
+"""Model artifact keys (spec + training data + sklearn version) and fit_or_load hit / miss / --predict_only."""
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("sklearn")
+import model_cache
+import ml_player_pipeline as mp
+
+
+def _data(seed=0, n=200):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame({"p_receiving_yards_last3": rng.gamma(2, 20, n), "week": rng.integers(1, 18, n)})
+    return X, X["p_receiving_yards_last3"] + rng.normal(0, 5, n)
+
+
+def _opts(root, **kw):
+    return dict({"no_model_cache": False, "refit": False, "predict_only": False, "model_cache": str(root),
+                 "split": "season_holdout", "holdout_season": 2024, "test_size": 0.2, "player_ids": None,
+                 "lookbacks": [3], "n_estimators": 5, "seed": 42, "n_jobs": 1}, **kw)
+
+
+def _fit(opts, X, y):
+    return mp.fit_or_load(opts, "receiving_yards", ["WR"], X, y, X.iloc[:20], y.iloc[:20])
+
+
+def test_key_tracks_spec_data_and_sklearn(monkeypatch):
+    X, y = _data()
+    spec = mp.model_spec(_opts("unused"), "receiving_yards", ["WR"], X.columns)
+    key = model_cache.artifact_key(spec, X, y)
+    assert model_cache.artifact_key(dict(spec), X.copy(), y.copy()) == key
+    # the index is not part of the data digest
+    assert model_cache.artifact_key(spec, X.set_axis(X.index + 1000), y.set_axis(y.index + 1000)) == key
+    assert model_cache.artifact_key(dict(spec, n_estimators=6), X, y) != key
+    assert model_cache.artifact_key(spec, X, y + 1e-9) != key
+    assert model_cache.artifact_key(spec, X.iloc[:-1], y.iloc[:-1]) != key
+    monkeypatch.setattr(model_cache.sklearn, "__version__", "0.0")
+    assert model_cache.artifact_key(spec, X, y) != key
+
+
+def test_second_fit_is_a_cache_hit(tmp_path):
+    X, y = _data()
+    model, mae, source = _fit(_opts(tmp_path), X, y)
+    assert source == "fit" and len(list(tmp_path.iterdir())) == 1
+    cached, cached_mae, source = _fit(_opts(tmp_path), X, y)
+    assert source == "cache" and cached_mae == pytest.approx(mae)
+    np.testing.assert_array_equal(cached.predict(X), model.predict(X))
+
+
+@pytest.mark.parametrize("change", ["data", "hyperparameter"])
+def test_changed_data_or_hyperparameter_misses(tmp_path, change):
+    X, y = _data()
+    _fit(_opts(tmp_path), X, y)
+    opts = _opts(tmp_path, n_estimators=6) if change == "hyperparameter" else _opts(tmp_path)
+    if change == "data":
+        X, y = _data(seed=1)
+    assert _fit(opts, X, y)[2] == "fit"
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_refit_replaces_the_artifact(tmp_path):
+    X, y = _data()
+    _fit(_opts(tmp_path), X, y)
+    assert _fit(_opts(tmp_path, refit=True), X, y)[2] == "fit"
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+def test_predict_only_uses_cached_mae(tmp_path):
+    X, y = _data()
+    _, mae, _ = _fit(_opts(tmp_path), X, y)
+    model, cached_mae, source = _fit(_opts(tmp_path, predict_only=True), X, y)
+    assert source == "cache" and model is not None and cached_mae == pytest.approx(mae)
+
+
+def test_predict_only_without_artifact_fails_cleanly(tmp_path):
+    X, y = _data()
+    with pytest.raises(SystemExit, match="--predict_only: no cached model"):
+        _fit(_opts(tmp_path, predict_only=True), X, y)
+    assert not tmp_path.exists() or not any(tmp_path.iterdir())
+
+
+def test_load_missing_key(tmp_path):
+    assert model_cache.load("0" * 20, tmp_path) == (None, None)
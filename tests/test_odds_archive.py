@@ -0,0 +1,86 @@
+# tests/test_odds_archive.py
+"""Append-only snapshot archive: round trips, latest / closing lookups and line history."""
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+import odds_archive as oa
+
+KICK = "2025-09-07T17:00:00Z"
+# (fetched_at, DK over price, FD over price): two fetches before kickoff, one live after it
+FETCHES = [("2025-09-05T12:00:00Z", -110.0, -115.0),
+           ("2025-09-06T12:00:00Z", -120.0, -118.0),
+           ("2025-09-07T18:00:00Z", -300.0, -280.0)]
+
+
+def _fetch(dk, fd):
+    return pd.DataFrame({
+        "game_id": "g1", "commence_time": KICK, "home_team": "KC", "away_team": "BAL",
+        "bookmaker": ["DraftKings", "DraftKings", "FanDuel"], "market": "player_rush_yds",
+        "player": "Player A", "name": ["Over", "Under", "Over"], "point": 55.5,
+        "price": [dk, -110.0, fd],
+    })
+
+
+@pytest.fixture
+def archive(tmp_path, monkeypatch):
+    monkeypatch.setattr(oa, "ARCHIVE_DIR", tmp_path / "archive")
+    return [oa.append_snapshot(_fetch(dk, fd), "props", season=2025, week=1, fetched_at=ts)
+            for ts, dk, fd in FETCHES]
+
+
+def _price(df, book, side="Over"):
+    return df.loc[(df["bookmaker"] == book) & (df["name"] == side), "price"].item()
+
+
+def test_snapshots_append_and_read_back(archive):
+    assert len(set(archive)) == len(FETCHES) and all(p.exists() for p in archive)
+    hist = oa.read_history("props", 2025, 1)
+    assert len(hist) == 3 * len(FETCHES)
+    assert sorted(hist["fetch_ts"].unique()) == [pd.Timestamp(ts) for ts, _, _ in FETCHES]
+    dk_over = hist[(hist["bookmaker"] == "DraftKings") & (hist["name"] == "Over")].sort_values("fetch_ts")
+    assert dk_over["price"].tolist() == [dk for _, dk, _ in FETCHES]
+    # other weeks / seasons are pruned away, not mixed in
+    oa.append_snapshot(_fetch(-105.0, -105.0), "props", season=2025, week=2, fetched_at="2025-09-12T12:00:00Z")
+    assert len(oa.read_history("props", 2025, 1)) == 3 * len(FETCHES)
+    assert len(oa.read_history("props", 2025, 2)) == 3
+
+
+def test_read_history_projects_columns(archive):
+    hist = oa.read_history("props", 2025, 1, columns=["price"])
+    assert set(hist.columns) == {"price", "fetch_ts"}
+
+
+def test_latest_snapshot(archive):
+    cur = oa.latest_snapshot("props", 2025, 1)
+    assert len(cur) == 3
+    assert (cur["fetch_ts"] == pd.Timestamp(FETCHES[-1][0])).all()
+    assert _price(cur, "DraftKings") == FETCHES[-1][1]
+
+    then = oa.latest_snapshot("props", 2025, 1, as_of="2025-09-06T00:00:00Z")
+    assert (then["fetch_ts"] == pd.Timestamp(FETCHES[0][0])).all()
+    assert _price(then, "DraftKings") == FETCHES[0][1] and _price(then, "FanDuel") == FETCHES[0][2]
+
+
+def test_closing_lines_ignore_quotes_after_kickoff(archive):
+    close = oa.closing_lines("props", 2025, 1)
+    assert len(close) == 3
+    assert (close["fetch_ts"] <= pd.Timestamp(KICK)).all()
+    assert _price(close, "DraftKings") == FETCHES[1][1] and _price(close, "FanDuel") == FETCHES[1][2]
+
+
+def test_line_history_is_time_ordered_per_leg(archive):
+    hist = oa.line_history("props", 2025, 1, game_id="g1", player="Player A")
+    assert len(hist) == 3 * len(FETCHES)
+    for _, leg in hist.groupby(["bookmaker", "name"], observed=True, sort=False):
+        assert leg["fetch_ts"].is_monotonic_increasing
+    dk_over = hist[(hist["bookmaker"] == "DraftKings") & (hist["name"] == "Over")]
+    assert dk_over["price"].tolist() == [dk for _, dk, _ in FETCHES]
+    assert oa.line_history("props", 2025, 1, player="Player B").empty
+
+
+def test_unknown_kind_and_empty_fetch(tmp_path, monkeypatch):
+    monkeypatch.setattr(oa, "ARCHIVE_DIR", tmp_path / "archive")
+    assert oa.append_snapshot(_fetch(-110.0, -110.0).iloc[:0], "props", 2025, 1) is None
+    with pytest.raises(ValueError):
+        oa.append_snapshot(_fetch(-110.0, -110.0), "futures", 2025, 1)
@@ -0,0 +1,65 @@
+# tests/test_parquet_table.py
+"""Partitioned upserts (parquet_table) vs the old read-everything append + dedup."""
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+import parquet_table
+
+import legacy, synth
+
+KEYS = ["player_id", "season", "week", "team"]
+
+
+def _sorted(df):
+    return df.sort_values(KEYS, ignore_index=True)
+
+
+@pytest.fixture(scope="module")
+def tables(tmp_path_factory):
+    """Two appended weeks + a stat-corrected re-pull, through both the legacy files and a partitioned table."""
+    tmp = tmp_path_factory.mktemp("partitions")
+    df = synth.weekly(seasons=range(2022, 2025))
+    df["player_id"] = "00-" + df["player_id"].str.zfill(7)   # nflverse-shaped, so the CSV keeps it a string
+    wk = df["season"] * 100 + df["week"]
+    last = np.sort(wk.unique())[-2:]
+    hist = df[~wk.isin(last)]
+    old_dir, new_dir = tmp / "old", tmp / "new"
+    old_dir.mkdir(); new_dir.mkdir()
+    root, csv = new_dir / "weekly", str(new_dir / "weekly.csv")
+    for d in (old_dir, new_dir):
+        hist.to_parquet(d / "weekly.parquet", index=False)
+        hist.to_csv(d / "weekly.csv", index=False)
+    parquet_table.migrate(root)
+
+    rerun = df[wk == last[-1]].copy()
+    rerun["passing_yards"] += 1.0
+    hows = []
+    for new in [df[wk == w] for w in last] + [rerun]:
+        legacy.append_dedup(new, str(old_dir), "weekly", KEYS)
+        res = parquet_table.upsert(new, root, keys=KEYS)
+        hows.append(parquet_table.append_csv(new, csv, root, rewrite=res["replaced"] > 0))
+    return root, csv, old_dir, last[-1], hows
+
+
+def test_upserts_match_legacy_append(tables):
+    root, csv, old_dir, _, hows = tables
+    assert hows == ["appended", "appended", "rewritten"]
+    pd.testing.assert_frame_equal(_sorted(parquet_table.read(root)), _sorted(pd.read_parquet(old_dir / "weekly.parquet")))
+    pd.testing.assert_frame_equal(_sorted(pd.read_csv(csv)), _sorted(pd.read_csv(old_dir / "weekly.csv")))
+
+
+def test_pruned_read(tables):
+    root, _, _, last, _ = tables
+    got = parquet_table.read(root)
+    part = parquet_table.read(root, seasons=[last // 100], weeks=[last % 100])
+    pd.testing.assert_frame_equal(_sorted(part), _sorted(got[got["season"] * 100 + got["week"] == last]))
+
+
+def test_compact_keeps_the_table(tables):
+    root, csv, old_dir, _, _ = tables
+    before = _sorted(parquet_table.read(root))
+    parquet_table.compact(root, csv)
+    pd.testing.assert_frame_equal(_sorted(parquet_table.read(root)), before)
+    pd.testing.assert_frame_equal(_sorted(pd.read_csv(csv)), _sorted(pd.read_csv(old_dir / "weekly.csv")))
@@ -0,0 +1,59 @@
+# tests/test_postprocess_site.py
+import gzip
+
+import pytest
+
+brotli = pytest.importorskip("brotli")
+import postprocess_site as ps
+
+STYLE = "body { color: #123; }\n" * 40
+SCRIPT = "console.log('x');\n" * 40
+PAGE = """<!doctype html><html><head><style>{style}</style></head><body>
+<script type="application/json" data-inline id="d">{{"a": 1}}</script>
+<script>{script}</script><script>var small = 1;</script></body></html>
+"""
+
+
+@pytest.fixture
+def docs(tmp_path):
+    root = tmp_path / "docs"
+    (root / "props").mkdir(parents=True)
+    (root / "index.html").write_text(PAGE.format(style=STYLE, script=SCRIPT), encoding="utf-8")
+    (root / "props" / "top.html").write_text(PAGE.format(style=STYLE, script=SCRIPT + "// top\n"), encoding="utf-8")
+    (root / "props" / "top.json").write_text('{"cards": []}', encoding="utf-8")
+    return root
+
+
+def test_extracts_shared_hashed_assets(docs):
+    st = ps.postprocess(docs)
+    assets = sorted(p.name for p in (docs / ps.ASSET_DIR).glob("*") if p.suffix in (".css", ".js"))
+    assert st["assets"] == len(assets) == 3   # one shared stylesheet, one script per page
+    index = (docs / "index.html").read_text(encoding="utf-8")
+    top = (docs / "props" / "top.html").read_text(encoding="utf-8")
+    assert "<style>" not in index and 'href="assets/' in index and 'href="../assets/' in top
+    assert "data-inline" in index and "var small = 1;" in index
+
+
+def test_siblings_decompress_to_source(docs):
+    ps.postprocess(docs)
+    for rel in ["index.html", "props/top.json", *(f"assets/{p.name}" for p in (docs / "assets").glob("*.css"))]:
+        src = (docs / rel).read_bytes()
+        assert gzip.decompress((docs / (rel + ".gz")).read_bytes()) == src
+        assert brotli.decompress((docs / (rel + ".br")).read_bytes()) == src
+
+
+def test_rerun_changes_nothing(docs):
+    ps.postprocess(docs)
+    before = {p: p.read_bytes() for p in docs.rglob("*") if p.is_file()}
+    st = ps.postprocess(docs)
+    assert st["written"] == 0 and st["pruned"] == 0
+    assert {p: p.read_bytes() for p in docs.rglob("*") if p.is_file()} == before
+
+
+def test_unreferenced_assets_are_pruned(docs):
+    ps.postprocess(docs)
+    (docs / "props" / "top.html").write_text("<html><body>no assets</body></html>", encoding="utf-8")
+    (docs / "index.html").write_text("<html><body>none here either</body></html>", encoding="utf-8")
+    st = ps.postprocess(docs)
+    assert st["assets"] == 0 and st["pruned"] > 0
+    assert not any((docs / ps.ASSET_DIR).glob("*"))
@@ -0,0 +1,45 @@
+# tests/test_prob_kernels.py
+"""prob_kernels vs the per-row helpers the edge / merge scripts used before."""
+import numpy as np
+import pytest
+
+import legacy, synth
+import prob_kernels as pk
+
+N = 20_000
+
+
+@pytest.fixture(scope="module")
+def df():
+    return synth.kernel_inputs(N)
+
+
+def test_american_to_decimal(df):
+    np.testing.assert_array_equal(pk.american_to_decimal(df["price"].to_numpy()),
+                                  df["price"].apply(legacy.american_to_decimal))
+
+def test_american_to_prob(df):
+    np.testing.assert_array_equal(pk.american_to_prob(df["price"].to_numpy()),
+                                  df["price"].apply(legacy.american_to_prob))
+
+def test_prob_to_american(df):
+    np.testing.assert_array_equal(pk.prob_to_american(df["p"].to_numpy(), rounded=True),
+                                  df["p"].apply(legacy.prob_to_american).astype(float))
+
+def test_norm_cdf(df):
+    old = [legacy.norm_cdf(x, m, s) for x, m, s in zip(df["point"], df["mu"], df["sigma"])]
+    np.testing.assert_allclose(pk.norm_cdf(df["point"].to_numpy(), df["mu"].to_numpy(), df["sigma"].to_numpy()),
+                               old, rtol=0, atol=1e-15)
+
+def test_expected_value(df):
+    dec = pk.american_to_decimal(df["price"].to_numpy())
+    old = [legacy.expected_value(p, d) for p, d in zip(df["p"], dec)]
+    np.testing.assert_array_equal(pk.expected_value(df["p"].to_numpy(), dec), old)
+
+def test_poisson_cdf(df):
+    old = [legacy.poisson_cdf(k, lam) for k, lam in zip(df["line"], df["lam"])]
+    np.testing.assert_allclose(pk.poisson_cdf(df["line"].to_numpy(), df["lam"].to_numpy()), old, rtol=0, atol=1e-15)
+
+def test_poisson_sf(df):
+    old = [legacy.poisson_sf(lam, k) for k, lam in zip(df["line"], df["lam"])]
+    np.testing.assert_allclose(pk.poisson_sf(df["line"].to_numpy(), df["lam"].to_numpy()), old, rtol=0, atol=1e-15)
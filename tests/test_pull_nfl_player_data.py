@@ -0,0 +1,66 @@
+# tests/test_pull_nfl_player_data.py
+"""run_task retries / failure rows and the run_tasks report, with loaders that fail on purpose."""
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+pytest.importorskip("nfl_data_py")
+import parquet_table
+import pull_nfl_player_data as pull
+
+
+def _frame():
+    return pd.DataFrame({"player_id": ["a", "b"], "recent_team": ["KC", "BUF"], "season": 2024, "week": 1,
+                         "receiving_yards": [50.0, 12.0]})
+
+
+def _flaky(fails, exc=ConnectionError("HTTP 503")):
+    """Loader that raises `fails` times, then returns a frame; calls[0] counts the attempts."""
+    calls = [0]
+
+    def load():
+        calls[0] += 1
+        if calls[0] <= fails:
+            raise exc
+        return _frame()
+    return load, calls
+
+
+def test_retries_then_succeeds(tmp_path):
+    load, calls = _flaky(2)
+    row = pull.run_task("weekly", load, str(tmp_path), as_csv=False, retries=3, backoff=0)
+    assert calls[0] == 3
+    assert row["status"] == "ok" and row["attempts"] == 3 and row["error"] == ""
+    assert row["rows"] == 2 and row["mb"] > 0
+    saved = parquet_table.read(tmp_path / "weekly")
+    assert "team" in saved.columns and len(saved) == 2
+
+
+def test_always_failing_loader_is_reported(tmp_path):
+    load, calls = _flaky(10**6, RuntimeError("no such release"))
+    row = pull.run_task("ngs", load, str(tmp_path), as_csv=False, retries=2, backoff=0)
+    assert calls[0] == 3  # first try + 2 retries
+    assert row["status"] == "failed" and row["attempts"] == 3
+    assert row["error"] == "RuntimeError: no such release"
+    assert row["rows"] == 0 and not (tmp_path / "ngs").exists()
+
+
+def test_backoff_doubles(tmp_path, monkeypatch):
+    delays = []
+    monkeypatch.setattr(pull.time, "sleep", delays.append)
+    monkeypatch.setattr(pull.random, "random", lambda: 0.0)
+    pull.run_task("weekly", _flaky(3)[0], str(tmp_path), as_csv=False, retries=3, backoff=1.5)
+    assert delays == [1.5, 3.0, 6.0]
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_run_tasks_report(tmp_path, workers):
+    tasks = [("weekly", _flaky(1)[0]), ("rosters", _flaky(0)[0]), ("ngs", _flaky(10**6, ValueError("bad"))[0])]
+    rep = pull.run_tasks(tasks, str(tmp_path), as_csv=True, workers=workers, retries=1, backoff=0)
+    rep = rep.set_index("dataset")
+    assert sorted(rep.index) == ["ngs", "rosters", "weekly"]
+    assert rep.loc["weekly", "attempts"] == 2 and rep.loc["rosters", "attempts"] == 1
+    assert (rep.loc[["weekly", "rosters"], "status"] == "ok").all()
+    assert rep.loc["ngs", "status"] == "failed" and rep.loc["ngs", "error"] == "ValueError: bad"
+    assert rep["rows"].sum() == 4
+    assert (tmp_path / "weekly.csv").exists() and not (tmp_path / "ngs.csv").exists()
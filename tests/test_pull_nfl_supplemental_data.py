@@ -0,0 +1,81 @@
+# tests/test_pull_nfl_supplemental_data.py
+"""PBP ingest: PBP_COLUMNS projection, categorical / int8 / float32 downcasts, values unchanged."""
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("nfl_data_py")
+import pull_nfl_supplemental_data as pull
+
+import synth
+
+
+@pytest.fixture
+def raw(monkeypatch):
+    """Two synthetic weeks with a few columns outside the allow-list; import_pbp_data returns all of it."""
+    df = synth.pbp([2024])
+    df = df[df["week"] <= 2].assign(old_game_id="x", nflverse_game_id=df["game_id"], ep=0.5)
+    calls = []
+
+    def import_pbp_data(years, columns=None, **kw):
+        calls.append(columns)
+        return df[df["season"].isin(years)].reset_index(drop=True)
+    monkeypatch.setattr(pull.nfl, "import_pbp_data", import_pbp_data)
+    return df.reset_index(drop=True), calls
+
+
+def test_projects_allow_list(raw):
+    df, calls = raw
+    out = pull.load_pbp_season(2024)
+    assert calls[0][:len(pull.PBP_KEYS)] == pull.PBP_KEYS and set(calls[0]) == set(pull.PBP_KEYS + pull.PBP_COLUMNS)
+    want = [c for c in pull.PBP_KEYS + pull.PBP_COLUMNS if c in df.columns]
+    assert list(out.columns) == want
+    assert not {"old_game_id", "nflverse_game_id", "ep"} & set(out.columns)
+    assert len(out) == len(df)
+
+    full = pull.load_pbp_season(2024, columns=None)
+    assert calls[-1] is None and set(full.columns) == set(df.columns)
+
+
+def test_week_filter(raw):
+    df, _ = raw
+    out = pull.load_pbp_season(2024, week=2)
+    assert (out["week"] == 2).all() and len(out) == (df["week"] == 2).sum()
+
+
+def test_downcast_dtypes(raw):
+    df, _ = raw
+    out = pull.load_pbp_season(2024)
+    for c in ("posteam", "defteam", "fixed_drive_result"):
+        assert isinstance(out[c].dtype, pd.CategoricalDtype), c
+    for c in ("pass", "rush", "success", "week", "fixed_drive", "yardline_100", "yards_gained"):
+        assert out[c].dtype == np.int8, c
+    for c in ("season", "play_id", "game_seconds_remaining"):
+        assert out[c].dtype == np.int16, c
+    for c in ("epa", "xpass"):  # fractional / has NaN
+        assert out[c].dtype == np.float32, c
+    assert out["game_id"].dtype == object
+    assert out.memory_usage(deep=True).sum() < df[out.columns].memory_usage(deep=True).sum() / 2
+
+
+def test_values_round_trip(raw):
+    df, _ = raw
+    out = pull.load_pbp_season(2024)
+    for c in out.columns:
+        new, old = out[c], df[c]
+        if isinstance(new.dtype, pd.CategoricalDtype):
+            pd.testing.assert_series_equal(new.astype(object), old.astype(object), check_names=False)
+        elif new.dtype == np.float32:
+            np.testing.assert_array_equal(new.to_numpy(), old.to_numpy(np.float32))
+        else:
+            np.testing.assert_array_equal(new.to_numpy(), old.to_numpy(), err_msg=c)
+            if pd.api.types.is_integer_dtype(new):
+                np.testing.assert_array_equal(new.astype(old.dtype).to_numpy(), old.to_numpy(), err_msg=c)
+
+
+def test_int_widths():
+    df = pd.DataFrame({"a": [0.0, 127.0], "b": [-129.0, 5.0], "c": [0.0, 40000.0], "d": [0.0, 2.0**31],
+                       "e": [1.0, np.nan], "f": [True, False]})
+    out = pull.downcast_pbp(df)
+    # whole numbers past int32 stay float64 (float32 would round them)
+    assert out.dtypes.astype(str).tolist() == ["int8", "int16", "int32", "float64", "float32", "bool"]
@@ -0,0 +1,48 @@
+# tests/test_rolling_features.py
+"""ml_player_pipeline rolling features (rolling_features.lagged_means) vs the per-column groupby lambdas."""
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("sklearn")  # ml_player_pipeline imports it at module level
+import ml_player_pipeline as mp
+import rolling_features
+
+import legacy, synth
+
+LOOKBACKS = [1, 3]
+
+
+def _assert_same_features(new: pd.DataFrame, old: pd.DataFrame):
+    assert list(new.columns) == list(old.columns)
+    assert new.index.equals(old.index)
+    feat = [c for c in new.columns if c.endswith("_season_avg") or "_last" in c]
+    assert feat
+    np.testing.assert_array_equal(new[feat].to_numpy(dtype=float), old[feat].to_numpy(dtype=float))
+
+
+@pytest.fixture(scope="module")
+def weekly():
+    return synth.weekly(seasons=range(2023, 2025))
+
+
+@pytest.fixture(scope="module")
+def player_features(weekly):
+    new = mp.add_player_rolling_and_season(weekly, synth.ROLL_COLS, LOOKBACKS, "player_id", "p_")
+    old = legacy.add_player_rolling_and_season(weekly, synth.ROLL_COLS, LOOKBACKS, "player_id", "p_")
+    return new, old
+
+
+def test_player_rolling_and_season_bit_identical(player_features):
+    _assert_same_features(*player_features)
+
+
+def test_defense_allowed_bit_identical(player_features):
+    new_p, old_p = player_features
+    _assert_same_features(mp.build_defense_allowed(new_p, synth.ROLL_COLS, LOOKBACKS),
+                          legacy.build_defense_allowed(old_p, synth.ROLL_COLS, LOOKBACKS))
+
+
+def test_rolling_state_mirrors_installed_pandas():
+    """RollingState copies roll_mean's private accumulators; a pandas upgrade that changes them fails here."""
+    assert rolling_features.mirrors_pandas()
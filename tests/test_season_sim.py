@@ -0,0 +1,99 @@
+# tests/test_season_sim.py
+import numpy as np
+import pandas as pd
+import pytest
+
+import season_sim
+import legacy, synth
+
+SIMS = 40_000
+
+
+@pytest.fixture
+def season(monkeypatch):
+    """Fully scored synthetic 2030 season; elo.ratings() returns fixed ratings for any week."""
+    ratings, sched = synth.season()
+    monkeypatch.setattr(season_sim.elo, "ratings",
+                        lambda season, week, root=None: pd.DataFrame({"team": season_sim.TEAMS, "elo": ratings}))
+    return ratings, sched
+
+
+def test_week_splits_played_and_remaining(season):
+    _, sched = season
+    played, remaining = season_sim.season_games(sched, 2030, week=10)
+    assert played["week"].max() == 9 and remaining["week"].min() == 10
+    assert len(played) + len(remaining) == len(sched)
+    # scores from week 10 on are ignored, not counted twice
+    cut = sched.assign(home_score=sched["home_score"].where(sched["week"] < 10),
+                       away_score=sched["away_score"].where(sched["week"] < 10))
+    idx = season_sim.league()[0]
+    np.testing.assert_array_equal(season_sim.record(played, idx),
+                                  season_sim.record(season_sim.season_games(cut, 2030)[0], idx))
+
+
+def test_run_resimulates_from_a_past_week(season):
+    _, sched = season
+    teams, _, week = season_sim.run(2030, 1, sims=2_000, chunk=1_000, seed=1, sched=sched)
+    assert week == 1
+    assert (teams["wins_so_far"] == 0).all()
+    assert teams["mean_wins"].sum() == pytest.approx(len(sched))  # every game re-drawn (ties are 1/2 + 1/2)
+
+    teams, _, week = season_sim.run(2030, 10, sims=2_000, chunk=1_000, seed=1, sched=sched)
+    assert week == 10
+    assert teams["wins_so_far"].sum() == (sched["week"] < 10).sum()
+
+
+def test_default_week_is_first_unplayed(season):
+    _, sched = season
+    sched = sched.assign(home_score=sched["home_score"].where(sched["week"] < 5),
+                         away_score=sched["away_score"].where(sched["week"] < 5))
+    _, _, week = season_sim.run(2030, sims=1_000, chunk=1_000, seed=1, sched=sched)
+    assert week == 5
+
+
+@pytest.fixture(scope="module")
+def preseason():
+    """Whole synthetic season unplayed, simulated once with fixed ratings."""
+    ratings, sched = synth.season()
+    idx = season_sim.league()[0]
+    played, remaining = season_sim.season_games(sched.assign(home_score=np.nan, away_score=np.nan), 2030)
+    base = season_sim.record(played, idx)
+    counts = season_sim.simulate(ratings, remaining, base, SIMS, 10_000, 1)
+    teams, _ = season_sim.summarize(counts, ratings, base)
+    return ratings, remaining, teams.set_index("team").reindex(season_sim.TEAMS)
+
+
+def test_mean_wins_match_game_probabilities(preseason):
+    ratings, remaining, teams = preseason
+    idx = season_sim.league()[0]
+    h, a = remaining["home_team"].map(idx), remaining["away_team"].map(idx)
+    p = season_sim.elo.expected_home_win_prob(ratings[h], ratings[a])
+    analytic = np.bincount(h, p, 32) + np.bincount(a, 1 - p, 32)
+    np.testing.assert_allclose(teams["mean_wins"], analytic, rtol=0,
+                               atol=6 * np.sqrt(len(remaining) / 16 * 0.25 / SIMS))
+
+
+def test_probabilities_sum_to_slots(preseason):
+    _, _, teams = preseason
+    totals = [teams["p_division"].sum(), teams["p_playoffs"].sum(),
+              teams[[f"p_seed{k}" for k in range(1, 8)]].sum().mean(),
+              teams["p_conference"].sum(), teams["p_superbowl"].sum()]
+    np.testing.assert_allclose(totals, [8, 14, 2, 2, 1], rtol=0, atol=1e-9)
+
+
+def test_division_odds_match_per_season_loop(preseason):
+    ratings, remaining, teams = preseason
+    legacy_sims = 2_000
+    old = legacy.division_odds(ratings, remaining, legacy_sims)
+    np.testing.assert_allclose(teams["p_division"], old, rtol=0, atol=5 * np.sqrt(0.25 / legacy_sims))
+
+
+def test_record_counts_half_wins(season):
+    _, sched = season
+    half = sched[sched["week"] <= 9]
+    wins = pd.concat([half.loc[half["home_score"] > half["away_score"], "home_team"],
+                      half.loc[half["away_score"] > half["home_score"], "away_team"]]).value_counts()
+    ties = half.loc[half["home_score"] == half["away_score"], ["home_team", "away_team"]].stack().value_counts()
+    ref = wins.reindex(season_sim.TEAMS, fill_value=0) * 2 + ties.reindex(season_sim.TEAMS, fill_value=0)
+    played, _ = season_sim.season_games(sched, 2030, week=10)
+    np.testing.assert_array_equal(season_sim.record(played, season_sim.league()[0]), ref.to_numpy())
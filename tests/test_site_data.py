@@ -0,0 +1,36 @@
+# tests/test_site_data.py
+"""site_data column-wise read_df vs the per-row applies the page builders used before."""
+import numpy as np
+import pandas as pd
+import pytest
+
+import site_data
+
+import legacy, synth
+
+COLS = ["line_disp", "game_disp", "_mkt_norm", "_game_norm", "_book_norm"]
+
+
+@pytest.fixture(scope="module")
+def merged(tmp_path_factory):
+    f = tmp_path_factory.mktemp("pages") / "merged.csv"
+    synth.merged_props(5_000).to_csv(f, index=False)
+    return str(f)
+
+
+@pytest.mark.parametrize("consensus", [False, True], ids=["top_picks", "consensus"])
+def test_read_df_matches_row_applies(merged, consensus):
+    old = legacy.page_df(merged, consensus)
+    new = site_data.read_df(merged, ["price"] if consensus else ["price", "model_line", "point", "line"])
+    # top picks now shares the consensus page's Anytime TD "No Scorer" label
+    relabel = (new["line_disp"] == "No Scorer") & (old["line_disp"] != "No Scorer")
+    assert consensus or relabel.any()
+    assert not (consensus and relabel.any())
+    pd.testing.assert_frame_equal(new.loc[~relabel, COLS], old.loc[~relabel, COLS], check_exact=True)
+    if consensus:
+        np.testing.assert_allclose(site_data.american_to_prob(new["price"]), old["imp_prob"], rtol=0, atol=1e-12)
+    else:
+        np.testing.assert_allclose(site_data.parse_numberish(new["edge"]), old["edge_bps"], rtol=0, atol=1e-12)
+        np.testing.assert_allclose(site_data.prob01(new["model_prob"]),
+                                   new["model_prob"].map(legacy.parse_numberish).where(lambda v: v <= 1),
+                                   rtol=0, atol=1e-12)
@@ -0,0 +1,46 @@
+# tests/test_site_templates.py
+"""Pages streamed through site_templates.write_page are byte-identical to rendering the whole string."""
+import importlib
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import build_stamp
+import site_templates
+
+import synth
+
+BUILDERS = ["build_props_site", "build_top_picks", "build_consensus_page"]
+
+
+@pytest.fixture(scope="module")
+def merged(tmp_path_factory):
+    f = tmp_path_factory.mktemp("render") / "merged.csv"
+    m = synth.merged_props(3_000)
+    m.assign(market_std=m["market"], model_prob=np.random.default_rng(0).uniform(0.05, 0.95, len(m)),
+             model_price=np.nan).to_csv(f, index=False)
+    return str(f)
+
+
+def _whole_string(out, name, **ctx):
+    """The old shape: every row rendered up front, then the page written as one string."""
+    ctx = {k: (list(v) if k in ("cards", "rows") else v) for k, v in ctx.items()}
+    out = Path(out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(site_templates.render(name, **ctx), encoding="utf-8")
+    return out
+
+
+@pytest.mark.parametrize("builder", BUILDERS)
+def test_streamed_page_identical_to_render(builder, merged, tmp_path, monkeypatch):
+    monkeypatch.setattr(build_stamp, "STAMP_DIR", tmp_path / "stamps")
+    mod = importlib.import_module(builder)
+    pages = {}
+    for mode in ("stream", "string"):
+        if mode == "string":
+            monkeypatch.setattr(site_templates, "write_page", _whole_string)
+        pages[mode] = tmp_path / mode / "page.html"
+        mod.main(["--merged_csv", merged, "--out", str(pages[mode]), "--force"])
+    assert pages["stream"].stat().st_size > 1_000
+    assert pages["stream"].read_bytes() == pages["string"].read_bytes()
@@ -0,0 +1,68 @@
+# tests/test_team_features.py
+"""team_features groupby aggregation vs a per-game loop, and its lagged / joined / as_of consumers."""
+import pathlib
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pyarrow")
+import nfl_data
+import parquet_table
+import team_features as tf
+
+import legacy, synth
+
+SEASONS = [2024, 2025]
+
+
+@pytest.fixture(scope="module")
+def pbp():
+    return synth.pbp(SEASONS)
+
+
+@pytest.mark.parametrize("side", list(tf.SIDES))
+def test_aggregate_matches_per_game_loop(pbp, side):
+    small = pbp[(pbp["season"] == SEASONS[0]) & (pbp["week"] <= 6)]
+    new = tf.aggregate(small)[side]
+    old = legacy.team_week(small, tf.SIDES[side])
+    assert len(new) == len(old)
+    for m in tf.METRICS:
+        np.testing.assert_allclose(new[m], old[m], rtol=0, atol=1e-9, err_msg=m)
+
+
+@pytest.fixture(scope="module")
+def built(pbp, tmp_path_factory):
+    tmp = tmp_path_factory.mktemp("team_features")
+    mp = pytest.MonkeyPatch()
+    mp.setattr(nfl_data, "DATA_DIR", pathlib.Path(tmp))
+    parquet_table.write(pbp, tmp / "nfl_supplemental" / "play_by_play")
+    root = str(tmp / "team_features")
+    out = tf.build(None, root)
+    yield out["offense"], root
+    mp.undo()
+
+
+def test_lagged_is_previous_week(built):
+    off, root = built
+    lag = tf.lagged("offense", [1, 3], root)
+    prev = off.groupby("team")["epa_per_play"].shift()   # last-k spans seasons, like the player features
+    np.testing.assert_allclose(lag["team_off_epa_per_play_last1"], prev, rtol=0, atol=1e-12)
+
+
+def test_join_keeps_rows(built):
+    off, root = built
+    games = off[["team", "season", "week"]].rename(columns={"team": "opponent_team"}).assign(
+        team=off["team"].to_numpy()[::-1])
+    joined = tf.join(games, [1, 3], root)
+    assert len(joined) == len(games) and joined.index.equals(games.index)
+    assert set(tf.feature_names([1, 3])) <= set(joined.columns)
+
+
+def test_as_of_pools_each_rate_by_its_count(built):
+    off, root = built
+    ctx = tf.as_of("offense", SEASONS[-1], 10, root).set_index("team")
+    ref = off[(off["season"] == SEASONS[-1]) & (off["week"] < 10)].groupby("team")
+    for m in ["epa_per_play", *tf.WEIGHTS]:
+        n = tf.WEIGHTS.get(m, "plays")
+        pooled = ref.apply(lambda g: np.average(g[m], weights=g[n]) if g[n].sum() else np.nan)
+        np.testing.assert_allclose(ctx[f"team_off_{m}"], pooled.reindex(ctx.index), rtol=0, atol=1e-12, err_msg=m)